@@ -0,0 +1,295 @@
+"""
+Point-major dataset stores.
+
+MERRA-2 files are written one time slice after another, so reading a single grid point's
+multi-decade series touches every slice in the file. :func:`convert_to_chunked_store`
+rewrites one NetCDF file (or a directory of them) into a store chunked as long time runs
+over small lat/lon tiles, so a point series is a handful of chunk reads. ``.zarr`` outputs
+need the optional ``zarr`` package; anything else is written as chunked NetCDF4.
+
+:func:`open_store` is what the dataset pool uses to open any dataset. Stores are opened
+lazily (no values are read until a query selects them) behind a bounded chunk cache.
+Manifests, globs and directories of NetCDF shards are federated by :mod:`backend.shards`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import xarray as xr  # type: ignore
+except Exception:  # pragma: no cover - optional dependency for demo
+    xr = None
+
+from .dataset_pool import ZARR_MARKERS
+from .shards import is_sharded_source, open_sharded
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SPACE_CHUNK = 8
+DEFAULT_TIME_BLOCK = 366
+DEFAULT_CHUNK_CACHE_MB = 64.0
+NETCDF_SUFFIXES = (".nc", ".nc4", ".netcdf")
+
+_NETCDF_CACHE_CONFIGURED = False
+
+
+def is_zarr_store(uri: str) -> bool:
+    if uri.rstrip("/").endswith(".zarr"):
+        return True
+    return os.path.isdir(uri) and any(os.path.exists(os.path.join(uri, marker)) for marker in ZARR_MARKERS)
+
+
+def chunk_cache_bytes() -> int:
+    megabytes = float(os.getenv("WEATHERWISE_CHUNK_CACHE_MB", str(DEFAULT_CHUNK_CACHE_MB)))
+    return max(0, int(megabytes * 1024 * 1024))
+
+
+def _configure_netcdf_chunk_cache() -> None:
+    # netCDF4 applies the cache size to files opened after the call, so it is set once up front.
+    global _NETCDF_CACHE_CONFIGURED
+    if _NETCDF_CACHE_CONFIGURED:
+        return
+    _NETCDF_CACHE_CONFIGURED = True
+    try:
+        import netCDF4  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return
+    size = chunk_cache_bytes()
+    if size:
+        _, nelems, preemption = netCDF4.get_chunk_cache()
+        netCDF4.set_chunk_cache(size=size, nelems=nelems, preemption=preemption)
+
+
+def _zarr_store(zarr: Any, uri: str) -> Any:
+    """``uri`` behind an LRU chunk cache on zarr 2; zarr 3 removed the store wrappers, so it gets the path."""
+    storage = zarr.storage
+    if not hasattr(storage, "LRUStoreCache"):
+        return uri
+    store: Any = storage.DirectoryStore(uri)
+    size = chunk_cache_bytes()
+    if size:
+        store = storage.LRUStoreCache(store, max_size=size)
+    return store
+
+
+def open_store(uri: str) -> Any:
+    """Open a NetCDF file, OPeNDAP URL, Zarr store or shard set lazily with a bounded chunk cache."""
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+
+    if is_zarr_store(uri):
+        try:
+            import zarr  # type: ignore
+        except Exception as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("Reading Zarr stores requires the optional 'zarr' package.") from exc
+        # chunks=None keeps backend-lazy arrays instead of building a dask graph per query.
+        return xr.open_zarr(_zarr_store(zarr, uri), chunks=None)
+
+    _configure_netcdf_chunk_cache()
+    if is_sharded_source(uri):
+        return open_sharded(uri)
+    return xr.open_dataset(uri)
+
+
+def source_files(source: str) -> List[Path]:
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(item for item in path.iterdir() if item.suffix.lower() in NETCDF_SUFFIXES)
+        if not files:
+            raise FileNotFoundError(f"No NetCDF files found in {source}.")
+        return files
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset {source} does not exist.")
+    return [path]
+
+
+def _gridded_variables(dataset: Any) -> List[str]:
+    return [
+        name
+        for name, variable in dataset.data_vars.items()
+        if set(variable.dims) == {"time", "lat", "lon"}
+    ]
+
+
+def _scan_sources(files: Sequence[Path]) -> Tuple[List[Tuple[Path, int, Any]], Any]:
+    """Order the sources by their first timestamp and check they share one grid."""
+    scanned: List[Tuple[Path, int, Any]] = []
+    reference: Any = None
+    for file in files:
+        with xr.open_dataset(file) as dataset:
+            if "time" not in dataset.dims or "lat" not in dataset.dims or "lon" not in dataset.dims:
+                raise ValueError(f"{file} must have 'time', 'lat' and 'lon' dimensions.")
+            if reference is None:
+                reference = dataset.isel(time=slice(0, 0)).load()
+            elif not (
+                np.array_equal(dataset["lat"].values, reference["lat"].values)
+                and np.array_equal(dataset["lon"].values, reference["lon"].values)
+            ):
+                raise ValueError(f"{file} uses a different lat/lon grid than {files[0]}.")
+            scanned.append((file, int(dataset.sizes["time"]), dataset["time"].values[0]))
+    scanned.sort(key=lambda item: item[2])
+    return scanned, reference
+
+
+def _time_blocks(dataset: Any, block: int):
+    size = int(dataset.sizes["time"])
+    for start in range(0, size, block):
+        yield dataset.isel(time=slice(start, min(size, start + block)))
+
+
+def _write_netcdf(
+    scanned: Sequence[Tuple[Path, int, Any]],
+    reference: Any,
+    variables: Sequence[str],
+    staging: Path,
+    *,
+    time_chunk: int,
+    space_chunk: int,
+    time_block: int,
+    compress: bool
+) -> None:
+    import netCDF4  # type: ignore
+    from xarray.coding.times import encode_cf_datetime
+
+    total = sum(length for _, length, _ in scanned)
+    time_encoding = reference["time"].encoding
+    units = time_encoding.get("units", "days since 1970-01-01")
+    calendar = time_encoding.get("calendar", "proleptic_gregorian")
+
+    with netCDF4.Dataset(staging, "w", format="NETCDF4") as out:
+        out.setncatts({key: value for key, value in reference.attrs.items() if not key.startswith("_")})
+        out.createDimension("time", total)
+        out.createDimension("lat", reference.sizes["lat"])
+        out.createDimension("lon", reference.sizes["lon"])
+
+        time_var = out.createVariable("time", "f8", ("time",))
+        time_var.units = units
+        time_var.calendar = calendar
+        for name in ("lat", "lon"):
+            coord = out.createVariable(name, reference[name].dtype, (name,))
+            coord[:] = reference[name].values
+            coord.setncatts(reference[name].attrs)
+
+        chunks = (
+            min(time_chunk, total) if time_chunk > 0 else total,
+            min(space_chunk, reference.sizes["lat"]),
+            min(space_chunk, reference.sizes["lon"])
+        )
+        for name in variables:
+            source = reference[name]
+            target = out.createVariable(
+                name,
+                source.dtype,
+                ("time", "lat", "lon"),
+                chunksizes=chunks,
+                zlib=compress,
+                complevel=1 if compress else 0,
+                shuffle=compress,
+                fill_value=source.encoding.get("_FillValue", netCDF4.default_fillvals.get(source.dtype.str[1:]))
+            )
+            target.setncatts({key: value for key, value in source.attrs.items() if key != "_FillValue"})
+
+        offset = 0
+        for file, length, _ in scanned:
+            with xr.open_dataset(file) as dataset:
+                for block in _time_blocks(dataset, time_block):
+                    size = int(block.sizes["time"])
+                    encoded, _, _ = encode_cf_datetime(block["time"].values, units, calendar)
+                    time_var[offset:offset + size] = encoded
+                    for name in variables:
+                        out[name][offset:offset + size, :, :] = block[name].transpose("time", "lat", "lon").values
+                    offset += size
+            LOGGER.info("Chunked store: copied %s (%d steps)", file, length)
+
+
+def _write_zarr(
+    scanned: Sequence[Tuple[Path, int, Any]],
+    variables: Sequence[str],
+    staging: Path,
+    *,
+    time_chunk: int,
+    space_chunk: int,
+    time_block: int
+) -> None:
+    try:
+        import zarr  # type: ignore  # noqa: F401
+    except Exception as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("Writing Zarr stores requires the optional 'zarr' package.") from exc
+
+    total = sum(length for _, length, _ in scanned)
+    first = True
+    for file, length, _ in scanned:
+        with xr.open_dataset(file) as dataset:
+            for block in _time_blocks(dataset, time_block):
+                block = block[list(variables)].transpose("time", "lat", "lon").load()
+                if first:
+                    chunks = (
+                        min(time_chunk, total) if time_chunk > 0 else total,
+                        min(space_chunk, block.sizes["lat"]),
+                        min(space_chunk, block.sizes["lon"])
+                    )
+                    encoding: Dict[str, Any] = {name: {"chunks": chunks} for name in variables}
+                    block.to_zarr(staging, mode="w", encoding=encoding, consolidated=True)
+                    first = False
+                else:
+                    block.to_zarr(staging, append_dim="time", consolidated=True)
+        LOGGER.info("Chunked store: copied %s (%d steps)", file, length)
+
+
+def convert_to_chunked_store(
+    source: str,
+    output: str,
+    *,
+    time_chunk: int = 0,
+    space_chunk: int = DEFAULT_SPACE_CHUNK,
+    time_block: int = DEFAULT_TIME_BLOCK,
+    compress: bool = False
+) -> Path:
+    """Rewrite ``source`` (a NetCDF file or a directory of them) as a point-major store.
+
+    Chunks span ``time_chunk`` steps (``0`` = the whole time axis) over ``space_chunk`` x
+    ``space_chunk`` cells. Sources are copied ``time_block`` steps at a time, so memory use
+    stays bounded regardless of the dataset size. The output replaces ``output`` atomically.
+    """
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+
+    files = source_files(source)
+    scanned, reference = _scan_sources(files)
+    variables = _gridded_variables(reference)
+    if not variables:
+        raise ValueError("No (time, lat, lon) variables found to convert.")
+
+    target = Path(output)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    if staging.is_dir():
+        shutil.rmtree(staging)
+    elif staging.exists():
+        staging.unlink()
+
+    step = max(1, time_block)
+    if target.suffix == ".zarr":
+        _write_zarr(scanned, variables, staging, time_chunk=time_chunk, space_chunk=space_chunk, time_block=step)
+    else:
+        _write_netcdf(
+            scanned,
+            reference,
+            variables,
+            staging,
+            time_chunk=time_chunk,
+            space_chunk=space_chunk,
+            time_block=step,
+            compress=compress
+        )
+
+    if target.is_dir():
+        shutil.rmtree(target)
+    os.replace(staging, target)
+    return target
@@ -0,0 +1,39 @@
+"""Condition thresholds shared by the API layer and the dataset code; kept free of heavy imports."""
+
+CONDITION_SETTINGS = {
+    "very_hot": {
+        "variable": "T2M_MAX",
+        "threshold": 32.2,
+        "unit": "°C",
+        "comparison": ">=",
+        "description": "Daily max temperature ≥ 32.2°C"
+    },
+    "very_cold": {
+        "variable": "T2M_MIN",
+        "threshold": 0.0,
+        "unit": "°C",
+        "comparison": "<=",
+        "description": "Daily min temperature ≤ 0°C (32°F freezing threshold)"
+    },
+    "very_wet": {
+        "variable": "PRECTOT",
+        "threshold": 10.0,
+        "unit": "mm/day",
+        "comparison": ">=",
+        "description": "Precipitation ≥ 10 mm/day"
+    },
+    "very_windy": {
+        "variable": "WS10M",
+        "threshold": 8.0,
+        "unit": "m/s",
+        "comparison": ">=",
+        "description": "Wind speed ≥ 8 m/s (≈18 mph)"
+    },
+    "very_uncomfortable": {
+        "variable": "T2M",
+        "threshold": 35.0,
+        "unit": "°C heat index (proxy)",
+        "comparison": ">=",
+        "description": "Heat index proxy ≥ 35°C (≈95°F)"
+    }
+}
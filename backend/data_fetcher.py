@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import logging
 import os
-from datetime import datetime
+import shutil
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import numpy as np
 import pandas as pd
@@ -15,6 +18,14 @@ try:
 except Exception:  # pragma: no cover - optional dependency for demo
     xr = None
 
+from .chunked_store import DEFAULT_SPACE_CHUNK, DEFAULT_TIME_BLOCK, convert_to_chunked_store
+from .conditions import CONDITION_SETTINGS
+from .dataset_pool import PooledDataset, get_dataset_pool
+from .metrics import stage
+from .result_cache import CachedCell, ResultKey, copy_result, get_result_cache
+from .shards import GLOB_CHARACTERS
+from .stats_kernel import condition_statistics
+
 ROOT = Path(__file__).resolve().parents[1]
 PUBLIC_DIR = ROOT / "public"
 SAMPLE_NETCDF = PUBLIC_DIR / "sample_data" / "merra2_sample_denver_2018_2023.nc"
@@ -22,43 +33,17 @@ MOCK_JSON = PUBLIC_DIR / "mock-data" / "mockResponse.json"
 
 LOGGER = logging.getLogger(__name__)
 
-CONDITION_SETTINGS = {
-    "very_hot": {
-        "variable": "T2M_MAX",
-        "threshold": 32.2,
-        "unit": "°C",
-        "comparison": ">=",
-        "description": "Daily max temperature ≥ 32.2°C"
-    },
-    "very_cold": {
-        "variable": "T2M_MIN",
-        "threshold": 0.0,
-        "unit": "°C",
-        "comparison": "<=",
-        "description": "Daily min temperature ≤ 0°C (32°F freezing threshold)"
-    },
-    "very_wet": {
-        "variable": "PRECTOT",
-        "threshold": 10.0,
-        "unit": "mm/day",
-        "comparison": ">=",
-        "description": "Precipitation ≥ 10 mm/day"
-    },
-    "very_windy": {
-        "variable": "WS10M",
-        "threshold": 8.0,
-        "unit": "m/s",
-        "comparison": ">=",
-        "description": "Wind speed ≥ 8 m/s (≈18 mph)"
-    },
-    "very_uncomfortable": {
-        "variable": "T2M",
-        "threshold": 35.0,
-        "unit": "°C heat index (proxy)",
-        "comparison": ">=",
-        "description": "Heat index proxy ≥ 35°C (≈95°F)"
-    }
-}
+CLIMATOLOGY_FORMAT = 1
+# date_of_year is validated against a non-leap calendar, so targets run from 1 to 365.
+CLIMATOLOGY_DAYS = 365
+HISTORY_LIMIT = 120
+# Grid cells read per vectorized selection in batch queries; bounds the lat x lon box loaded.
+BATCH_CELL_CHUNK = 32
+CURVE_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+# Part of every query ETag; bump it when the /query response shape changes so clients refetch.
+QUERY_ETAG_VERSION = 1
+# Latitude rows read per pass when computing a probability grid; bounds window x rows x lon memory.
+GRID_LAT_BLOCK = 16
 
 VARIABLE_TRANSFORMS = {
     "T2M_MAX": lambda values: values - 273.15,
@@ -74,24 +59,7 @@ def _apply_transform(variable: str, values: np.ndarray) -> np.ndarray:
     return transform(values)
 
 
-def _compute_probability(values: np.ndarray, threshold: float, comparison: str) -> Optional[float]:
-    finite = values[np.isfinite(values)]
-    if finite.size == 0:
-        return None
-    if comparison == ">=":
-        hits = finite >= threshold
-    else:
-        hits = finite <= threshold
-    return float(np.mean(hits) * 100.0)
-
-
-def _compute_trend(values: np.ndarray) -> Optional[str]:
-    finite = values[np.isfinite(values)]
-    if finite.size < 12:
-        return None
-    midpoint = finite.size // 2
-    early_mean = float(np.mean(finite[:midpoint]))
-    late_mean = float(np.mean(finite[midpoint:]))
+def _trend_label(early_mean: float, late_mean: float) -> Optional[str]:
     if not np.isfinite(early_mean) or not np.isfinite(late_mean):
         return None
     if abs(early_mean) < 1e-6:
@@ -102,14 +70,219 @@ def _compute_trend(values: np.ndarray) -> Optional[str]:
     return f"{direction} {abs(percent_change):.1f}%"
 
 
+def _target_day_of_year(date_of_year: str) -> int:
+    month, day = map(int, date_of_year.split("-"))
+    target = datetime(2001, month, day)
+    return target.timetuple().tm_yday
+
+
+def _day_of_year_array(time_index_raw: Any) -> np.ndarray:
+    if hasattr(time_index_raw, "dayofyear"):
+        return np.asarray(time_index_raw.dayofyear)
+    time_index = pd.DatetimeIndex(time_index_raw)
+    return np.asarray(time_index.dayofyear)
+
+
+def _window_mask(doy_array: np.ndarray, target_doy: int, window_days: int) -> np.ndarray:
+    distance = np.abs(doy_array - target_doy)
+    return np.minimum(distance, 366 - distance) <= window_days
+
+
+def _circular_window_sums(per_day: np.ndarray, window_days: int) -> np.ndarray:
+    """Sum 366 day-of-year bins over every target day's circular window.
+
+    ``per_day[d - 1]`` holds the total for day of year ``d``; row ``t - 1`` of the result is
+    the total over the days :func:`_window_mask` would select for target ``t`` (1..365).
+    """
+    if 2 * window_days + 1 >= 366:
+        return np.repeat(per_day.sum(axis=0, keepdims=True), CLIMATOLOGY_DAYS, axis=0)
+    padded = np.concatenate([per_day[366 - window_days:], per_day, per_day[:window_days]])
+    cumulative = np.concatenate([np.zeros_like(padded[:1]), np.cumsum(padded, axis=0)])
+    width = 2 * window_days + 1
+    starts = np.arange(CLIMATOLOGY_DAYS)
+    return cumulative[starts + width] - cumulative[starts]
+
+
+def _covering_slice(index: pd.Index, low: float, high: float) -> slice:
+    """Smallest positional slice of a monotonic coordinate holding the nearest cell of every value in [low, high]."""
+    ends = index.get_indexer([low, high], method="nearest")
+    return slice(int(ends.min()), int(ends.max()) + 1)
+
+
+def _date_label(day_of_year: int) -> str:
+    return (datetime(2001, 1, 1) + timedelta(days=day_of_year - 1)).strftime("%m-%d")
+
+
+def _lowest_risk_windows(daily_risk: np.ndarray, length: int, count: int) -> List[Dict[str, Any]]:
+    """Pick up to ``count`` non-overlapping runs of ``length`` days with the lowest mean risk.
+
+    Runs may wrap from December into January; days without a risk value never qualify.
+    """
+    days = daily_risk.size
+    length = max(1, min(length, days))
+    wrapped = np.concatenate([daily_risk, daily_risk[:length - 1]])
+    cumulative = np.concatenate([[0.0], np.cumsum(np.nan_to_num(wrapped, nan=0.0))])
+    missing = np.concatenate([[0], np.cumsum(~np.isfinite(wrapped))])
+    starts = np.arange(days)
+    scores = (cumulative[starts + length] - cumulative[starts]) / length
+    scores[(missing[starts + length] - missing[starts]) > 0] = np.nan
+
+    chosen: List[Dict[str, Any]] = []
+    taken = np.zeros(days, dtype=bool)
+    for start in np.argsort(scores, kind="stable"):
+        if len(chosen) >= count or not np.isfinite(scores[start]):
+            break
+        span = (start + np.arange(length)) % days
+        if taken[span].any():
+            continue
+        taken[span] = True
+        chosen.append({
+            "start": _date_label(int(start) + 1),
+            "end": _date_label(int(span[-1]) + 1),
+            "mean_risk_percent": round(float(scores[start]), 1)
+        })
+    return chosen
+
+
+def exceedance_curve(ordered: np.ndarray, comparison: str, points: int) -> Dict[str, Any]:
+    """Probability of meeting ``comparison`` at ``points`` thresholds spanning a sorted sample.
+
+    Every threshold is answered by binary search, so the curve costs about the same as a
+    single probability once the sample is sorted.
+    """
+    if ordered.size == 0:
+        return {"comparison": comparison, "thresholds": [], "probability_percent": [], "percentiles": {}}
+    grid = np.linspace(ordered[0], ordered[-1], max(2, points))
+    if comparison == ">=":
+        counts = ordered.size - np.searchsorted(ordered, grid, side="left")
+    else:
+        counts = np.searchsorted(ordered, grid, side="right")
+    percentiles = np.percentile(ordered, CURVE_PERCENTILES)
+    return {
+        "comparison": comparison,
+        "thresholds": np.round(grid, 2).tolist(),
+        "probability_percent": np.round(counts / ordered.size * 100.0, 1).tolist(),
+        "percentiles": {f"p{rank}": round(float(value), 2) for rank, value in zip(CURVE_PERCENTILES, percentiles)}
+    }
+
+
+def _condition_result(
+    settings: Dict[str, Any],
+    probability: float,
+    historical_list: list[float],
+    trend: str,
+    threshold: Optional[float] = None
+) -> Dict[str, Any]:
+    return {
+        "probability_percent": round(probability, 1),
+        "threshold": {
+            "value": settings["threshold"] if threshold is None else threshold,
+            "unit": settings["unit"]
+        },
+        "historical_values": historical_list,
+        "trend": trend,
+        "description": settings["description"]
+    }
+
+
+def _required_variables(conditions: Sequence[str]) -> List[str]:
+    variables: List[str] = []
+    for condition in conditions:
+        settings = CONDITION_SETTINGS.get(condition)
+        if settings and settings["variable"] not in variables:
+            variables.append(settings["variable"])
+    return variables
+
+
+def _summarize_conditions(
+    conditions: Sequence[str],
+    series: Dict[str, Any],
+    thresholds: Optional[Dict[str, float]] = None,
+    curve_points: int = 0
+) -> Dict[str, Any]:
+    """Build per-condition results from windowed, untransformed values keyed by variable.
+
+    ``thresholds`` replaces the default cutoff for the conditions it names, and a positive
+    ``curve_points`` adds an ``exceedance_curve`` to every result.
+    """
+    selected: List[str] = []
+    variables: List[str] = []
+    for condition in conditions:
+        settings = CONDITION_SETTINGS.get(condition)
+        if not settings:
+            continue
+        variable = settings["variable"]
+        if variable not in series:
+            LOGGER.debug("Dataset missing variable %s required for %s", variable, condition)
+            continue
+        selected.append(condition)
+        if variable not in variables:
+            variables.append(variable)
+    if not selected:
+        return {}
+
+    rows = [_apply_transform(variable, np.asarray(series[variable], dtype=float).reshape(-1)) for variable in variables]
+    if len({row.size for row in rows}) == 1:
+        stacked = np.stack(rows)
+    else:
+        # Trailing NaN padding is never finite, so rows of unequal length keep their own samples.
+        stacked = np.full((len(rows), max(row.size for row in rows)), np.nan)
+        for index, row in enumerate(rows):
+            stacked[index, :row.size] = row
+
+    overrides = thresholds or {}
+    condition_thresholds = [
+        overrides.get(condition, CONDITION_SETTINGS[condition]["threshold"]) for condition in selected
+    ]
+    kernel = condition_statistics(
+        stacked,
+        [variables.index(CONDITION_SETTINGS[condition]["variable"]) for condition in selected],
+        condition_thresholds,
+        [CONDITION_SETTINGS[condition]["comparison"] == ">=" for condition in selected],
+        history_limit=HISTORY_LIMIT,
+        distribution=curve_points > 0
+    )
+
+    results: Dict[str, Any] = {}
+    for index, condition in enumerate(selected):
+        probability = kernel.probabilities[index]
+        if not np.isfinite(probability):
+            continue
+        settings = CONDITION_SETTINGS[condition]
+        summary = kernel.variables[variables.index(settings["variable"])]
+        trend: Optional[str] = None
+        if summary.early_mean is not None and summary.late_mean is not None:
+            trend = _trend_label(summary.early_mean, summary.late_mean)
+        results[condition] = _condition_result(
+            settings,
+            float(probability),
+            list(summary.history),
+            trend or "stable",
+            overrides.get(condition)
+        )
+        if curve_points > 0 and summary.ordered is not None:
+            curve = exceedance_curve(summary.ordered, settings["comparison"], curve_points)
+            curve["mean"] = round(summary.mean, 2)
+            curve["std"] = round(summary.std, 2)
+            results[condition]["exceedance_curve"] = curve
+
+    return results
+
+
 def _dataset_time_range(dataset: xr.Dataset) -> str:
     if "time" not in dataset:
         return "Unavailable"
     time_values = dataset["time"].values
     try:
-        time_index = pd.to_datetime(time_values)
-        start = time_index.min()
-        end = time_index.max()
+        time_index = dataset.indexes["time"] if "time" in dataset.indexes else pd.to_datetime(time_values)
+        time_index = pd.DatetimeIndex(time_index)
+        if time_index.is_monotonic_increasing:
+            # Sorted axes (every dataset the pool opens) need only their ends, not a full scan.
+            start = time_index[0]
+            end = time_index[-1]
+        else:
+            start = time_index.min()
+            end = time_index.max()
         if pd.isna(start) or pd.isna(end):
             raise ValueError
         return f"{start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}"
@@ -123,6 +296,138 @@ def _dataset_time_range(dataset: xr.Dataset) -> str:
 
 
 
+def _conditions_fingerprint() -> str:
+    spec = {
+        name: {
+            "variable": settings["variable"],
+            "threshold": settings["threshold"],
+            "comparison": settings["comparison"],
+            "transformed": settings["variable"] in VARIABLE_TRANSFORMS
+        }
+        for name, settings in CONDITION_SETTINGS.items()
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _canonical_uri(uri: str) -> str:
+    return uri if uri.startswith(("http://", "https://")) else os.path.abspath(uri)
+
+
+def climatology_path_for(dataset_uri: str, window_days: int) -> Optional[Path]:
+    """Where the climatology cube for a dataset lives (``WEATHERWISE_CLIMATOLOGY`` overrides)."""
+    override = os.getenv("WEATHERWISE_CLIMATOLOGY")
+    if override:
+        return Path(override)
+    if dataset_uri.startswith(("http://", "https://")):
+        return None
+    if any(character in dataset_uri for character in GLOB_CHARACTERS):
+        # A glob has no single file to sit next to; use its directory instead.
+        return Path(os.path.dirname(os.path.abspath(dataset_uri))) / f"shards.w{window_days}.climatology"
+    return Path(f"{dataset_uri.rstrip('/')}.w{window_days}.climatology")
+
+
+def climatology_generation_path(base: Path, version: str) -> Path:
+    """Cube built by ``ingest`` for one dataset version, kept beside the cube at ``base``."""
+    return base.with_name(f"{base.name}.{version}")
+
+
+def _contiguous_runs(positions: np.ndarray) -> list[np.ndarray]:
+    """Split sorted time positions into runs of consecutive indices."""
+    return np.split(positions, np.flatnonzero(np.diff(positions) > 1) + 1)
+
+
+class WindowIndex:
+    """Time positions inside every target day's circular window, built once per dataset.
+
+    ``positions_for(doy)`` returns the ascending integer positions whose day of year lies
+    within ``window_days`` of ``doy`` (wrapping across the year boundary), so queries can
+    select samples positionally instead of masking the whole time axis.
+    """
+
+    def __init__(self, doy_array: np.ndarray, window_days: int) -> None:
+        windows = [
+            np.flatnonzero(_window_mask(doy_array, target_doy, window_days))
+            for target_doy in range(1, CLIMATOLOGY_DAYS + 1)
+        ]
+        self.window_days = window_days
+        self.offsets = np.zeros(CLIMATOLOGY_DAYS + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([positions.size for positions in windows])
+        self.positions = np.concatenate(windows).astype(np.int64) if windows else np.zeros(0, dtype=np.int64)
+
+    @property
+    def samples(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def windows(self) -> List[np.ndarray]:
+        return [self.positions_for(target_doy) for target_doy in range(1, CLIMATOLOGY_DAYS + 1)]
+
+    def positions_for(self, target_doy: int) -> np.ndarray:
+        return self.positions[self.offsets[target_doy - 1]:self.offsets[target_doy]]
+
+
+class ClimatologyCube:
+    """Precomputed per-day-of-year exceedance counts for every grid cell.
+
+    Arrays are indexed ``[day_of_year - 1, condition, lat, lon]`` and memory-mapped from the
+    ``.npy`` files written by :func:`build_climatology_cube`, so a lookup costs a few page reads.
+    ``split`` (absent from older cubes) records where each cell's early half ends within the
+    window, which lets ``ingest`` append new days without rereading the series.
+    """
+
+    ARRAYS = ("lat", "lon", "hits", "valid", "early_sum", "late_sum", "samples", "window_offsets", "window_positions")
+    OPTIONAL_ARRAYS = ("split",)
+
+    def __init__(self, path: Path, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        self.path = path
+        self.meta = meta
+        self.lat = arrays["lat"]
+        self.lon = arrays["lon"]
+        self.hits = arrays["hits"]
+        self.valid = arrays["valid"]
+        self.early_sum = arrays["early_sum"]
+        self.late_sum = arrays["late_sum"]
+        self.samples = arrays["samples"]
+        self.window_offsets = arrays["window_offsets"]
+        self.window_positions = arrays["window_positions"]
+        self.split: Optional[np.ndarray] = arrays.get("split")
+        self._condition_index = {name: index for index, name in enumerate(meta["conditions"])}
+        self._lat_index = pd.Index(np.asarray(self.lat))
+        self._lon_index = pd.Index(np.asarray(self.lon))
+
+    @classmethod
+    def load(cls, path: Path) -> "ClimatologyCube":
+        with (path / "meta.json").open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta.get("format") != CLIMATOLOGY_FORMAT:
+            raise ValueError(f"Unsupported climatology format {meta.get('format')!r} in {path}")
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in cls.ARRAYS}
+        for name in cls.OPTIONAL_ARRAYS:
+            if (path / f"{name}.npy").exists():
+                arrays[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+        return cls(path, meta, arrays)
+
+    def matches(self, pooled: PooledDataset, window_days: int) -> bool:
+        return (
+            self.meta.get("dataset_uri") == _canonical_uri(pooled.uri)
+            and self.meta.get("dataset_version") == pooled.version
+            and self.meta.get("window_days") == window_days
+            and self.meta.get("fingerprint") == _conditions_fingerprint()
+        )
+
+    def condition_index(self, condition: str) -> Optional[int]:
+        return self._condition_index.get(condition)
+
+    def nearest_cell(self, lat: float, lon: float) -> tuple[int, int]:
+        lat_pos = int(self._lat_index.get_indexer([lat], method="nearest")[0])
+        lon_pos = int(self._lon_index.get_indexer([lon], method="nearest")[0])
+        return lat_pos, lon_pos
+
+    def positions_for(self, target_doy: int) -> np.ndarray:
+        start = int(self.window_offsets[target_doy - 1])
+        end = int(self.window_offsets[target_doy])
+        return np.asarray(self.window_positions[start:end])
+
+
 class WeatherDataFetcher:
     """Fetches NASA-derived weather probability data.
 
@@ -144,6 +449,7 @@ class WeatherDataFetcher:
         self.window_days = max(0, window_days)
         self.allow_mock_fallback = allow_mock_fallback
         self._dataset: Optional[xr.Dataset] = None
+        self._pooled: Optional[PooledDataset] = None
 
     def _load_mock(self) -> Dict[str, Any]:
         with MOCK_JSON.open("r", encoding="utf-8") as handle:
@@ -162,103 +468,294 @@ class WeatherDataFetcher:
                 "No dataset configured. Provide WEATHERWISE_DATASET or add the sample NetCDF under public/sample_data/."
             )
 
-        self._dataset = xr.open_dataset(candidate_uri)  # type: ignore[assignment]
+        with stage("dataset_open"):
+            self._pooled = get_dataset_pool().acquire(candidate_uri)
+        self._dataset = self._pooled.dataset
         return self._dataset
 
-    def _window_dataset(
+    def _window_index(self, dataset: xr.Dataset) -> WindowIndex:
+        key = ("window_index", self.window_days)
+        index = self._pooled.derived.get(key) if self._pooled is not None else None
+        if index is None:
+            index = WindowIndex(_day_of_year_array(dataset.indexes["time"]), self.window_days)
+            if self._pooled is not None:
+                self._pooled.derived[key] = index
+        return index
+
+    def _window_series(
         self,
         dataset: xr.Dataset,
-        lat: float,
-        lon: float,
-        date_of_year: str
-    ) -> tuple[xr.Dataset, float, float, int]:
-        selection = dataset.sel(lat=lat, lon=lon, method="nearest")
-
-        if "time" not in selection.dims:
+        lat_pos: int,
+        lon_pos: int,
+        date_of_year: str,
+        variables: Sequence[str]
+    ) -> tuple[Dict[str, np.ndarray], int]:
+        if "time" not in dataset.dims:
             raise ValueError("Dataset must include a 'time' dimension for temporal aggregation.")
 
-        time_index_raw = selection.indexes["time"]  # type: ignore[index]
-        if hasattr(time_index_raw, "dayofyear"):
-            doy_array = np.asarray(time_index_raw.dayofyear)
-        else:
-            time_index = pd.DatetimeIndex(time_index_raw)
-            doy_array = np.asarray(time_index.dayofyear)
-        month, day = map(int, date_of_year.split("-"))
-        target = datetime(2001, month, day)
-        target_doy = target.timetuple().tm_yday
+        positions = self._window_index(dataset).positions_for(_target_day_of_year(date_of_year))
+        if positions.size == 0:
+            raise ValueError("No records found for the requested date window.")
 
-        diff = np.minimum(np.abs(doy_array - target_doy), 366 - np.abs(doy_array - target_doy))
-        mask = diff <= self.window_days
+        # Read only the window's runs (one per year), not the years in between.
+        runs = _contiguous_runs(positions)
+        series: Dict[str, np.ndarray] = {}
+        for variable in variables:
+            if variable not in dataset:
+                continue
+            data = dataset[variable].isel(lat=lat_pos, lon=lon_pos, missing_dims="ignore")
+            series[variable] = np.concatenate([
+                np.asarray(data.isel(time=slice(int(run[0]), int(run[-1]) + 1)).values)
+                for run in runs
+            ])
+        return series, int(positions.size)
 
-        mask_array = xr.DataArray(mask, coords={"time": selection["time"]}, dims=["time"])
-        windowed = selection.where(mask_array, drop=True)
+    def _climatology(self) -> Optional[ClimatologyCube]:
+        if self._pooled is None:
+            return None
+        if os.getenv("WEATHERWISE_USE_CLIMATOLOGY", "1").lower() in {"0", "false", "no"}:
+            return None
+        path = climatology_path_for(self._pooled.uri, self.window_days)
+        if path is None:
+            return None
+        # An ingest writes the next version's cube before switching the dataset, so both exist.
+        generation = climatology_generation_path(path, self._pooled.version)
+        if (generation / "meta.json").exists():
+            path = generation
+        try:
+            stamp = (path / "meta.json").stat().st_mtime_ns
+        except OSError:
+            return None
 
-        time_size = int(windowed.sizes.get("time", 0))
-        if time_size == 0:
-            raise ValueError("No records found for the requested date window.")
-        resolved_lat = float(selection["lat"].values) if "lat" in selection.coords else float(lat)
-        resolved_lon = float(selection["lon"].values) if "lon" in selection.coords else float(lon)
-        return windowed, resolved_lat, resolved_lon, time_size
+        # Cached on the pooled handle so a reopened dataset re-validates its cube.
+        key = ("climatology", str(path))
+        cached = self._pooled.derived.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
 
-    def _build_from_dataset(
+        cube: Optional[ClimatologyCube]
+        try:
+            cube = ClimatologyCube.load(path)
+        except Exception as exc:
+            LOGGER.warning("Ignoring unreadable climatology cube %s: %s", path, exc)
+            cube = None
+        if cube is not None and not cube.matches(self._pooled, self.window_days):
+            LOGGER.info("Climatology cube %s does not match the dataset or window; using raw series", path)
+            cube = None
+        self._pooled.derived[key] = (stamp, cube)
+        return cube
+
+    def _history_from_positions(
+        self,
+        dataset: xr.Dataset,
+        variable: str,
+        lat_pos: int,
+        lon_pos: int,
+        positions: np.ndarray,
+        valid_count: int
+    ) -> list[float]:
+        needed = min(HISTORY_LIMIT, valid_count)
+        series = dataset[variable].isel(lat=lat_pos, lon=lon_pos)
+        take = min(positions.size, needed)
+        while True:
+            # One contiguous read is far cheaper than point-wise fancy indexing on NetCDF backends.
+            chosen = positions[:take]
+            span = series.isel(time=slice(int(chosen[0]), int(chosen[-1]) + 1)).values
+            values = np.asarray(span, dtype=float).flatten()[chosen - chosen[0]]
+            finite = _apply_transform(variable, values)
+            finite = finite[np.isfinite(finite)]
+            if finite.size >= needed or take >= positions.size:
+                break
+            take = min(positions.size, take * 2)
+        return np.round(finite[:needed], 1).tolist()
+
+    def _build_from_climatology(
         self,
+        cube: ClimatologyCube,
+        dataset: xr.Dataset,
         lat: float,
         lon: float,
         date_of_year: str,
         conditions: list[str]
     ) -> Dict[str, Any]:
-        if xr is None:
-            raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
-        dataset = self._ensure_dataset()
-        windowed, resolved_lat, resolved_lon, sample_count = self._window_dataset(
-            dataset,
-            lat,
-            lon,
-            date_of_year
-        )
+        target_doy = _target_day_of_year(date_of_year)
+        lat_pos, lon_pos = cube.nearest_cell(lat, lon)
+        positions = cube.positions_for(target_doy)
+        if positions.size == 0:
+            raise ValueError("No records found for the requested date window.")
 
         results: Dict[str, Any] = {}
-
         for condition in conditions:
             settings = CONDITION_SETTINGS.get(condition)
-            if not settings:
+            index = cube.condition_index(condition)
+            if not settings or index is None:
                 continue
-            variable = settings["variable"]
-            if variable not in windowed:
-                LOGGER.debug("Dataset missing variable %s required for %s", variable, condition)
+            cell = (target_doy - 1, index, lat_pos, lon_pos)
+            valid_count = int(cube.valid[cell])
+            if valid_count == 0:
                 continue
 
-            values = windowed[variable].values  # type: ignore[assignment]
-            values = np.asarray(values, dtype=float).flatten()
-            values = _apply_transform(variable, values)
+            probability = float(cube.hits[cell]) / valid_count * 100.0
+            trend: Optional[str] = None
+            if valid_count >= 12:
+                midpoint = valid_count // 2
+                early_mean = float(cube.early_sum[cell]) / midpoint
+                late_mean = float(cube.late_sum[cell]) / (valid_count - midpoint)
+                trend = _trend_label(early_mean, late_mean)
+            historical_list = self._history_from_positions(
+                dataset,
+                settings["variable"],
+                lat_pos,
+                lon_pos,
+                positions,
+                valid_count
+            )
+            results[condition] = _condition_result(settings, probability, historical_list, trend or "stable")
 
-            probability = _compute_probability(values, settings["threshold"], settings["comparison"])
-            if probability is None:
-                continue
+        metadata = self._query_metadata(
+            cube.meta["time_range"],
+            int(cube.samples[target_doy - 1]),
+            float(cube.lat[lat_pos]),
+            float(cube.lon[lon_pos])
+        )
+        return {"results": results, "metadata": metadata}
 
-            historical_sample = values[np.isfinite(values)]
-            rounded_sample = np.round(historical_sample, 1)
-            historical_list = rounded_sample.tolist()[:120]
-            trend = _compute_trend(historical_sample) or "stable"
-
-            results[condition] = {
-                "probability_percent": round(probability, 1),
-                "threshold": {
-                    "value": settings["threshold"],
-                    "unit": settings["unit"]
-                },
-                "historical_values": historical_list,
-                "trend": trend,
-                "description": settings["description"]
-            }
+    def _grid_cell(
+        self,
+        dataset: xr.Dataset,
+        cube: Optional[ClimatologyCube],
+        lat: float,
+        lon: float
+    ) -> Optional[tuple[int, int]]:
+        if cube is not None:
+            return cube.nearest_cell(lat, lon)
+        if "lat" not in dataset.indexes or "lon" not in dataset.indexes:
+            return None
+        lat_pos = int(dataset.indexes["lat"].get_indexer([lat], method="nearest")[0])
+        lon_pos = int(dataset.indexes["lon"].get_indexer([lon], method="nearest")[0])
+        return lat_pos, lon_pos
+
+    def _compute_from_dataset(
+        self,
+        dataset: xr.Dataset,
+        cube: Optional[ClimatologyCube],
+        cell_index: tuple[int, int],
+        lat: float,
+        lon: float,
+        date_of_year: str,
+        conditions: list[str],
+        thresholds: Optional[Dict[str, float]] = None,
+        curve_points: int = 0
+    ) -> Dict[str, Any]:
+        if cube is not None:
+            with stage("climatology"):
+                return self._build_from_climatology(cube, dataset, lat, lon, date_of_year, conditions)
+
+        lat_pos, lon_pos = cell_index
+        with stage("window"):
+            series, sample_count = self._window_series(
+                dataset,
+                lat_pos,
+                lon_pos,
+                date_of_year,
+                _required_variables(conditions)
+            )
+        with stage("stats"):
+            results = _summarize_conditions(conditions, series, thresholds, curve_points)
+
+        metadata = self._query_metadata(
+            _dataset_time_range(dataset),
+            sample_count,
+            float(dataset["lat"].values[lat_pos]),
+            float(dataset["lon"].values[lon_pos])
+        )
+        return {"results": results, "metadata": metadata}
+
+    def _build_from_dataset(
+        self,
+        lat: float,
+        lon: float,
+        date_of_year: str,
+        conditions: list[str],
+        thresholds: Optional[Dict[str, float]] = None,
+        curve_points: int = 0
+    ) -> Dict[str, Any]:
+        if xr is None:
+            raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+        dataset = self._ensure_dataset()
+        with stage("select"):
+            cube = self._climatology()
+            cell_index = self._grid_cell(dataset, cube, lat, lon)
+        if cell_index is None:
+            raise ValueError("Dataset must include 'lat' and 'lon' coordinates to select a grid point.")
+        if thresholds or curve_points > 0:
+            # The cube and the result cache only hold default-threshold answers; custom
+            # thresholds and curves are computed from the window's raw sample.
+            return self._compute_from_dataset(
+                dataset,
+                None,
+                cell_index,
+                lat,
+                lon,
+                date_of_year,
+                conditions,
+                thresholds,
+                curve_points
+            )
+        if self._pooled is None:
+            return self._compute_from_dataset(dataset, cube, cell_index, lat, lon, date_of_year, conditions)
+
+        # Nearby points snap to the same grid cell, so results are cached per cell rather than per lat/lon.
+        key = ResultKey(
+            self._pooled.uri,
+            self._pooled.version,
+            self.window_days,
+            cell_index[0],
+            cell_index[1],
+            _target_day_of_year(date_of_year)
+        )
+
+        cache = get_result_cache()
+        wanted = [condition for condition in dict.fromkeys(conditions) if condition in CONDITION_SETTINGS]
+        with stage("result_cache"):
+            cell = cache.lookup(key, wanted)
+        missing = wanted if cell is None else [condition for condition in wanted if condition not in cell.results]
+        if cell is None or missing:
+            computed = self._compute_from_dataset(dataset, cube, cell_index, lat, lon, date_of_year, missing)
+            computed_metadata = computed["metadata"]
+            cell = cache.store(
+                key,
+                CachedCell(
+                    time_range=computed_metadata["time_range"],
+                    samples=computed_metadata["samples"],
+                    lat=computed_metadata["grid_point"]["lat"],
+                    lon=computed_metadata["grid_point"]["lon"]
+                ),
+                {condition: computed["results"].get(condition) for condition in missing}
+            )
+
+        results: Dict[str, Any] = {}
+        for condition in conditions:
+            result = cell.results.get(condition)
+            if result is not None:
+                results[condition] = copy_result(result)
+        metadata = self._query_metadata(cell.time_range, cell.samples, cell.lat, cell.lon)
+        return {"results": results, "metadata": metadata}
 
+    def _query_metadata(
+        self,
+        time_range: str,
+        sample_count: int,
+        resolved_lat: float,
+        resolved_lon: float
+    ) -> Dict[str, Any]:
         dataset_label: Optional[str] = None
         if self.dataset_uri:
             dataset_label = os.path.basename(self.dataset_uri) if not self.dataset_uri.startswith("http") else self.dataset_uri
 
         metadata = {
             "data_source": os.getenv("WEATHERWISE_DATA_SOURCE", "MERRA-2 (NASA GES DISC)"),
-            "time_range": _dataset_time_range(dataset),
+            "time_range": time_range,
             "units": "Air temperature converted from Kelvin to °C, precipitation mm/day, wind m/s",
             "generated_at": datetime.utcnow().isoformat() + "Z",
             "window_days": self.window_days,
@@ -270,8 +767,19 @@ class WeatherDataFetcher:
         }
         if dataset_label:
             metadata["dataset_name"] = dataset_label
+        return metadata
 
-        return {"results": results, "metadata": metadata}
+    def warm(self, *, indexes: bool = True) -> Optional[xr.Dataset]:
+        """Open the dataset ahead of the first query and, with ``indexes``, build its window
+        index and climatology handle. Returns the dataset, or ``None`` in mock mode.
+        """
+        if self.force_mock is True:
+            return None
+        dataset = self._ensure_dataset()
+        if indexes:
+            self._window_index(dataset)
+            self._climatology()
+        return dataset
 
     def get_payload(self) -> Dict[str, Any]:
         if self.force_mock is True:
@@ -299,12 +807,20 @@ class WeatherDataFetcher:
             LOGGER.warning("Falling back to mock dataset: %s", exc)
             return self._load_mock()
 
-    def query(self, lat: float, lon: float, date_of_year: str, conditions: list[str]) -> Dict[str, Any]:
+    def query(
+        self,
+        lat: float,
+        lon: float,
+        date_of_year: str,
+        conditions: list[str],
+        thresholds: Optional[Dict[str, float]] = None,
+        curve_points: int = 0
+    ) -> Dict[str, Any]:
         if self.force_mock is True:
             payload = self._load_mock()
         else:
             try:
-                payload = self._build_from_dataset(lat, lon, date_of_year, conditions)
+                payload = self._build_from_dataset(lat, lon, date_of_year, conditions, thresholds, curve_points)
             except Exception as exc:
                 if self.force_mock is False or not self.allow_mock_fallback:
                     raise
@@ -317,8 +833,380 @@ class WeatherDataFetcher:
             "date_of_year": date_of_year,
             "conditions": conditions
         }
+        if thresholds:
+            payload["query"]["thresholds"] = thresholds
+        return payload
+
+    def query_etag(
+        self,
+        lat: float,
+        lon: float,
+        date_of_year: str,
+        conditions: list[str],
+        thresholds: Optional[Dict[str, float]] = None,
+        curve_points: int = 0
+    ) -> Optional[str]:
+        """Digest of everything a query's answer depends on, computed without reading any values.
+
+        Points that snap to the same grid cell share a digest. Only the echoed ``query`` and
+        ``generated_at`` differ between their responses, so the digest serves as a weak ETag.
+        ``None`` when the dataset cannot be opened (the query itself then reports or falls back).
+        """
+        if self.force_mock is True:
+            try:
+                source: List[Any] = ["mock", MOCK_JSON.stat().st_mtime_ns, lat, lon]
+            except OSError:
+                return None
+        else:
+            try:
+                dataset = self._ensure_dataset()
+                cell_index = self._grid_cell(dataset, self._climatology(), lat, lon)
+            except Exception:
+                return None
+            if cell_index is None or self._pooled is None:
+                return None
+            source = [self._pooled.uri, self._pooled.version, self.window_days, list(cell_index)]
+        spec = [
+            QUERY_ETAG_VERSION,
+            source,
+            _target_day_of_year(date_of_year),
+            list(conditions),
+            sorted((thresholds or {}).items()),
+            curve_points,
+            _conditions_fingerprint()
+        ]
+        return hashlib.sha256(json.dumps(spec).encode("utf-8")).hexdigest()[:32]
+
+    def _require_dataset_mode(self, feature: str) -> None:
+        if self.force_mock is True:
+            raise RuntimeError(f"{feature} needs a NetCDF dataset; mock mode only covers single queries.")
+        if xr is None:
+            raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+
+    def dataset_key(self) -> tuple[str, str, int]:
+        """URI, version and window size of the dataset being served, for keying derived caches."""
+        self._require_dataset_mode("This endpoint")
+        self._ensure_dataset()
+        assert self._pooled is not None
+        return self._pooled.uri, self._pooled.version, self.window_days
+
+    def probability_grid(
+        self,
+        condition: str,
+        date_of_year: str,
+        lat_range: tuple[float, float],
+        lon_range: tuple[float, float]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Probability of ``condition`` for every grid cell covering a lat/lon box.
+
+        Returns the covered latitudes, longitudes and a ``[lat, lon]`` array of percentages
+        (NaN where a cell has no finite samples). The whole block is evaluated at once, from
+        the climatology cube when available or from the window's samples otherwise.
+        """
+        settings = CONDITION_SETTINGS.get(condition)
+        if settings is None:
+            raise ValueError(f"Unknown condition {condition!r}.")
+        self._require_dataset_mode("Heatmap tiles")
+        dataset = self._ensure_dataset()
+        if "lat" not in dataset.indexes or "lon" not in dataset.indexes or "time" not in dataset.dims:
+            raise ValueError("Dataset must have 'time', 'lat' and 'lon' dimensions to build a grid.")
+        if settings["variable"] not in dataset:
+            raise ValueError(f"Dataset has no {settings['variable']} variable for {condition}.")
+
+        lat_slice = _covering_slice(dataset.indexes["lat"], *lat_range)
+        lon_slice = _covering_slice(dataset.indexes["lon"], *lon_range)
+        target_doy = _target_day_of_year(date_of_year)
+        cube = self._climatology()
+        index = cube.condition_index(condition) if cube is not None else None
+        if cube is not None and index is not None:
+            with stage("climatology"):
+                hits = np.asarray(cube.hits[target_doy - 1, index, lat_slice, lon_slice], dtype=float)
+                valid = np.asarray(cube.valid[target_doy - 1, index, lat_slice, lon_slice], dtype=float)
+        else:
+            with stage("window"):
+                positions = self._window_index(dataset).positions_for(target_doy)
+                hits, valid = self._window_counts(dataset, settings, positions, lat_slice, lon_slice)
+
+        probabilities = np.full(hits.shape, np.nan)
+        populated = valid > 0
+        probabilities[populated] = hits[populated] / valid[populated] * 100.0
+        lat_values = np.asarray(dataset.indexes["lat"][lat_slice], dtype=float)
+        lon_values = np.asarray(dataset.indexes["lon"][lon_slice], dtype=float)
+        return lat_values, lon_values, probabilities
+
+    def _window_counts(
+        self,
+        dataset: xr.Dataset,
+        settings: Dict[str, Any],
+        positions: np.ndarray,
+        lat_slice: slice,
+        lon_slice: slice
+    ) -> tuple[np.ndarray, np.ndarray]:
+        variable = settings["variable"]
+        data = dataset[variable].transpose("time", "lat", "lon")
+        lat_count = len(range(*lat_slice.indices(dataset.sizes["lat"])))
+        lon_count = len(range(*lon_slice.indices(dataset.sizes["lon"])))
+        hits = np.zeros((lat_count, lon_count))
+        valid = np.zeros((lat_count, lon_count))
+        if positions.size == 0:
+            return hits, valid
+
+        # Each year contributes one contiguous run of window days; reading runs skips the rest of the year.
+        runs = _contiguous_runs(positions)
+        lat_start = lat_slice.start or 0
+        for offset in range(0, lat_count, GRID_LAT_BLOCK):
+            rows = slice(lat_start + offset, lat_start + min(lat_count, offset + GRID_LAT_BLOCK))
+            block = np.concatenate([
+                np.asarray(data.isel(time=slice(int(run[0]), int(run[-1]) + 1), lat=rows, lon=lon_slice).values, dtype=float)
+                for run in runs
+            ])
+            block = _apply_transform(variable, block)
+            finite = np.isfinite(block)
+            if settings["comparison"] == ">=":
+                hit = block >= settings["threshold"]
+            else:
+                hit = block <= settings["threshold"]
+            hit &= finite
+            target = slice(offset, offset + block.shape[1])
+            hits[target] = np.count_nonzero(hit, axis=0)
+            valid[target] = np.count_nonzero(finite, axis=0)
+        return hits, valid
+
+    def _calendar_counts(
+        self,
+        dataset: xr.Dataset,
+        cube: Optional[ClimatologyCube],
+        cell_index: tuple[int, int],
+        conditions: Sequence[str]
+    ) -> tuple[np.ndarray, Dict[str, tuple[np.ndarray, np.ndarray]]]:
+        """Window sample counts plus per-condition (hits, valid) counts for targets 1..365."""
+        lat_pos, lon_pos = cell_index
+        counts: Dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        if cube is not None:
+            for condition in conditions:
+                index = cube.condition_index(condition)
+                if index is not None:
+                    cell = (slice(None), index, lat_pos, lon_pos)
+                    counts[condition] = (np.asarray(cube.hits[cell]), np.asarray(cube.valid[cell]))
+            return np.asarray(cube.samples), counts
+
+        if "time" not in dataset.dims:
+            raise ValueError("Dataset must include a 'time' dimension for temporal aggregation.")
+        # Bin the point's whole series by day of year once, then slide the window over the bins.
+        day_bins = _day_of_year_array(dataset.indexes["time"]) - 1
+        samples = _circular_window_sums(np.bincount(day_bins, minlength=366), self.window_days)
+        series: Dict[str, np.ndarray] = {}
+        for condition in conditions:
+            settings = CONDITION_SETTINGS.get(condition)
+            if not settings or settings["variable"] not in dataset:
+                continue
+            variable = settings["variable"]
+            if variable not in series:
+                raw = dataset[variable].isel(lat=lat_pos, lon=lon_pos, missing_dims="ignore").values
+                series[variable] = _apply_transform(variable, np.asarray(raw, dtype=float).reshape(-1))
+            values = series[variable]
+            finite = np.isfinite(values)
+            with np.errstate(invalid="ignore"):
+                if settings["comparison"] == ">=":
+                    hit = finite & (values >= settings["threshold"])
+                else:
+                    hit = finite & (values <= settings["threshold"])
+            per_day = np.stack([
+                np.bincount(day_bins, weights=hit, minlength=366),
+                np.bincount(day_bins, weights=finite, minlength=366)
+            ], axis=1)
+            window_sums = _circular_window_sums(per_day, self.window_days)
+            counts[condition] = (window_sums[:, 0], window_sums[:, 1])
+        return samples, counts
+
+    def risk_calendar(
+        self,
+        lat: float,
+        lon: float,
+        conditions: list[str],
+        *,
+        top_n: int = 0,
+        window_length: int = 7
+    ) -> Dict[str, Any]:
+        """Probability and sample count for every day of the year at one location.
+
+        Exceedances are binned by day of year and summed over each day's circular window in
+        one vectorized pass (or read straight from the climatology cube). With ``top_n`` the
+        lowest-risk runs of ``window_length`` days are returned too, scoring each day by its
+        highest condition probability.
+        """
+        self._require_dataset_mode("The risk calendar")
+        dataset = self._ensure_dataset()
+        with stage("select"):
+            cube = self._climatology()
+            cell_index = self._grid_cell(dataset, cube, lat, lon)
+        if cell_index is None:
+            raise ValueError("Dataset must include 'lat' and 'lon' coordinates to select a grid point.")
+
+        with stage("window"):
+            samples, counts = self._calendar_counts(dataset, cube, cell_index, conditions)
+        probabilities: Dict[str, np.ndarray] = {}
+        for condition, (hits, valid) in counts.items():
+            with np.errstate(invalid="ignore", divide="ignore"):
+                probabilities[condition] = np.where(valid > 0, hits / np.maximum(valid, 1) * 100.0, np.nan)
+
+        days: List[Dict[str, Any]] = []
+        for day_index in range(CLIMATOLOGY_DAYS):
+            results: Dict[str, Any] = {}
+            for condition in conditions:
+                if condition not in probabilities or condition in results:
+                    continue
+                probability = probabilities[condition][day_index]
+                if np.isfinite(probability):
+                    results[condition] = {
+                        "probability_percent": round(float(probability), 1),
+                        "samples": int(counts[condition][1][day_index])
+                    }
+            days.append({
+                "date_of_year": _date_label(day_index + 1),
+                "samples": int(samples[day_index]),
+                "results": results
+            })
+
+        lat_pos, lon_pos = cell_index
+        if cube is not None:
+            time_range = cube.meta["time_range"]
+            resolved_lat, resolved_lon = float(cube.lat[lat_pos]), float(cube.lon[lon_pos])
+        else:
+            time_range = _dataset_time_range(dataset)
+            resolved_lat, resolved_lon = float(dataset["lat"].values[lat_pos]), float(dataset["lon"].values[lon_pos])
+        metadata = self._query_metadata(time_range, int(np.max(samples)) if samples.size else 0, resolved_lat, resolved_lon)
+        payload: Dict[str, Any] = {
+            "query": {"location": {"lat": lat, "lon": lon}, "conditions": conditions},
+            "days": days,
+            "metadata": metadata
+        }
+        if top_n > 0:
+            if probabilities:
+                with np.errstate(invalid="ignore"):
+                    daily_risk = np.fmax.reduce(np.stack(list(probabilities.values())), axis=0)
+            else:
+                daily_risk = np.full(CLIMATOLOGY_DAYS, np.nan)
+            payload["best_windows"] = _lowest_risk_windows(daily_risk, window_length, top_n)
         return payload
 
+    def _batch_from_dataset(self, items: Sequence[Dict[str, Any]], outcomes: List[Any]) -> None:
+        if xr is None:
+            raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+        # The climatology cube is not consulted here: its per-item history reads cost more than
+        # one vectorized read of every requested cell, and both paths produce the same payload.
+        dataset = self._ensure_dataset()
+        if "time" not in dataset.dims:
+            raise ValueError("Dataset must include a 'time' dimension for temporal aggregation.")
+
+        # Resolve every point to its grid cell at once; items on the same cell share one read.
+        with stage("select"):
+            lat_index = dataset.indexes["lat"]
+            lon_index = dataset.indexes["lon"]
+            lat_pos = lat_index.get_indexer(np.asarray([item["lat"] for item in items], dtype=float), method="nearest")
+            lon_pos = lon_index.get_indexer(np.asarray([item["lon"] for item in items], dtype=float), method="nearest")
+            cells, cell_of_item = np.unique(np.stack([lat_pos, lon_pos], axis=1), axis=0, return_inverse=True)
+            cell_of_item = np.asarray(cell_of_item).reshape(-1)
+
+        window_index = self._window_index(dataset)
+        windows: Dict[int, np.ndarray] = {}
+        for index, item in enumerate(items):
+            try:
+                target_doy = _target_day_of_year(item["date_of_year"])
+            except ValueError as exc:
+                outcomes[index] = exc
+                continue
+            if target_doy not in windows:
+                windows[target_doy] = window_index.positions_for(target_doy)
+
+        populated = [positions for positions in windows.values() if positions.size]
+        if not populated:
+            for index in range(len(items)):
+                if outcomes[index] is None:
+                    outcomes[index] = ValueError("No records found for the requested date window.")
+            return
+        first = int(min(positions[0] for positions in populated))
+        last = int(max(positions[-1] for positions in populated))
+
+        variables = [
+            variable
+            for variable in _required_variables([c for item in items for c in item["conditions"]])
+            if variable in dataset
+        ]
+        series_by_variable: Dict[str, np.ndarray] = {}
+        with stage("window"):
+            for variable in variables:
+                data = dataset[variable].isel(time=slice(first, last + 1))
+                columns = []
+                for start in range(0, len(cells), BATCH_CELL_CHUNK):
+                    chunk = cells[start:start + BATCH_CELL_CHUNK]
+                    picked = data.isel(
+                        lat=xr.DataArray(chunk[:, 0], dims="cell"),
+                        lon=xr.DataArray(chunk[:, 1], dims="cell")
+                    )
+                    columns.append(np.asarray(picked.transpose("time", "cell").values))
+                series_by_variable[variable] = np.concatenate(columns, axis=1)
+
+        time_range = _dataset_time_range(dataset)
+        with stage("stats"):
+            for index, item in enumerate(items):
+                if outcomes[index] is not None:
+                    continue
+                try:
+                    positions = windows[_target_day_of_year(item["date_of_year"])]
+                    if positions.size == 0:
+                        raise ValueError("No records found for the requested date window.")
+                    column = int(cell_of_item[index])
+                    offsets = positions - first
+                    series = {variable: values[offsets, column] for variable, values in series_by_variable.items()}
+                    results = _summarize_conditions(
+                        item["conditions"],
+                        series,
+                        item.get("thresholds"),
+                        item.get("curve_points", 0)
+                    )
+                    metadata = self._query_metadata(
+                        time_range,
+                        int(positions.size),
+                        float(lat_index[int(lat_pos[index])]),
+                        float(lon_index[int(lon_pos[index])])
+                    )
+                    outcomes[index] = {"results": results, "metadata": metadata}
+                except Exception as exc:
+                    outcomes[index] = exc
+
+    def query_batch(self, items: Sequence[Dict[str, Any]]) -> List[Any]:
+        """Evaluate many ``lat``/``lon``/``date_of_year``/``conditions`` items together.
+
+        Returns one entry per item, in order: the payload :meth:`query` would have returned,
+        or the exception raised for that item.
+        """
+        outcomes: List[Any] = [None] * len(items)
+        if self.force_mock is not True and items:
+            try:
+                self._batch_from_dataset(items, outcomes)
+            except Exception as exc:
+                outcomes = [exc] * len(items)
+
+        for index, item in enumerate(items):
+            outcome = outcomes[index]
+            if isinstance(outcome, Exception):
+                if self.force_mock is False or not self.allow_mock_fallback:
+                    continue
+                LOGGER.warning("Falling back to mock dataset for batch item %d: %s", index, outcome)
+                outcome = self._load_mock()
+            elif outcome is None:
+                outcome = self._load_mock()
+            outcome["query"] = {
+                "location": {"lat": item["lat"], "lon": item["lon"]},
+                "date_of_year": item["date_of_year"],
+                "conditions": item["conditions"]
+            }
+            if item.get("thresholds"):
+                outcome["query"]["thresholds"] = item["thresholds"]
+            outcomes[index] = outcome
+        return outcomes
+
 
 def get_fetcher(force_mock: Optional[bool] = None) -> WeatherDataFetcher:
     if force_mock is None:
@@ -336,3 +1224,261 @@ def get_fetcher(force_mock: Optional[bool] = None) -> WeatherDataFetcher:
         window_days=window_days,
         allow_mock_fallback=allow_mock_fallback
     )
+
+
+def run_query(
+    lat: float,
+    lon: float,
+    date_of_year: str,
+    conditions: list[str],
+    thresholds: Optional[Dict[str, float]] = None,
+    curve_points: int = 0
+) -> Dict[str, Any]:
+    """Module-level entry point so the query can be shipped to a worker thread or process."""
+    return get_fetcher().query(
+        lat=lat,
+        lon=lon,
+        date_of_year=date_of_year,
+        conditions=conditions,
+        thresholds=thresholds,
+        curve_points=curve_points
+    )
+
+
+def run_query_etag(
+    lat: float,
+    lon: float,
+    date_of_year: str,
+    conditions: list[str],
+    thresholds: Optional[Dict[str, float]] = None,
+    curve_points: int = 0
+) -> Optional[str]:
+    return get_fetcher().query_etag(lat, lon, date_of_year, conditions, thresholds, curve_points)
+
+
+def run_query_batch(items: List[Dict[str, Any]]) -> List[Any]:
+    return get_fetcher().query_batch(items)
+
+
+def run_risk_calendar(
+    lat: float,
+    lon: float,
+    conditions: list[str],
+    top_n: int = 0,
+    window_length: int = 7
+) -> Dict[str, Any]:
+    return get_fetcher().risk_calendar(lat, lon, conditions, top_n=top_n, window_length=window_length)
+
+
+def _accumulate_climatology_block(
+    block: np.ndarray,
+    windows: Sequence[np.ndarray],
+    settings: Dict[str, Any],
+    out: Dict[str, np.ndarray],
+    condition_index: int,
+    lat_slice: slice
+) -> None:
+    finite = np.isfinite(block)
+    filled = np.where(finite, block, 0.0)
+    with np.errstate(invalid="ignore"):
+        if settings["comparison"] == ">=":
+            hit = finite & (block >= settings["threshold"])
+        else:
+            hit = finite & (block <= settings["threshold"])
+
+    for day_index, positions in enumerate(windows):
+        window_finite = finite[positions]
+        window_values = filled[positions]
+        valid = window_finite.sum(axis=0)
+        # The trend splits the finite samples (in time order) into an early and a late half.
+        ordinal = np.cumsum(window_finite, axis=0)
+        early = window_finite & (ordinal <= (valid // 2))
+        late = window_finite & ~early
+
+        target = (day_index, condition_index, lat_slice)
+        out["hits"][target] = hit[positions].sum(axis=0)
+        out["valid"][target] = valid
+        out["early_sum"][target] = np.where(early, window_values, 0.0).sum(axis=0)
+        out["late_sum"][target] = np.where(late, window_values, 0.0).sum(axis=0)
+        # Window index just past the last early sample.
+        midpoint = valid // 2
+        out["split"][target] = (ordinal < midpoint).sum(axis=0) + (midpoint > 0)
+
+
+def compute_climatology_arrays(
+    dataset: xr.Dataset,
+    window_days: int,
+    *,
+    lat_block: int = 8
+) -> tuple[Dict[str, np.ndarray], List[str]]:
+    """Every array of a climatology cube for ``dataset``, plus the conditions it covers."""
+    if "time" not in dataset.dims or "lat" not in dataset.dims or "lon" not in dataset.dims:
+        raise ValueError("Dataset must have 'time', 'lat' and 'lon' dimensions to build a climatology.")
+
+    window_index = WindowIndex(_day_of_year_array(dataset.indexes["time"]), window_days)
+    windows = window_index.windows()
+    conditions = [name for name, settings in CONDITION_SETTINGS.items() if settings["variable"] in dataset]
+    lat_values = np.asarray(dataset["lat"].values)
+    lon_values = np.asarray(dataset["lon"].values)
+
+    shape = (CLIMATOLOGY_DAYS, len(conditions), lat_values.size, lon_values.size)
+    out = {
+        "hits": np.zeros(shape, dtype=np.int32),
+        "valid": np.zeros(shape, dtype=np.int32),
+        "early_sum": np.zeros(shape, dtype=np.float64),
+        "late_sum": np.zeros(shape, dtype=np.float64),
+        "split": np.zeros(shape, dtype=np.int32)
+    }
+    step = max(1, lat_block)
+    for condition_index, condition in enumerate(conditions):
+        settings = CONDITION_SETTINGS[condition]
+        variable = settings["variable"]
+        data = dataset[variable].transpose("time", "lat", "lon")
+        for start in range(0, lat_values.size, step):
+            lat_slice = slice(start, start + step)
+            block = np.asarray(data.isel(lat=lat_slice).values, dtype=float)
+            block = _apply_transform(variable, block)
+            _accumulate_climatology_block(block, windows, settings, out, condition_index, lat_slice)
+        LOGGER.info("Climatology: finished %s", condition)
+
+    arrays = {
+        **out,
+        "lat": lat_values,
+        "lon": lon_values,
+        "samples": window_index.samples.astype(np.int32),
+        "window_offsets": window_index.offsets,
+        "window_positions": window_index.positions.astype(np.int32)
+    }
+    return arrays, conditions
+
+
+def write_climatology_cube(target: Path, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Path:
+    """Write a cube directory through a staging copy so readers never see a partial one."""
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(staging / f"{name}.npy", array)
+    with (staging / "meta.json").open("w", encoding="utf-8") as handle:
+        json.dump(meta, handle, indent=2)
+
+    if target.exists():
+        shutil.rmtree(target)
+    os.replace(staging, target)
+    return target
+
+
+def build_climatology_cube(
+    dataset_uri: str,
+    output: Optional[str] = None,
+    *,
+    window_days: int,
+    lat_block: int = 8
+) -> Path:
+    """Precompute windowed exceedance counts and trend sums for every cell and day of year.
+
+    The result is a directory of ``.npy`` arrays plus ``meta.json`` recording the dataset
+    version, window and thresholds it was built for; :class:`WeatherDataFetcher` only uses a
+    cube whose metadata matches the dataset it is serving.
+    """
+    if xr is None:
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+
+    window_days = max(0, window_days)
+    pooled = get_dataset_pool().acquire(dataset_uri)
+    dataset = pooled.dataset
+
+    target = Path(output) if output else climatology_path_for(dataset_uri, window_days)
+    if target is None:
+        raise ValueError("Remote datasets need an explicit output path (or WEATHERWISE_CLIMATOLOGY).")
+
+    arrays, conditions = compute_climatology_arrays(dataset, window_days, lat_block=lat_block)
+    meta = {
+        "format": CLIMATOLOGY_FORMAT,
+        "dataset_uri": _canonical_uri(dataset_uri),
+        "dataset_version": pooled.version,
+        "window_days": window_days,
+        "fingerprint": _conditions_fingerprint(),
+        "conditions": conditions,
+        "time_range": _dataset_time_range(dataset),
+        "built_at": datetime.utcnow().isoformat() + "Z"
+    }
+    return write_climatology_cube(target, arrays, meta)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.data_fetcher",
+        description="Offline maintenance tasks for WeatherWise datasets."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build-climatology", help="Precompute the day-of-year climatology cube.")
+    build.add_argument("dataset", nargs="?", default=os.getenv("WEATHERWISE_DATASET"))
+    build.add_argument("--window-days", type=int, default=int(os.getenv("WEATHERWISE_WINDOW_DAYS", "3")))
+    build.add_argument("--output", help="Output directory (defaults to <dataset>.w<window>.climatology)")
+    build.add_argument("--lat-block", type=int, default=8, help="Latitude rows processed per pass")
+
+    convert = commands.add_parser(
+        "convert-store",
+        help="Rewrite NetCDF data as a point-major chunked store for fast time-series reads."
+    )
+    convert.add_argument("source", help="NetCDF file or directory of NetCDF files")
+    convert.add_argument("output", help="Output path; a .zarr suffix writes Zarr (needs the zarr package)")
+    convert.add_argument("--time-chunk", type=int, default=0, help="Time steps per chunk (0 = whole series)")
+    convert.add_argument("--space-chunk", type=int, default=DEFAULT_SPACE_CHUNK, help="Lat/lon cells per chunk side")
+    convert.add_argument("--time-block", type=int, default=DEFAULT_TIME_BLOCK, help="Time steps copied per pass")
+    convert.add_argument("--compress", action="store_true", help="Apply light zlib compression (NetCDF only)")
+
+    ingest = commands.add_parser(
+        "ingest",
+        help="Append new daily records to a manifest dataset and update its climatology incrementally."
+    )
+    ingest.add_argument("records", nargs="+", help="NetCDF files with the new days (older days are skipped)")
+    ingest.add_argument("--dataset", default=os.getenv("WEATHERWISE_DATASET"), help="JSON manifest of the served dataset")
+    ingest.add_argument("--window-days", type=int, default=int(os.getenv("WEATHERWISE_WINDOW_DAYS", "3")))
+    ingest.add_argument("--lat-block", type=int, default=8, help="Latitude rows processed per pass")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.command == "build-climatology":
+        if not args.dataset:
+            parser.error("dataset is required (or set WEATHERWISE_DATASET)")
+        path = build_climatology_cube(
+            args.dataset,
+            args.output,
+            window_days=args.window_days,
+            lat_block=args.lat_block
+        )
+        print(f"Climatology cube written to {path}")
+    elif args.command == "convert-store":
+        path = convert_to_chunked_store(
+            args.source,
+            args.output,
+            time_chunk=args.time_chunk,
+            space_chunk=args.space_chunk,
+            time_block=args.time_block,
+            compress=args.compress
+        )
+        print(f"Chunked store written to {path}; point WEATHERWISE_DATASET at it to serve it.")
+    elif args.command == "ingest":
+        from .ingest import ingest_records
+
+        if not args.dataset:
+            parser.error("--dataset is required (or set WEATHERWISE_DATASET)")
+        report = ingest_records(args.dataset, args.records, window_days=max(0, args.window_days), lat_block=args.lat_block)
+        for note in report.notes:
+            print(note)
+        if report.days_added:
+            print(
+                f"Appended {report.days_added} days as {report.shard} ({report.time_range}) in {report.seconds}s; "
+                f"climatology {report.climatology_mode}"
+                + (f" for {report.affected_days_of_year} days of year" if report.climatology_mode == "incremental" else "")
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
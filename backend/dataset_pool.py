@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+# How long a handle replaced by a reload or evicted stays open for requests that are still reading it.
+RETIRE_GRACE_SECONDS = 60.0
+# Zarr v2 stores carry .zgroup/.zmetadata; v3 stores (written by zarr 3) a zarr.json.
+ZARR_MARKERS = (".zmetadata", ".zgroup", "zarr.json")
+
+FileSignature = Tuple[int, int]
+
+
+@dataclass
+class PooledDataset:
+    """An open dataset handle plus the bookkeeping the pool needs to reuse it."""
+
+    uri: str
+    dataset: Any
+    signature: Optional[FileSignature]
+    version: str
+    opened_at: float
+    derived: Dict[str, Any] = field(default_factory=dict)
+
+
+def _is_remote(uri: str) -> bool:
+    return uri.startswith(("http://", "https://"))
+
+
+def _file_signature(uri: str) -> Optional[FileSignature]:
+    if _is_remote(uri):
+        return None
+    from .shards import cached_sharded_signature, is_sharded_source
+
+    if is_sharded_source(uri):
+        return cached_sharded_signature(uri)
+    target = uri
+    if os.path.isdir(uri):
+        # A Zarr store's chunks live in subdirectories; its metadata file is rewritten on every update.
+        target = next(
+            (os.path.join(uri, marker) for marker in ZARR_MARKERS if os.path.exists(os.path.join(uri, marker))),
+            uri
+        )
+    try:
+        stat = os.stat(target)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _version_for(signature: Optional[FileSignature]) -> str:
+    # Remote (OPeNDAP) datasets expose no cheap change marker; they are treated as immutable.
+    if signature is None:
+        return "static"
+    mtime_ns, size = signature
+    return f"{mtime_ns:x}-{size:x}"
+
+
+def _open_dataset(uri: str) -> Any:
+    from .chunked_store import open_store
+    from .shared_arrays import open_shared_if_current
+
+    shared = open_shared_if_current(uri)
+    return shared if shared is not None else open_store(uri)
+
+
+def _close_quietly(entry: PooledDataset) -> None:
+    close = getattr(entry.dataset, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception:  # pragma: no cover - best effort cleanup
+        LOGGER.debug("Failed to close dataset %s", entry.uri, exc_info=True)
+
+
+class DatasetPool:
+    """Thread-safe, LRU-bounded registry of open datasets keyed by URI.
+
+    Local files are re-stat'ed on every acquire (shard sets less often, see
+    ``cached_sharded_signature``); a changed mtime or size causes the handle to be
+    reopened so a swapped file is picked up without restarting the server. Handles
+    replaced by a reload, evicted by the LRU bound or invalidated are closed once
+    ``retire_grace`` seconds have passed, so in-flight reads can finish; the close happens
+    on the next :meth:`acquire`, :meth:`stats` or :meth:`sweep` after that.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_POOL_SIZE,
+        opener: Optional[Callable[[str], Any]] = None,
+        retire_grace: float = RETIRE_GRACE_SECONDS
+    ) -> None:
+        self.max_size = max(1, max_size)
+        self.retire_grace = max(0.0, retire_grace)
+        self._opener = opener or _open_dataset
+        self._entries: "OrderedDict[str, PooledDataset]" = OrderedDict()
+        self._retired: List[Tuple[float, PooledDataset]] = []
+        self._lock = threading.Lock()
+        self._uri_locks: Dict[str, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._evictions = 0
+        self._open_seconds_total = 0.0
+        self._open_seconds_last = 0.0
+
+    def _lookup(self, uri: str, signature: Optional[FileSignature]) -> Optional[PooledDataset]:
+        entry = self._entries.get(uri)
+        if entry is None or entry.signature != signature:
+            return None
+        self._entries.move_to_end(uri)
+        self._hits += 1
+        return entry
+
+    def _expired_locked(self) -> List[PooledDataset]:
+        now = time.monotonic()
+        expired = [entry for deadline, entry in self._retired if deadline <= now]
+        if expired:
+            self._retired = [(deadline, entry) for deadline, entry in self._retired if deadline > now]
+        return expired
+
+    def sweep(self) -> int:
+        """Close retired handles whose grace period is over; returns how many were closed."""
+        with self._lock:
+            expired = self._expired_locked() if self._retired else []
+        for old in expired:
+            _close_quietly(old)
+        return len(expired)
+
+    def acquire(self, uri: str) -> PooledDataset:
+        signature = _file_signature(uri)
+        with self._lock:
+            expired = self._expired_locked() if self._retired else []
+            entry = self._lookup(uri, signature)
+            if entry is None:
+                uri_lock = self._uri_locks.setdefault(uri, threading.Lock())
+        for old in expired:
+            _close_quietly(old)
+        if entry is not None:
+            return entry
+
+        # Only one thread opens a given URI; the others wait and then reuse its handle.
+        with uri_lock:
+            with self._lock:
+                entry = self._lookup(uri, signature)
+                if entry is not None:
+                    return entry
+                self._misses += 1
+
+            started = time.perf_counter()
+            dataset = self._opener(uri)
+            elapsed = time.perf_counter() - started
+
+            entry = PooledDataset(
+                uri=uri,
+                dataset=dataset,
+                signature=signature,
+                version=_version_for(signature),
+                opened_at=time.time()
+            )
+            with self._lock:
+                self._open_seconds_total += elapsed
+                self._open_seconds_last = elapsed
+                deadline = time.monotonic() + self.retire_grace
+                stale = self._entries.pop(uri, None)
+                if stale is not None:
+                    self._reloads += 1
+                    self._retired.append((deadline, stale))
+                    LOGGER.info("Dataset %s changed on disk; reopened", uri)
+                self._entries[uri] = entry
+                while len(self._entries) > self.max_size:
+                    # Another thread may have acquired the evicted handle moments ago; retire it too.
+                    _, evicted = self._entries.popitem(last=False)
+                    self._evictions += 1
+                    self._retired.append((deadline, evicted))
+        return entry
+
+    def invalidate(self, uri: Optional[str] = None) -> None:
+        """Drop one URI (or every URI) from the pool; the handles are retired like reloaded ones."""
+        with self._lock:
+            if uri is None:
+                removed = list(self._entries.values())
+                self._entries.clear()
+            else:
+                entry = self._entries.pop(uri, None)
+                removed = [entry] if entry is not None else []
+            # Readers that acquired the handle before the invalidation may still be using it.
+            deadline = time.monotonic() + self.retire_grace
+            self._retired.extend((deadline, entry) for entry in removed)
+
+    def stats(self) -> Dict[str, Any]:
+        # /stats is polled even when no queries arrive, so it also closes expired handles.
+        self.sweep()
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "evictions": self._evictions,
+                "retired": len(self._retired),
+                "open_seconds_total": round(self._open_seconds_total, 6),
+                "open_seconds_last": round(self._open_seconds_last, 6),
+                "datasets": list(self._entries.keys())
+            }
+
+
+_POOL: Optional[DatasetPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_dataset_pool() -> DatasetPool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                size = int(os.getenv("WEATHERWISE_DATASET_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+                _POOL = DatasetPool(max_size=size)
+    return _POOL
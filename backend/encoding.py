@@ -0,0 +1,200 @@
+"""
+Response encodings for the query endpoints.
+
+JSON stays the default and is written with ``orjson`` when it is installed (a few times
+faster than the standard library for payloads full of floats). Clients that send
+``Accept: application/msgpack`` get MessagePack instead, with every numeric list of
+:data:`PACK_MIN_LENGTH` or more values packed into a MessagePack extension:
+
+* ext ``1`` — little-endian float32 values;
+* ext ``2`` — values that are exact multiples of ``10 ** -decimals`` (history values are
+  rounded to 0.1): a ``<BBi`` header (decimals, delta width in bytes, first value scaled
+  to an integer) followed by the scaled differences between neighbours as signed 1-, 2-
+  or 4-byte integers. Decoding is a cumulative sum divided by ``10 ** decimals``.
+
+Everything else keeps the JSON shape. Bodies of :data:`DEFAULT_COMPRESS_MIN_BYTES` or more
+are compressed with brotli (when installed) or gzip if the client accepts it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import os
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+EXT_FLOAT32 = 1
+EXT_DELTA = 2
+PACK_MIN_LENGTH = 8
+PACK_MAX_DECIMALS = 2
+_DELTA_HEADER = struct.Struct("<BBi")
+_NUMBERS = {int, float}
+_CONTAINERS = (dict, list)
+
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+# Quality 4 compresses about as well as gzip -9 at gzip -5 speed.
+BROTLI_QUALITY = 4
+
+VARY_HEADER = "Accept, Accept-Encoding"
+
+
+def compress_min_bytes() -> int:
+    """Smallest body worth compressing, from WEATHERWISE_COMPRESS_MIN_BYTES (``0`` disables compression)."""
+    return int(os.getenv("WEATHERWISE_COMPRESS_MIN_BYTES", str(DEFAULT_COMPRESS_MIN_BYTES)))
+
+
+def _preferences(header: Optional[str]) -> Dict[str, float]:
+    """``{token: q}`` for an ``Accept`` or ``Accept-Encoding`` header."""
+    preferences: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences[token] = max(quality, preferences.get(token, 0.0))
+    return preferences
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack when the client prefers it over JSON and ``msgpack`` is installed, else JSON."""
+    if msgpack is None or not accept:
+        return JSON_MEDIA_TYPE
+    preferences = _preferences(accept)
+    packed = max(preferences.get(alias, 0.0) for alias in MSGPACK_ALIASES)
+    plain = preferences.get(JSON_MEDIA_TYPE, preferences.get("application/*", preferences.get("*/*", 0.0)))
+    return MSGPACK_MEDIA_TYPE if packed > 0 and packed > plain else JSON_MEDIA_TYPE
+
+
+def negotiate_content_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """``br`` or ``gzip`` (brotli wins ties), or ``None`` to send the body as is."""
+    preferences = _preferences(accept_encoding)
+    wildcard = preferences.get("*", 0.0)
+    candidates = [("br", preferences.get("br", wildcard))] if brotli is not None else []
+    candidates.append(("gzip", preferences.get("gzip", wildcard)))
+    coding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return coding if quality > 0 else None
+
+
+def _finite(node: Any) -> Any:
+    """``node`` with NaN and infinities replaced by ``None``."""
+    if isinstance(node, float):
+        return node if math.isfinite(node) else None
+    if isinstance(node, dict):
+        return {key: _finite(value) for key, value in node.items()}
+    if isinstance(node, (list, tuple)):
+        return [_finite(value) for value in node]
+    return node
+
+
+def encode_json(payload: Any) -> bytes:
+    """UTF-8 JSON; NaN and infinities become ``null`` with or without orjson."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        # orjson writes non-finite floats as null; only payloads that contain one pay for the walk.
+        return json.dumps(_finite(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _delta_packed(values: list) -> Optional[bytes]:
+    import numpy as np
+
+    first = values[0]
+    if not math.isfinite(first):
+        return None
+    array = np.fromiter(values, dtype=float, count=len(values))
+    for decimals in range(PACK_MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        # Checking the first value in plain Python skips most scales that cannot fit.
+        if round(first * scale) / scale != first:
+            continue
+        scaled = np.rint(array * scale)
+        # NaN never compares equal, so series with gaps fall through to float32.
+        if not (scaled / scale == array).all():
+            continue
+        # Values within +-2**30 keep every difference inside int32.
+        if np.abs(scaled).max() >= 2 ** 30:
+            return None
+        deltas = np.diff(scaled)
+        peak = np.abs(deltas).max(initial=0)
+        width = 1 if peak < 2 ** 7 else 2 if peak < 2 ** 15 else 4
+        return _DELTA_HEADER.pack(decimals, width, int(scaled[0])) + deltas.astype(f"<i{width}").tobytes()
+    return None
+
+
+def _pack_series(values: list) -> Any:
+    packed = _delta_packed(values)
+    if packed is not None:
+        return msgpack.ExtType(EXT_DELTA, packed)
+    try:
+        return msgpack.ExtType(EXT_FLOAT32, struct.pack(f"<{len(values)}f", *values))
+    except OverflowError:  # beyond float32's range; keep full precision
+        return values
+
+
+def _packed(node: Any) -> Any:
+    """``node`` with its numeric series packed; containers without any are returned as is, not copied."""
+    # Type checks are exact: bools are not numbers here.
+    if type(node) is list and len(node) >= PACK_MIN_LENGTH and set(map(type, node)) <= _NUMBERS:
+        return _pack_series(node)
+    replaced = None
+    for key, value in node.items() if type(node) is dict else enumerate(node):
+        if type(value) in _CONTAINERS:
+            packed = _packed(value)
+            if packed is not value:
+                if replaced is None:
+                    replaced = node.copy()
+                replaced[key] = packed
+    return node if replaced is None else replaced
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    if msgpack is None:  # pragma: no cover - negotiate_media_type never picks it then
+        raise RuntimeError("msgpack is not installed. Run `pip install msgpack` to serve MessagePack.")
+    return msgpack.packb(_packed(payload), use_bin_type=True)
+
+
+def encode(payload: Any, media_type: str) -> bytes:
+    return encode_msgpack(payload) if media_type == MSGPACK_MEDIA_TYPE else encode_json(payload)
+
+
+def compress(body: bytes, coding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Compress ``body`` with ``coding`` when it is large enough; returns the body and the coding applied."""
+    threshold = compress_min_bytes()
+    if coding is None or threshold <= 0 or len(body) < threshold:
+        return body, None
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY), coding
+    # mtime=0 keeps the output identical for identical bodies.
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), coding
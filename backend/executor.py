@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_DEADLINE = 30.0
+DEFAULT_RETRY_AFTER = 1
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the compute queue is full and the request should be retried later."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Server is busy computing other requests. Please retry shortly.")
+        self.retry_after = retry_after
+
+
+class ExecutorDeadlineExceeded(TimeoutError):
+    """Raised when a submitted computation does not finish within its deadline."""
+
+
+class ComputeExecutor:
+    """Runs blocking dataset work off the event loop with a concurrency limit and queue cap.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more wait for a
+    worker; anything beyond that is rejected immediately with :class:`ExecutorSaturated`.
+    """
+
+    def __init__(
+        self,
+        *,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        deadline: Optional[float] = DEFAULT_DEADLINE,
+        retry_after: int = DEFAULT_RETRY_AFTER
+    ) -> None:
+        if kind not in {"thread", "process"}:
+            raise ValueError(f"Unsupported executor kind {kind!r}; use 'thread' or 'process'.")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.deadline = deadline if deadline and deadline > 0 else None
+        self.retry_after = max(1, retry_after)
+
+        self._executor: Executor
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="weatherwise-compute")
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.perf_counter()
+
+    def _tracked(self, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._busy_seconds += time.perf_counter() - started
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated(self.retry_after)
+            self._pending += 1
+            self._submitted += 1
+
+        try:
+            if self.kind == "process":
+                future = self._executor.submit(func, *args, **kwargs)
+            else:
+                # Copy the caller's context so request-scoped state follows the work into the thread.
+                context = contextvars.copy_context()
+                call = functools.partial(context.run, func, *args, **kwargs)
+                future = self._executor.submit(self._tracked, call)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.deadline)
+        except asyncio.TimeoutError as exc:
+            # Cancelling only helps while the call is still queued; a running call finishes in
+            # the background and keeps its worker slot until then.
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise ExecutorDeadlineExceeded(
+                f"Computation did not finish within {self.deadline:g} seconds."
+            ) from exc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+            running = self._running if self.kind == "thread" else min(pending, self.max_workers)
+            elapsed = max(time.perf_counter() - self._started_at, 1e-9)
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "deadline_seconds": self.deadline,
+                "running": running,
+                "queue_depth": max(0, pending - running),
+                "utilization": round(running / self.max_workers, 3),
+                "busy_fraction": round(self._busy_seconds / (elapsed * self.max_workers), 4)
+                if self.kind == "thread"
+                else None,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTOR: Optional[ComputeExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> ComputeExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ComputeExecutor(
+                    kind=os.getenv("WEATHERWISE_EXECUTOR", "thread").lower(),
+                    max_workers=int(os.getenv("WEATHERWISE_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                    max_queue=int(os.getenv("WEATHERWISE_EXECUTOR_QUEUE", str(DEFAULT_MAX_QUEUE))),
+                    deadline=float(os.getenv("WEATHERWISE_QUERY_DEADLINE", str(DEFAULT_DEADLINE))),
+                    retry_after=int(os.getenv("WEATHERWISE_RETRY_AFTER", str(DEFAULT_RETRY_AFTER)))
+                )
+    return _EXECUTOR
+
+
+def shutdown_executor() -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown()
+            _EXECUTOR = None
@@ -7,18 +7,65 @@ Groq provides sub-second responses which is critical for farmer user experience.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import Any, Dict, Iterable, List, Optional
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
 
 try:
-    from groq import Groq, GroqError
+    from groq import AsyncGroq, Groq, GroqError, RateLimitError
 except ImportError:
     # Graceful fallback if groq not installed
+    AsyncGroq = None  # type: ignore
     Groq = None  # type: ignore
     GroqError = Exception  # type: ignore
 
+    class RateLimitError(Exception):  # type: ignore[no-redef]
+        pass
+
+from .metrics import record, stage
+from .rate_limit import get_rate_limiter
+
 DEFAULT_MODEL = "llama-3.3-70b-versatile"
 DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_CACHE_TTL = 6 * 60 * 60
+DEFAULT_CACHE_SIZE = 512
+DEFAULT_LATENCY_BUDGET = 5.0
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET = 30.0
+DEFAULT_BATCH_CONCURRENCY = 8
+DEFAULT_BATCH_RETRIES = 4
+DEFAULT_BATCH_BACKOFF = 1.0
+MAX_BATCH_BACKOFF = 60.0
+
+LOGGER = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You are a friendly agricultural advisor helping farmers understand "
+    "NASA weather data. Use simple language, avoid jargon, focus on practical actions. "
+    "Think like you're talking to someone who knows farming, not meteorology."
+)
+
+# Sampling parameters shared by every Groq completion
+COMPLETION_PARAMS: Dict[str, Any] = {
+    "temperature": 0.5,  # Balanced creativity and consistency
+    "max_tokens": 300,   # ~2-3 sentences of advice
+    "top_p": 0.9         # Nucleus sampling for quality
+}
 
 # Farmer-friendly label mapping
 FARMER_LABELS = {
@@ -29,11 +76,48 @@ FARMER_LABELS = {
     "very_uncomfortable": "Dangerous Heat Index Days"
 }
 
+# Practical advice used by the template insight when Groq is slow or unavailable
+FALLBACK_ADVICE = {
+    "very_hot": "plan heavy field work for early morning or evening and keep shade and water ready for people and livestock",
+    "very_cold": "have frost covers ready for tender crops and seedlings and protect exposed water lines",
+    "very_wet": "check field drainage, avoid working waterlogged ground and keep a rain plan for outdoor events",
+    "very_windy": "secure loose structures, stake young plants and avoid spraying on gusty days",
+    "very_uncomfortable": "avoid strenuous outdoor work in the afternoon and schedule regular breaks in the shade"
+}
+# Conditions at or above this share of historical days are called out in the template insight
+FALLBACK_RISK_PERCENT = 20.0
+
+FALLBACK_LATENCY_BUDGET = "latency_budget"
+FALLBACK_CIRCUIT_OPEN = "circuit_open"
+FALLBACK_UPSTREAM_ERROR = "upstream_error"
+
 
 class GroqClientError(RuntimeError):
     """Raised when the Groq API call fails."""
 
 
+class GroqRateLimitError(GroqClientError):
+    """Raised when Groq answers ``429``; ``retry_after`` is its suggested wait in seconds, if given."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after(error: Any) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token count of a completion (about four characters per token plus the reply budget)."""
+    return (len(SYSTEM_PROMPT) + len(prompt)) // 4 + COMPLETION_PARAMS["max_tokens"]
+
+
 def _format_condition_lines(results: Dict[str, Any]) -> str:
     """Format weather conditions in farmer-friendly language."""
     lines: List[str] = []
@@ -107,6 +191,15 @@ def _get_seasonal_context(date_of_year: str) -> str:
         return ""
 
 
+def _location_label(location: Dict[str, Any]) -> str:
+    lat = location.get("lat")
+    lon = location.get("lon")
+    return (
+        location.get("name") or 
+        f"{lat:.2f}°N, {lon:.2f}°E" if lat and lon else "Unknown location"
+    )
+
+
 def build_farmer_prompt(payload: Dict[str, Any], user_prompt: Optional[str]) -> str:
     """
     Build farmer-friendly prompt for Groq API.
@@ -118,13 +211,7 @@ def build_farmer_prompt(payload: Dict[str, Any], user_prompt: Optional[str]) ->
     metadata = payload.get("metadata", {})
     location = query.get("location", {})
     date_of_year = query.get("date_of_year", "Unknown date")
-    
-    lat = location.get("lat")
-    lon = location.get("lon")
-    location_label = (
-        location.get("name") or 
-        f"{lat:.2f}°N, {lon:.2f}°E" if lat and lon else "Unknown location"
-    )
+    location_label = _location_label(location)
 
     header = (
         "You are an agricultural and travel planning assistant helping people make informed decisions using NASA satellite weather data. "
@@ -166,6 +253,164 @@ def build_farmer_prompt(payload: Dict[str, Any], user_prompt: Optional[str]) ->
     )
 
 
+def build_fallback_insight(payload: Dict[str, Any]) -> str:
+    """
+    Template insight from the same facts the prompt gives Groq.
+    
+    Deterministic and instant; served when Groq misses the latency budget or the circuit
+    breaker is open. Conditions seen on at least FALLBACK_RISK_PERCENT of historical days
+    get a line of practical advice, most likely first.
+    """
+    query = payload.get("query", {})
+    metadata = payload.get("metadata", {})
+    results = payload.get("results") or {}
+    date_of_year = query.get("date_of_year", "Unknown date")
+    time_range = metadata.get("time_range", "the available record")
+
+    notable = sorted(
+        (
+            (data["probability_percent"], key)
+            for key, data in results.items()
+            if data and data.get("probability_percent") is not None
+            and data["probability_percent"] >= FALLBACK_RISK_PERCENT
+        ),
+        reverse=True
+    )
+    if notable:
+        advice = " ".join(
+            f"{FARMER_LABELS.get(key, key.replace('_', ' ').title())} are common ({probability}% of days): "
+            f"{FALLBACK_ADVICE.get(key, 'keep this risk in mind when planning')}."
+            for probability, key in notable
+        )
+    else:
+        advice = "None of the selected conditions stands out for this date, so routine plans should hold up."
+
+    return (
+        f"{_location_label(query.get('location', {}))}, around {date_of_year}{_get_seasonal_context(date_of_year)}. "
+        f"Historical NASA data ({time_range}) shows:\n"
+        f"{_format_condition_lines(results) or 'No specific weather risks identified.'}\n\n"
+        f"{advice}\n\n"
+        "This is a quick summary of historical patterns, not a forecast. Ask again shortly for more detailed advice."
+    )
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker in front of the Groq API.
+    
+    After ``failure_threshold`` errors or missed server latency budgets in a row the breaker
+    opens and callers skip Groq for ``reset_after`` seconds. Then one trial call is let through
+    (half-open): a success closes the breaker, a failure opens it for another period. A trial
+    that never reports back simply allows the next one after another ``reset_after``.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        reset_after: float = DEFAULT_BREAKER_RESET,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_after = max(0.0, reset_after)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open = False
+        self._times_opened = 0
+        self._rejected = 0
+        self._fallbacks: Dict[str, int] = {FALLBACK_LATENCY_BUDGET: 0, FALLBACK_CIRCUIT_OPEN: 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if self._half_open else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at >= self.reset_after:
+                self._opened_at = self._clock()
+                self._half_open = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._half_open = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._half_open or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._half_open:
+                    self._times_opened += 1
+                self._opened_at = self._clock()
+                self._half_open = False
+
+    def count_fallback(self, reason: str) -> None:
+        with self._lock:
+            self._fallbacks[reason] = self._fallbacks.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_after_seconds": self.reset_after,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+                "fallbacks": dict(self._fallbacks)
+            }
+
+
+_CIRCUIT_BREAKER: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Process-wide breaker configured by GROQ_BREAKER_FAILURES and GROQ_BREAKER_RESET."""
+    global _CIRCUIT_BREAKER
+    if _CIRCUIT_BREAKER is None:
+        _CIRCUIT_BREAKER = CircuitBreaker(
+            failure_threshold=_env_int("GROQ_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES),
+            reset_after=_env_float("GROQ_BREAKER_RESET", DEFAULT_BREAKER_RESET)
+        )
+    return _CIRCUIT_BREAKER
+
+
+def _require_api_key() -> str:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise GroqClientError(
+            "GROQ_API_KEY is not configured. Please add it to your .env.local file.\n"
+            "Get a free API key at: https://console.groq.com/"
+        )
+    return api_key
+
+
+def _build_messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _extract_content(chat_completion: Any) -> str:
+    content = chat_completion.choices[0].message.content
+    if not content:
+        raise GroqClientError("Groq API returned empty content.")
+    return content.strip()
+
+
 def call_groq_api(
     payload: Dict[str, Any],
     *,
@@ -176,64 +421,659 @@ def call_groq_api(
     """
     Call Groq API for farmer-friendly weather insights.
     
+    Blocking variant kept for scripts; the API server uses :func:`acall_groq_api`.
+    
     Args:
         payload: Weather query payload with results and metadata
         user_prompt: Optional custom prompt from the user
-        model: Groq model to use (default: llama-3.1-70b-versatile)
+        model: Groq model to use (default: llama-3.3-70b-versatile)
         timeout: Request timeout in seconds
         
     Returns:
         AI-generated farming advice as a string
         
     Raises:
-        GroqClientError: If the API call fails or API key is missing
+        GroqClientError: If the API call fails, the API key is missing or the circuit
+            breaker is open (use :func:`build_fallback_insight` in that case)
     """
     if Groq is None:
         raise GroqClientError(
             "Groq library not installed. Run: pip install groq"
         )
     
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise GroqClientError(
-            "GROQ_API_KEY is not configured. Please add it to your .env.local file.\n"
-            "Get a free API key at: https://console.groq.com/"
-        )
-
+    api_key = _require_api_key()
     prompt = build_farmer_prompt(payload, user_prompt)
     selected_model = model or os.getenv("GROQ_MODEL", DEFAULT_MODEL)
+    breaker = get_circuit_breaker()
+    if not breaker.allow():
+        raise GroqClientError("Groq circuit breaker is open after repeated failures.")
 
     try:
-        client = Groq(api_key=api_key, timeout=timeout)
+        client = Groq(api_key=api_key, base_url=os.getenv("GROQ_BASE_URL") or None, timeout=timeout)
         
         chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a friendly agricultural advisor helping farmers understand "
-                        "NASA weather data. Use simple language, avoid jargon, focus on practical actions. "
-                        "Think like you're talking to someone who knows farming, not meteorology."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            messages=_build_messages(prompt),
             model=selected_model,
-            temperature=0.5,  # Balanced creativity and consistency
-            max_tokens=300,   # ~2-3 sentences of advice
-            top_p=0.9         # Nucleus sampling for quality
+            **COMPLETION_PARAMS
+        )
+        content = _extract_content(chat_completion)
+
+    except GroqClientError:
+        breaker.record_failure()
+        raise
+    except GroqError as e:
+        breaker.record_failure()
+        raise GroqClientError(f"Groq API error: {str(e)}") from e
+    except Exception as e:
+        breaker.record_failure()
+        raise GroqClientError(f"Unexpected error calling Groq: {str(e)}") from e
+    breaker.record_success()
+    return content
+
+
+_ASYNC_CLIENT: Optional[Any] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def open_async_client() -> Any:
+    """
+    Create the shared AsyncGroq client backed by a keep-alive connection pool.
+    
+    Pool size and timeouts come from GROQ_MAX_CONNECTIONS, GROQ_MAX_KEEPALIVE,
+    GROQ_KEEPALIVE_EXPIRY, GROQ_CONNECT_TIMEOUT and GROQ_TIMEOUT. GROQ_BASE_URL points the
+    client at a different chat-completions server (e.g. ``backend/tools/fake_groq.py``).
+    """
+    global _ASYNC_CLIENT
+    if AsyncGroq is None:
+        raise GroqClientError(
+            "Groq library not installed. Run: pip install groq"
+        )
+    if _ASYNC_CLIENT is not None:
+        return _ASYNC_CLIENT
+
+    api_key = _require_api_key()
+    timeout = httpx.Timeout(
+        _env_float("GROQ_TIMEOUT", DEFAULT_TIMEOUT),
+        connect=_env_float("GROQ_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)
+    )
+    limits = httpx.Limits(
+        max_connections=_env_int("GROQ_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=_env_int("GROQ_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE),
+        keepalive_expiry=_env_float("GROQ_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)
+    )
+    _ASYNC_CLIENT = AsyncGroq(
+        api_key=api_key,
+        base_url=os.getenv("GROQ_BASE_URL") or None,
+        timeout=timeout,
+        max_retries=_env_int("GROQ_MAX_RETRIES", 2),
+        http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+    return _ASYNC_CLIENT
+
+
+async def close_async_client() -> None:
+    global _ASYNC_CLIENT
+    client, _ASYNC_CLIENT = _ASYNC_CLIENT, None
+    if client is not None:
+        await client.close()
+
+
+def insight_cache_key(model: str, prompt: str) -> str:
+    """Hash of everything that determines a completion: model, system message, prompt, sampling."""
+    material = json.dumps(
+        {"model": model, "system": SYSTEM_PROMPT, "prompt": prompt, "params": COMPLETION_PARAMS},
+        sort_keys=True
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# Where InsightCache.resolve found a value.
+SOURCE_CACHED = "cached"
+SOURCE_COALESCED = "coalesced"
+SOURCE_COMPUTED = "computed"
+
+
+@dataclass
+class _CachedInsight:
+    value: str
+    expires_at: float
+    upstream_seconds: float
+
+
+class InsightCache:
+    """
+    TTL + LRU cache of generated insights with single-flight request coalescing.
+    
+    Concurrent misses for the same key share one upstream call. That call runs as its own
+    task, so a caller that disconnects does not cancel it for the others waiting on it.
+    """
+
+    def __init__(self, *, max_entries: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL, path: Optional[str] = None) -> None:
+        self.max_entries = max(0, max_entries)
+        self.ttl = max(0.0, ttl)
+        self.path = path
+        self._entries: "OrderedDict[str, _CachedInsight]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Task[Tuple[str, float]]"] = {}
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._saved_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.time():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        self._saved_seconds += entry.upstream_seconds
+        return entry.value
+
+    def put(self, key: str, value: str, upstream_seconds: float) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = _CachedInsight(value, time.time() + self.ttl, upstream_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        value, _ = await self.resolve(key, compute)
+        return value
+
+    async def resolve(self, key: str, compute: Callable[[], Awaitable[str]], *, lookup: bool = True) -> Tuple[str, str]:
+        """
+        Like :meth:`get_or_compute`, plus where the value came from: ``cached``, ``coalesced`` or ``computed``.
+
+        ``lookup=False`` skips the cache read for callers that have just missed it themselves.
+        """
+        if not self.enabled:
+            return await compute(), SOURCE_COMPUTED
+
+        cached = self.get(key) if lookup else None
+        if cached is not None:
+            return cached, SOURCE_CACHED
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._coalesced += 1
+            value, upstream_seconds = await asyncio.shield(task)
+            # The upstream call this waiter did not make took as long as the one it joined.
+            self._saved_seconds += upstream_seconds
+            return value, SOURCE_COALESCED
+
+        async def run() -> Tuple[str, float]:
+            started = time.perf_counter()
+            value = await compute()
+            upstream_seconds = time.perf_counter() - started
+            self.put(key, value, upstream_seconds)
+            return value, upstream_seconds
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+
+        def finished(done: "asyncio.Task[Tuple[str, float]]") -> None:
+            self._inflight.pop(key, None)
+            if not done.cancelled():
+                done.exception()  # mark retrieved when every waiter went away
+
+        task.add_done_callback(finished)
+        value, _ = await asyncio.shield(task)
+        return value, SOURCE_COMPUTED
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                raw = json.load(handle)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Ignoring unreadable insight cache %s: %s", self.path, exc)
+            return
+        now = time.time()
+        for key, item in raw.items():
+            if item.get("expires_at", 0) > now:
+                self._entries[key] = _CachedInsight(item["value"], item["expires_at"], item.get("upstream_seconds", 0.0))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        raw = {
+            key: {"value": entry.value, "expires_at": entry.expires_at, "upstream_seconds": entry.upstream_seconds}
+            for key, entry in self._entries.items()
+            if entry.expires_at > now
+        }
+        staging = f"{self.path}.tmp"
+        with open(staging, "w", encoding="utf-8") as handle:
+            json.dump(raw, handle)
+        os.replace(staging, self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "inflight": len(self._inflight),
+            "saved_upstream_seconds": round(self._saved_seconds, 3)
+        }
+
+
+_INSIGHT_CACHE: Optional[InsightCache] = None
+
+
+def get_insight_cache() -> InsightCache:
+    """Process-wide cache configured by GROQ_CACHE_SIZE, GROQ_CACHE_TTL and GROQ_CACHE_PATH."""
+    global _INSIGHT_CACHE
+    if _INSIGHT_CACHE is None:
+        _INSIGHT_CACHE = InsightCache(
+            max_entries=_env_int("GROQ_CACHE_SIZE", DEFAULT_CACHE_SIZE),
+            ttl=_env_float("GROQ_CACHE_TTL", DEFAULT_CACHE_TTL),
+            path=os.getenv("GROQ_CACHE_PATH") or None
         )
+        _INSIGHT_CACHE.load()
+    return _INSIGHT_CACHE
+
+
+async def _completion_with_usage(client: Any, prompt: str, model: str) -> Tuple[str, Optional[int]]:
+    try:
+        with stage("groq"):
+            chat_completion = await client.chat.completions.create(
+                messages=_build_messages(prompt),
+                model=model,
+                **COMPLETION_PARAMS
+            )
+        usage = getattr(chat_completion, "usage", None)
+        return _extract_content(chat_completion), getattr(usage, "total_tokens", None)
+
+    except GroqClientError:
+        raise
+    except RateLimitError as e:
+        raise GroqRateLimitError(f"Groq API error: {str(e)}", _retry_after(e)) from e
+    except GroqError as e:
+        raise GroqClientError(f"Groq API error: {str(e)}") from e
+    except Exception as e:
+        raise GroqClientError(f"Unexpected error calling Groq: {str(e)}") from e
+
+
+async def _create_completion(client: Any, prompt: str, model: str) -> str:
+    content, used = await _completion_with_usage(client, prompt, model)
+    # Interactive calls do not wait for the rate limiter, but batches yield to their usage.
+    get_rate_limiter().charge(used if used is not None else estimate_tokens(prompt))
+    return content
+
+
+async def acall_groq_api(
+    payload: Dict[str, Any],
+    *,
+    user_prompt: Optional[str] = None,
+    model: Optional[str] = None
+) -> str:
+    """
+    Non-blocking variant of :func:`call_groq_api` using the shared async client.
+    
+    Identical prompts are answered from the insight cache, and concurrent identical
+    requests share a single upstream call.
+    
+    Raises:
+        GroqClientError: If the API call fails or API key is missing
+    """
+    client = open_async_client()
+    prompt, selected_model, key = _insight_key(payload, user_prompt, model)
+    return await get_insight_cache().get_or_compute(
+        key,
+        lambda: _create_completion(client, prompt, selected_model)
+    )
+
+
+async def astream_groq_api(
+    payload: Dict[str, Any],
+    *,
+    user_prompt: Optional[str] = None,
+    model: Optional[str] = None,
+    lookup_cache: bool = True
+) -> AsyncIterator[str]:
+    """
+    Stream the insight as text deltas while Groq generates it.
+    
+    Closing the generator early (e.g. the browser disconnected) closes the upstream
+    response, so Groq stops generating tokens nobody will read. Cached insights are
+    replayed as a single delta unless ``lookup_cache`` is false (the caller already
+    checked); complete generations are cached either way.
+    
+    Raises:
+        GroqClientError: If the API call fails or API key is missing
+    """
+    client = open_async_client()
+    with stage("prompt_build"):
+        prompt = build_farmer_prompt(payload, user_prompt)
+    selected_model = model or os.getenv("GROQ_MODEL", DEFAULT_MODEL)
 
-        content = chat_completion.choices[0].message.content
-        if not content:
-            raise GroqClientError("Groq API returned empty content.")
+    cache = get_insight_cache()
+    key = insight_cache_key(selected_model, prompt)
+    cached = cache.get(key) if cache.enabled and lookup_cache else None
+    if cached is not None:
+        yield cached
+        return
 
-        return content.strip()
+    started = time.perf_counter()
+    get_rate_limiter().charge(estimate_tokens(prompt))
+    try:
+        stream = await client.chat.completions.create(
+            messages=_build_messages(prompt),
+            model=selected_model,
+            stream=True,
+            **COMPLETION_PARAMS
+        )
+    except GroqError as e:
+        raise GroqClientError(f"Groq API error: {str(e)}") from e
+    except Exception as e:
+        raise GroqClientError(f"Unexpected error calling Groq: {str(e)}") from e
 
+    parts: List[str] = []
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    record("groq_first_token", time.perf_counter() - started)
+                parts.append(delta)
+                yield delta
+        # Only complete generations are cached; an abandoned stream never reaches this point.
+        content = "".join(parts).strip()
+        record("groq_stream", time.perf_counter() - started)
+        if content:
+            cache.put(key, content, time.perf_counter() - started)
     except GroqError as e:
         raise GroqClientError(f"Groq API error: {str(e)}") from e
     except Exception as e:
+        # Transport errors (e.g. a dropped connection) surface raw from the stream; closing
+        # the generator and cancellation are BaseExceptions and still propagate untouched.
         raise GroqClientError(f"Unexpected error calling Groq: {str(e)}") from e
+    finally:
+        await stream.close()
+
+
+@dataclass(frozen=True)
+class InsightResult:
+    """An insight (or streamed part of one); ``fallback_reason`` is set for template insights."""
+
+    text: str
+    fallback_reason: Optional[str] = None
+
+    @property
+    def fallback(self) -> bool:
+        return self.fallback_reason is not None
+
+    def as_response(self) -> Dict[str, Any]:
+        response: Dict[str, Any] = {"insight": self.text, "fallback": self.fallback}
+        if self.fallback:
+            response["fallback_reason"] = self.fallback_reason
+        return response
+
+
+def latency_budget(requested_ms: Optional[float] = None) -> float:
+    """Seconds to wait for Groq: the request's own budget, else GROQ_LATENCY_BUDGET (``0`` waits indefinitely)."""
+    if requested_ms is not None:
+        return max(0.0, requested_ms / 1000)
+    return max(0.0, _env_float("GROQ_LATENCY_BUDGET", DEFAULT_LATENCY_BUDGET))
+
+
+def _missed_server_budget(budget: float) -> bool:
+    """Whether a timeout against ``budget`` says anything about Groq; a client's tighter budget does not."""
+    server_budget = latency_budget()
+    return server_budget > 0 and budget >= server_budget
+
+
+def _insight_key(payload: Dict[str, Any], user_prompt: Optional[str], model: Optional[str]) -> Tuple[str, str, str]:
+    """``(prompt, model, cache key)`` for an insight request."""
+    with stage("prompt_build"):
+        prompt = build_farmer_prompt(payload, user_prompt)
+    selected_model = model or os.getenv("GROQ_MODEL", DEFAULT_MODEL)
+    return prompt, selected_model, insight_cache_key(selected_model, prompt)
+
+
+def _fallback(payload: Dict[str, Any], reason: str) -> InsightResult:
+    get_circuit_breaker().count_fallback(reason)
+    with stage("fallback"):
+        return InsightResult(build_fallback_insight(payload), reason)
+
+
+async def agenerate_insight(
+    payload: Dict[str, Any],
+    *,
+    user_prompt: Optional[str] = None,
+    model: Optional[str] = None,
+    budget: Optional[float] = None
+) -> InsightResult:
+    """
+    :func:`acall_groq_api` within a latency budget, behind the circuit breaker.
+    
+    When Groq misses the budget (seconds, default :func:`latency_budget`) or the breaker is
+    open, the template from :func:`build_fallback_insight` is returned instead. Only errors
+    and misses of the server's own budget count as breaker failures; a caller's tighter
+    budget just gets the template. A late Groq answer is not thrown away: the upstream call
+    keeps running and fills the insight cache.
+    Cached insights are served before the breaker is consulted, even while it is open, and
+    only upstream calls this request made itself report success or failure to it.
+    
+    Raises:
+        GroqClientError: If the API call fails or API key is missing
+    """
+    client = open_async_client()
+    prompt, selected_model, key = _insight_key(payload, user_prompt, model)
+    cache = get_insight_cache()
+    # Cache hits say nothing about Groq's health, so they bypass the breaker entirely.
+    cached = cache.get(key) if cache.enabled else None
+    if cached is not None:
+        return InsightResult(cached)
+
+    breaker = get_circuit_breaker()
+    if not breaker.allow():
+        return _fallback(payload, FALLBACK_CIRCUIT_OPEN)
+
+    originated = False
+
+    async def compute() -> str:
+        nonlocal originated
+        originated = True
+        return await _create_completion(client, prompt, selected_model)
+
+    budget = latency_budget() if budget is None else budget
+    call = cache.resolve(key, compute, lookup=False)
+    try:
+        # Cancelling resolve only stops waiting: the single-flight task is shielded.
+        text, source = await asyncio.wait_for(call, budget) if budget > 0 else await call
+    except asyncio.TimeoutError:
+        # Only the server's own budget trips the breaker, so no client can open it for everyone;
+        # callers that joined someone else's call leave the accounting to the one that made it.
+        if originated and _missed_server_budget(budget):
+            breaker.record_failure()
+        return _fallback(payload, FALLBACK_LATENCY_BUDGET)
+    except GroqClientError:
+        if originated:
+            breaker.record_failure()
+        raise
+    if source == SOURCE_COMPUTED:
+        breaker.record_success()
+    return InsightResult(text)
+
+
+async def astream_insight(
+    payload: Dict[str, Any],
+    *,
+    user_prompt: Optional[str] = None,
+    model: Optional[str] = None,
+    budget: Optional[float] = None
+) -> AsyncIterator[InsightResult]:
+    """
+    :func:`astream_groq_api` with the latency budget applied to the first token.
+    
+    Yields the template insight as a single part when the first token misses the budget or
+    the breaker is open. Cached insights are yielded without consulting the breaker. Once
+    tokens flow the stream is not cut off.
+    
+    Raises:
+        GroqClientError: If the API call fails or API key is missing
+    """
+    open_async_client()
+    _, _, key = _insight_key(payload, user_prompt, model)
+    cache = get_insight_cache()
+    cached = cache.get(key) if cache.enabled else None
+    if cached is not None:
+        yield InsightResult(cached)
+        return
+
+    breaker = get_circuit_breaker()
+    if not breaker.allow():
+        yield _fallback(payload, FALLBACK_CIRCUIT_OPEN)
+        return
+
+    budget = latency_budget() if budget is None else budget
+    stream = astream_groq_api(payload, user_prompt=user_prompt, model=model, lookup_cache=False)
+    async with aclosing(stream) as deltas:
+        try:
+            first = await asyncio.wait_for(deltas.__anext__(), budget) if budget > 0 else await deltas.__anext__()
+        except StopAsyncIteration:
+            breaker.record_success()
+            return
+        except asyncio.TimeoutError:
+            if _missed_server_budget(budget):
+                breaker.record_failure()
+            yield _fallback(payload, FALLBACK_LATENCY_BUDGET)
+            return
+        except GroqClientError:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        yield InsightResult(first)
+        async for delta in deltas:
+            yield InsightResult(delta)
+
+
+async def _batch_completion(client: Any, prompt: str, model: str, counters: Dict[str, int]) -> str:
+    limiter = get_rate_limiter()
+    estimate = estimate_tokens(prompt)
+    retries = max(0, _env_int("GROQ_BATCH_RETRIES", DEFAULT_BATCH_RETRIES))
+    attempt = 0
+    while True:
+        await limiter.acquire(estimate)
+        counters["upstream_calls"] += 1
+        try:
+            content, used = await _completion_with_usage(client, prompt, model)
+        except GroqRateLimitError as exc:
+            counters["rate_limited"] += 1
+            if attempt >= retries:
+                raise
+            delay = exc.retry_after
+            if delay is None:
+                backoff = _env_float("GROQ_BATCH_BACKOFF", DEFAULT_BATCH_BACKOFF)
+                delay = min(MAX_BATCH_BACKOFF, backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            # Pausing the shared limiter holds back every pending call, not just this retry.
+            limiter.pause(delay)
+            counters["retries"] += 1
+            attempt += 1
+            continue
+        if used is not None:
+            limiter.settle(estimate, used)
+        return content
+
+
+async def agenerate_insight_batch(
+    items: List[Tuple[Dict[str, Any], Optional[str]]],
+    *,
+    model: Optional[str] = None,
+    fallback: bool = False
+) -> Dict[str, Any]:
+    """
+    Generate insights for many ``(payload, user_prompt)`` pairs at once.
+    
+    Identical prompts are generated once and cached insights are reused. The remaining
+    calls run concurrently (GROQ_BATCH_CONCURRENCY), paced by the shared requests/tokens
+    per minute limiter. A ``429`` pauses the limiter for the server's ``Retry-After`` (or an
+    exponential backoff) and is retried up to GROQ_BATCH_RETRIES times. Batches are not
+    latency-bound, so neither the latency budget nor the circuit breaker applies; with
+    ``fallback`` an item that still fails gets the template insight instead of an error.
+    
+    Returns ``{"items": [...], "summary": {...}}`` with one entry per input, in order.
+    
+    Raises:
+        GroqClientError: If the API key is missing
+    """
+    started = time.perf_counter()
+    # The limiter owns retries here; the client's own 429 retries would bypass it.
+    client = open_async_client().with_options(max_retries=0)
+    selected_model = model or os.getenv("GROQ_MODEL", DEFAULT_MODEL)
+    cache = get_insight_cache()
+    semaphore = asyncio.Semaphore(max(1, _env_int("GROQ_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY)))
+    counters = {"upstream_calls": 0, "rate_limited": 0, "retries": 0}
+
+    groups: "OrderedDict[str, List[int]]" = OrderedDict()
+    prompts: Dict[str, str] = {}
+    with stage("prompt_build"):
+        for index, (payload, user_prompt) in enumerate(items):
+            prompt = build_farmer_prompt(payload, user_prompt)
+            key = insight_cache_key(selected_model, prompt)
+            groups.setdefault(key, []).append(index)
+            prompts.setdefault(key, prompt)
+
+    async def generate(key: str) -> Tuple[str, str]:
+        async def compute() -> str:
+            async with semaphore:
+                return await _batch_completion(client, prompts[key], selected_model, counters)
+
+        return await cache.resolve(key, compute)
+
+    outcomes = await asyncio.gather(*(generate(key) for key in groups), return_exceptions=True)
+
+    results: List[Dict[str, Any]] = [{"index": index} for index in range(len(items))]
+    for indexes, outcome in zip(groups.values(), outcomes):
+        for index in indexes:
+            entry = results[index]
+            if isinstance(outcome, BaseException):
+                entry["error"] = str(outcome)
+                if fallback:
+                    entry.update(_fallback(items[index][0], FALLBACK_UPSTREAM_ERROR).as_response())
+            else:
+                entry.update(
+                    InsightResult(outcome[0]).as_response(),
+                    cached=outcome[1] == SOURCE_CACHED,
+                    coalesced=outcome[1] == SOURCE_COALESCED
+                )
+
+    failed = sum(1 for outcome in outcomes if isinstance(outcome, BaseException))
+    sources = [outcome[1] for outcome in outcomes if not isinstance(outcome, BaseException)]
+    return {
+        "items": results,
+        "summary": {
+            "items": len(items),
+            "unique_prompts": len(groups),
+            "deduplicated": len(items) - len(groups),
+            "cached": sources.count(SOURCE_CACHED),
+            "coalesced": sources.count(SOURCE_COALESCED),
+            "failed": failed,
+            **counters,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+    }
@@ -0,0 +1,38 @@
+"""
+Validators and freshness headers for cacheable ``GET /query`` responses.
+
+Each answer carries a weak ETag built from the query's digest (see
+``WeatherDataFetcher.query_etag``) and its media type, plus the ``Cache-Control`` policy
+from ``WEATHERWISE_QUERY_CACHE_CONTROL``. A request whose ``If-None-Match`` lists the
+current tag is answered ``304 Not Modified`` before any data is read.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+# Five minutes fresh, then revalidated with If-None-Match; a changed dataset changes every tag.
+DEFAULT_QUERY_CACHE_CONTROL = "public, max-age=300"
+
+
+def query_cache_control() -> str:
+    return os.getenv("WEATHERWISE_QUERY_CACHE_CONTROL", DEFAULT_QUERY_CACHE_CONTROL)
+
+
+def weak_etag(digest: str, media_type: str) -> str:
+    """``W/"<digest>-<subtype>"``: JSON and MessagePack bodies differ, gzip and brotli do not matter."""
+    return f'W/"{digest}-{media_type.rsplit("/", 1)[-1]}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith(("W/", "w/")) else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header (``*`` matches anything)."""
+    if not if_none_match:
+        return False
+    wanted = _opaque(etag)
+    return any(candidate.strip() == "*" or _opaque(candidate) == wanted for candidate in if_none_match.split(","))
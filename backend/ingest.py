@@ -0,0 +1,428 @@
+"""
+Append new daily records to a served dataset without recomputing from the raw series.
+
+The dataset must be a JSON manifest listing its shards (see :mod:`backend.shards`). Each
+ingest writes the new days as one more shard and updates the derived data for the next
+dataset version, then switches by atomically replacing the manifest:
+
+1. days after the current end of the dataset are copied into ``ingest-<first>-<last>.nc``;
+2. the shard index is extended, so the server's reopen describes no files;
+3. the climatology cube is brought forward to the new version and written beside the
+   current one (:func:`~backend.data_fetcher.climatology_generation_path`);
+4. the manifest is replaced. On its next request the server sees the new version, reopens
+   the federation and picks the matching cube. Until then it keeps answering from the old
+   version and its cube; there is no moment without a matching cube.
+
+Updating the cube costs time in proportion to the new days. Counts gain the new samples.
+The early/late trend sums shift their split by reading the few samples that cross the
+new midpoint, found through the cube's ``split`` array. Cubes built before ``split``
+existed, or that do not match the current dataset version, are rebuilt in full once.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xarray as xr  # type: ignore
+except Exception:  # pragma: no cover - optional dependency for demo
+    xr = None
+
+from .conditions import CONDITION_SETTINGS
+from .data_fetcher import (
+    CLIMATOLOGY_DAYS,
+    CLIMATOLOGY_FORMAT,
+    ClimatologyCube,
+    _apply_transform,
+    _canonical_uri,
+    _conditions_fingerprint,
+    _day_of_year_array,
+    _window_mask,
+    climatology_generation_path,
+    climatology_path_for,
+    compute_climatology_arrays,
+    write_climatology_cube
+)
+from .dataset_pool import _version_for, get_dataset_pool
+from .shards import GLOB_CHARACTERS, build_shard_index, index_path_for, open_sharded, sharded_signature
+
+LOGGER = logging.getLogger(__name__)
+
+AXES = ("time", "lat", "lon")
+KEPT_ENCODING = ("dtype", "_FillValue", "scale_factor", "add_offset", "units", "calendar")
+
+
+@dataclass
+class IngestReport:
+    manifest: str
+    days_added: int = 0
+    shard: Optional[str] = None
+    time_range: Optional[str] = None
+    version: Optional[str] = None
+    climatology: Optional[str] = None
+    climatology_mode: str = "none"
+    affected_days_of_year: int = 0
+    seconds: float = 0.0
+    notes: List[str] = field(default_factory=list)
+
+
+def _load_manifest(uri: str) -> Dict[str, Any]:
+    with open(uri, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if isinstance(manifest, list):
+        manifest = {"shards": manifest}
+    entries = manifest.get("shards", [])
+    if any(character in entry for entry in entries for character in GLOB_CHARACTERS):
+        raise ValueError(
+            "Ingest needs a manifest that lists its shards explicitly; a glob would pick up the new "
+            "shard before its climatology is ready. Replace the pattern with the file names."
+        )
+    return manifest
+
+
+def _same_axis(left: np.ndarray, right: np.ndarray) -> bool:
+    return left.shape == right.shape and np.allclose(left, right)
+
+
+def _new_records(sources: Sequence[str], dataset: Any, after: np.datetime64) -> Any:
+    """The variables of ``dataset`` from ``sources``, restricted to days after ``after``."""
+    opened = [xr.open_dataset(source) for source in sources]
+    try:
+        combined = opened[0] if len(opened) == 1 else xr.concat(opened, dim="time", data_vars="minimal", coords="minimal")
+        names = [name for name, variable in dataset.data_vars.items() if set(variable.dims) <= set(AXES)]
+        missing = [name for name in names if name not in combined]
+        if missing:
+            raise ValueError(f"New records lack variables served by the dataset: {', '.join(missing)}")
+        for axis in ("lat", "lon"):
+            if not _same_axis(np.asarray(combined[axis].values, dtype=float), np.asarray(dataset[axis].values, dtype=float)):
+                raise ValueError(f"New records use a different '{axis}' grid than the dataset.")
+        records = combined[names].sortby("time")
+        times = records["time"].values
+        _, first = np.unique(times, return_index=True)
+        keep = np.sort(first[times[first] > after])
+        records = records.isel(time=keep).transpose("time", "lat", "lon").load()
+        for variable in records.variables.values():
+            # Chunk sizes and similar storage details of the source may not fit the new shard.
+            variable.encoding = {key: value for key, value in variable.encoding.items() if key in KEPT_ENCODING}
+        return records
+    finally:
+        for handle in opened:
+            handle.close()
+
+
+def _appended_windows(
+    offsets: np.ndarray,
+    positions: np.ndarray,
+    new_doys: np.ndarray,
+    old_length: int,
+    window_days: int
+) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+    """Window offsets/positions with the new days appended, plus each day's added positions."""
+    added = [
+        old_length + np.flatnonzero(_window_mask(new_doys, target_doy, window_days))
+        for target_doy in range(1, CLIMATOLOGY_DAYS + 1)
+    ]
+    pieces: List[np.ndarray] = []
+    for day_index in range(CLIMATOLOGY_DAYS):
+        pieces.append(np.asarray(positions[offsets[day_index]:offsets[day_index + 1]]))
+        pieces.append(added[day_index])
+    counts = np.diff(offsets) + np.asarray([block.size for block in added])
+    new_offsets = np.zeros(CLIMATOLOGY_DAYS + 1, dtype=np.int64)
+    new_offsets[1:] = np.cumsum(counts)
+    return new_offsets, np.concatenate(pieces).astype(np.int32), added
+
+
+class _SeriesReader:
+    """Reads time positions of one variable's lat block in contiguous runs, remembering what it read."""
+
+    def __init__(self, data: Any, variable: str) -> None:
+        self.data = data
+        self.variable = variable
+        self._slabs: Dict[int, np.ndarray] = {}
+        self.reads = 0
+
+    def prefetch(self, positions: np.ndarray) -> None:
+        missing = np.unique(np.asarray([position for position in positions.tolist() if position not in self._slabs], dtype=np.int64))
+        if not missing.size:
+            return
+        for run in np.split(missing, np.flatnonzero(np.diff(missing) != 1) + 1):
+            block = np.asarray(self.data.isel(time=slice(int(run[0]), int(run[-1]) + 1)).values, dtype=float)
+            block = _apply_transform(self.variable, block)
+            for offset, position in enumerate(run.tolist()):
+                self._slabs[position] = block[offset]
+            self.reads += 1
+
+    def values(self, positions: np.ndarray) -> np.ndarray:
+        self.prefetch(positions)
+        return np.stack([self._slabs[position] for position in positions.tolist()])
+
+
+SPLIT_MARGIN = 8
+
+
+def _split_range(window: np.ndarray, split: np.ndarray, moves: np.ndarray, span: int) -> Tuple[int, int]:
+    """Window indexes to read for the samples crossing the midpoint (``moves`` plus a margin for gaps)."""
+    return int(split[moves > 0].min()), min(window.size, int(split[moves > 0].max()) + span)
+
+
+def _shift_split(
+    reader: _SeriesReader,
+    window: np.ndarray,
+    split: np.ndarray,
+    moves: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum of the first ``moves`` finite old samples at or after ``split``, and the split just past them."""
+    if not moves.any():
+        return np.zeros(moves.shape), split
+    span = int(moves.max()) + SPLIT_MARGIN
+    while True:
+        low, high = _split_range(window, split, moves, span)
+        values = reader.values(window[low:high])
+        finite = np.isfinite(values)
+        index = np.arange(low, high)[:, None, None]
+        after = index >= split[None]
+        candidates = finite & after
+        ordinal = np.cumsum(candidates, axis=0)
+        taken = candidates & (ordinal <= moves[None])
+        if (taken.sum(axis=0) >= moves).all() or high >= window.size:
+            break
+        span *= 2
+    moved_sum = np.where(taken, np.where(finite, values, 0.0), 0.0).sum(axis=0)
+    new_split = np.where(moves > 0, split + (after & (ordinal < moves[None])).sum(axis=0) + 1, split)
+    return moved_sum, new_split
+
+
+def _advance_cube(
+    cube: ClimatologyCube,
+    dataset: Any,
+    records: Any,
+    old_length: int,
+    window_days: int,
+    lat_block: int
+) -> Tuple[Dict[str, np.ndarray], int]:
+    """Arrays of ``cube`` after appending ``records`` to ``dataset`` (``old_length`` time steps)."""
+    new_doys = _day_of_year_array(pd.DatetimeIndex(records["time"].values))
+    offsets, positions, added = _appended_windows(
+        np.asarray(cube.window_offsets), np.asarray(cube.window_positions), new_doys, old_length, window_days
+    )
+    affected = [day_index for day_index, block in enumerate(added) if block.size]
+    arrays = {
+        name: np.array(getattr(cube, name))
+        for name in ("hits", "valid", "early_sum", "late_sum", "split", "lat", "lon")
+    }
+    arrays["samples"] = np.diff(offsets).astype(np.int32)
+    arrays["window_offsets"] = offsets
+    arrays["window_positions"] = positions
+
+    lat_count = arrays["lat"].size
+    step = max(1, lat_block)
+    for condition_index, condition in enumerate(cube.meta["conditions"]):
+        settings = CONDITION_SETTINGS[condition]
+        variable = settings["variable"]
+        data = dataset[variable].transpose("time", "lat", "lon")
+        fresh = records[variable]
+        for start in range(0, lat_count, step):
+            lat_slice = slice(start, start + step)
+            reader = _SeriesReader(data.isel(lat=lat_slice), variable)
+            block = _apply_transform(variable, np.asarray(fresh.isel(lat=lat_slice).values, dtype=float))
+            finite = np.isfinite(block)
+            filled = np.where(finite, block, 0.0)
+            with np.errstate(invalid="ignore"):
+                if settings["comparison"] == ">=":
+                    hit = finite & (block >= settings["threshold"])
+                else:
+                    hit = finite & (block <= settings["threshold"])
+
+            plans = []
+            for day_index in affected:
+                target = (day_index, condition_index, lat_slice)
+                rows = added[day_index] - old_length
+                new_finite = finite[rows]
+                old_valid = arrays["valid"][target].astype(np.int64)
+                old_midpoint = old_valid // 2
+                valid = old_valid + new_finite.sum(axis=0)
+                midpoint = valid // 2
+                # Old samples that cross into the early half, and new ones that start in it
+                # (the latter only when the new days outnumber the old).
+                moves = np.minimum(midpoint, old_valid) - old_midpoint
+                new_early_count = np.maximum(midpoint - old_valid, 0)
+                window = positions[offsets[day_index]:offsets[day_index + 1] - rows.size]
+                plans.append((target, rows, new_finite, valid, moves, new_early_count, window))
+
+            # Neighbouring days share most of their crossing samples; read them all in a few runs.
+            wanted = [
+                window[slice(*_split_range(window, arrays["split"][target], moves, int(moves.max()) + SPLIT_MARGIN))]
+                for target, _, _, _, moves, _, window in plans
+                if moves.any()
+            ]
+            if wanted:
+                reader.prefetch(np.concatenate(wanted))
+
+            for target, rows, new_finite, valid, moves, new_early_count, window in plans:
+                moved_sum, split = _shift_split(reader, window, arrays["split"][target].astype(np.int64), moves)
+
+                new_ordinal = np.cumsum(new_finite, axis=0)
+                new_early = new_finite & (new_ordinal <= new_early_count[None])
+                new_late = new_finite & ~new_early
+                split = np.where(
+                    new_early_count > 0,
+                    window.size + (new_ordinal < new_early_count[None]).sum(axis=0) + 1,
+                    split
+                )
+
+                arrays["hits"][target] += hit[rows].sum(axis=0).astype(np.int32)
+                arrays["valid"][target] = valid
+                arrays["early_sum"][target] += moved_sum + np.where(new_early, filled[rows], 0.0).sum(axis=0)
+                arrays["late_sum"][target] += np.where(new_late, filled[rows], 0.0).sum(axis=0) - moved_sum
+                arrays["split"][target] = split
+        LOGGER.info("Ingest: updated %s climatology", condition)
+    return arrays, len(affected)
+
+
+def _staging_manifest(uri: str, manifest: Dict[str, Any], shard_name: str) -> str:
+    updated = dict(manifest)
+    updated["shards"] = list(manifest.get("shards", [])) + [shard_name]
+    root, _ = os.path.splitext(uri)
+    # Keeps the .json suffix (the shard helpers key on it) and the directory relative paths resolve against.
+    staging = f"{root}.staging-{os.getpid()}.json"
+    with open(staging, "w", encoding="utf-8") as handle:
+        json.dump(updated, handle, indent=2)
+    return staging
+
+
+def _current_cube(base: Path, pooled: Any, window_days: int) -> Optional[ClimatologyCube]:
+    for path in (climatology_generation_path(base, pooled.version), base):
+        if not (path / "meta.json").exists():
+            continue
+        try:
+            cube = ClimatologyCube.load(path)
+        except Exception as exc:
+            LOGGER.warning("Ignoring unreadable climatology cube %s: %s", path, exc)
+            continue
+        if cube.matches(pooled, window_days):
+            return cube
+    return None
+
+
+def _prune_generations(base: Path, keep: Sequence[str]) -> None:
+    """Remove cubes for versions other than ``keep`` (the previous one stays for in-flight requests)."""
+    candidates = [base] + sorted(base.parent.glob(f"{base.name}.*"))
+    for path in candidates:
+        if ".tmp-" in path.name or not (path / "meta.json").exists():
+            continue
+        try:
+            with (path / "meta.json").open("r", encoding="utf-8") as handle:
+                version = json.load(handle).get("dataset_version")
+        except (OSError, ValueError):
+            continue
+        if version not in keep:
+            # Best effort: on Windows a cube still mapped by a server cannot be deleted yet.
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def ingest_records(
+    manifest_uri: str,
+    sources: Sequence[str],
+    *,
+    window_days: int,
+    lat_block: int = 8
+) -> IngestReport:
+    """Append the days in ``sources`` that follow the dataset's last day; see the module docstring."""
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+    if not manifest_uri.endswith(".json"):
+        raise ValueError(
+            "Ingest appends shards to a JSON manifest. Create one listing the current file, e.g. "
+            '{"shards": ["merra2_daily.nc"]}, point WEATHERWISE_DATASET at it, then ingest.'
+        )
+    started = time.perf_counter()
+    report = IngestReport(manifest=manifest_uri)
+    manifest = _load_manifest(manifest_uri)
+
+    pooled = get_dataset_pool().acquire(manifest_uri)
+    dataset = pooled.dataset
+    time_index = pd.DatetimeIndex(dataset.indexes["time"])
+    records = _new_records(sources, dataset, time_index[-1].to_datetime64())
+    report.days_added = int(records.sizes["time"])
+    if report.days_added == 0:
+        report.notes.append(f"No records after {time_index[-1]:%Y-%m-%d}; nothing to ingest.")
+        report.seconds = round(time.perf_counter() - started, 3)
+        return report
+
+    new_times = pd.DatetimeIndex(records["time"].values)
+    shard_name = f"ingest-{new_times[0]:%Y%m%d}-{new_times[-1]:%Y%m%d}.nc"
+    shard_path = os.path.join(os.path.dirname(os.path.abspath(manifest_uri)), shard_name)
+    if os.path.exists(shard_path):
+        raise FileExistsError(f"{shard_path} already exists; remove it or restore the manifest that listed it.")
+    staging_shard = f"{shard_path}.tmp-{os.getpid()}"
+    records.to_netcdf(staging_shard)
+    os.replace(staging_shard, shard_path)
+    report.shard = shard_path
+
+    staging = _staging_manifest(manifest_uri, manifest, shard_name)
+    try:
+        # A rename keeps the file's mtime, so the staged manifest already has the final version.
+        version = _version_for(sharded_signature(staging))
+        build_shard_index(staging, index_path_for(manifest_uri))
+        report.version = version
+        report.time_range = f"{time_index[0]:%Y-%m-%d} to {new_times[-1]:%Y-%m-%d}"
+
+        base = climatology_path_for(manifest_uri, window_days)
+        cube = _current_cube(base, pooled, window_days) if base is not None else None
+        stale = base is not None and cube is None and (
+            (base / "meta.json").exists() or (climatology_generation_path(base, pooled.version) / "meta.json").exists()
+        )
+        arrays: Optional[Dict[str, np.ndarray]] = None
+        conditions: List[str] = []
+        if cube is not None and cube.split is not None:
+            arrays, report.affected_days_of_year = _advance_cube(
+                cube, dataset, records, time_index.size, window_days, lat_block
+            )
+            conditions = list(cube.meta["conditions"])
+            report.climatology_mode = "incremental"
+        elif cube is not None or stale:
+            # No split array, or built for another version: rebuild once from the staged dataset.
+            staged = open_sharded(staging)
+            try:
+                arrays, conditions = compute_climatology_arrays(staged, window_days, lat_block=lat_block)
+            finally:
+                staged.close()
+            report.affected_days_of_year = CLIMATOLOGY_DAYS
+            report.climatology_mode = "rebuilt"
+        else:
+            report.notes.append("No climatology cube for this dataset; only the data was appended.")
+
+        if arrays is not None and base is not None:
+            meta = {
+                "format": CLIMATOLOGY_FORMAT,
+                "dataset_uri": _canonical_uri(manifest_uri),
+                "dataset_version": version,
+                "window_days": window_days,
+                "fingerprint": _conditions_fingerprint(),
+                "conditions": conditions,
+                "time_range": report.time_range,
+                "built_at": datetime.utcnow().isoformat() + "Z"
+            }
+            report.climatology = str(write_climatology_cube(climatology_generation_path(base, version), arrays, meta))
+
+        os.replace(staging, manifest_uri)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+    if report.climatology is not None and base is not None:
+        _prune_generations(base, keep=(pooled.version, version))
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
@@ -1,18 +1,41 @@
 from __future__ import annotations
 
+import json
+import logging
+import math
+import os
+import sys
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, ConfigDict, field_validator
-
-from .data_fetcher import get_fetcher
-from .groq_insights import GroqClientError, call_groq_api
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, field_validator
+
+# numpy, pandas, xarray and groq are imported on first use (or by the background warm-up)
+# so the server starts accepting connections quickly after a cold start.
+from .conditions import CONDITION_SETTINGS
+from .dataset_pool import get_dataset_pool
+from .encoding import VARY_HEADER, compress, encode, negotiate_content_encoding, negotiate_media_type
+from .executor import ExecutorDeadlineExceeded, ExecutorSaturated, get_executor, shutdown_executor
+from .http_cache import etag_matches, query_cache_control, weak_etag
+from .metrics import METRICS_ENABLED, TimingMiddleware, render_metrics, stage
+from .result_cache import get_result_cache
+from .warmup import Warmup
 
 ROOT = Path(__file__).resolve().parents[1]
 
+LOGGER = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = int(os.getenv("WEATHERWISE_MAX_BATCH_ITEMS", "200"))
+MAX_INSIGHT_BATCH_ITEMS = int(os.getenv("WEATHERWISE_MAX_INSIGHT_BATCH_ITEMS", "500"))
+DEFAULT_CURVE_POINTS = 50
+MAX_CURVE_POINTS = 1000
+
 
 class Location(BaseModel):
     lat: float = Field(..., ge=-90, le=90)
@@ -24,6 +47,9 @@ class WeatherQuery(BaseModel):
     location: Location
     date_of_year: str
     conditions: List[str]
+    thresholds: Optional[Dict[str, float]] = None
+    exceedance_curve: bool = False
+    curve_points: int = Field(default=DEFAULT_CURVE_POINTS, ge=2, le=MAX_CURVE_POINTS)
 
     @field_validator("date_of_year")
     @classmethod
@@ -34,6 +60,34 @@ class WeatherQuery(BaseModel):
             raise ValueError("date_of_year must be formatted as MM-DD") from exc
         return value
 
+    @field_validator("thresholds")
+    @classmethod
+    def validate_thresholds(cls, value: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+        if not value:
+            return None
+        unknown = sorted(set(value) - set(CONDITION_SETTINGS))
+        if unknown:
+            raise ValueError(f"Unknown conditions in thresholds: {', '.join(unknown)}")
+        if not all(math.isfinite(threshold) for threshold in value.values()):
+            raise ValueError("Thresholds must be finite numbers")
+        return value
+
+    @property
+    def requested_curve_points(self) -> int:
+        return self.curve_points if self.exceedance_curve else 0
+
+
+class BatchWeatherQuery(BaseModel):
+    # Items are validated one by one in the handler, so one malformed item fails alone.
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class RiskCalendarQuery(BaseModel):
+    location: Location
+    conditions: List[str] = Field(..., min_length=1)
+    top_n: int = Field(default=0, ge=0, le=20)
+    window_length: int = Field(default=7, ge=1, le=90)
+
 
 class WeatherConditionThreshold(BaseModel):
     value: float
@@ -71,9 +125,75 @@ class InsightRequest(BaseModel):
     metadata: WeatherMetadata
     summaries: Optional[List[WeatherSummary]] = None
     user_prompt: Optional[str] = Field(default=None, alias="userPrompt")
+    latency_budget_ms: Optional[int] = Field(default=None, alias="latencyBudgetMs", ge=0, le=60000)
+
+
+class BatchInsightRequest(BaseModel):
+    items: List[InsightRequest] = Field(..., min_length=1, max_length=MAX_INSIGHT_BATCH_ITEMS)
+    fallback: bool = False
+
+
+WARMUP = Warmup()
+
+
+def _run_query(*args: Any) -> Dict[str, Any]:
+    from .data_fetcher import run_query
+
+    return run_query(*args)
+
+
+def _run_conditional_query(
+    if_none_match: Optional[str],
+    media_type: str,
+    *args: Any
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """``(None, etag)`` when the client's copy is current, otherwise ``(response, etag)``."""
+    from .data_fetcher import run_query, run_query_etag
+
+    with stage("etag"):
+        digest = run_query_etag(*args)
+    etag = weak_etag(digest, media_type) if digest else None
+    if etag is not None and etag_matches(if_none_match, etag):
+        return None, etag
+    return run_query(*args), etag
+
+
+def _run_query_batch(items: List[Dict[str, Any]]) -> List[Any]:
+    from .data_fetcher import run_query_batch
 
+    return run_query_batch(items)
 
-app = FastAPI(title="WeatherWise Planner API")
+
+def _run_risk_calendar(*args: Any) -> Dict[str, Any]:
+    from .data_fetcher import run_risk_calendar
+
+    return run_risk_calendar(*args)
+
+
+def _render_tile(*args: Any) -> bytes:
+    from .tiles import render_tile
+
+    return render_tile(*args)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    WARMUP.start()
+    yield
+    await WARMUP.stop()
+    if f"{__package__}.groq_insights" in sys.modules:
+        # Loaded by a request or the warm-up; importing by name waits for a half-finished import.
+        from .groq_insights import close_async_client, get_insight_cache
+
+        await close_async_client()
+        get_insight_cache().save()
+    shutdown_executor()
+
+
+app = FastAPI(title="WeatherWise Planner API", lifespan=lifespan)
+
+if METRICS_ENABLED:
+    app.add_middleware(TimingMiddleware)
 
 # Configure CORS for both development and production
 app.add_middleware(
@@ -108,19 +228,73 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready", response_model=None)
+async def readiness() -> JSONResponse:
+    """Readiness probe: 503 with per-step progress until the background warm-up has succeeded"""
+    status = WARMUP.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
-@app.post("/query")
-async def query_weather(payload: WeatherQuery) -> dict:
-    if not payload.conditions:
-        raise HTTPException(status_code=400, detail="Select at least one weather condition.")
 
-    fetcher = get_fetcher()
-    response = fetcher.query(
-        lat=payload.location.lat,
-        lon=payload.location.lon,
-        date_of_year=payload.date_of_year,
-        conditions=payload.conditions
-    )
+@app.get("/stats")
+async def runtime_stats() -> dict:
+    """Runtime counters for sizing caches and pools"""
+    from .groq_insights import get_circuit_breaker, get_insight_cache
+    from .rate_limit import get_rate_limiter
+    from .shared_arrays import shared_arrays_stats
+    from .tiles import get_tile_cache
+
+    return {
+        "dataset_pool": get_dataset_pool().stats(),
+        "result_cache": get_result_cache().stats(),
+        "tile_cache": get_tile_cache().stats(),
+        "executor": get_executor().stats(),
+        "insight_cache": get_insight_cache().stats(),
+        "insight_breaker": get_circuit_breaker().stats(),
+        "insight_rate_limit": get_rate_limiter().stats(),
+        "shared_arrays": shared_arrays_stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Per-stage and per-route latency histograms in the Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def _encoded_response(
+    request: Request,
+    payload: Dict[str, Any],
+    *,
+    media_type: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serialize as JSON or MessagePack, per ``Accept``, and compress per ``Accept-Encoding``."""
+    media_type = media_type or negotiate_media_type(request.headers.get("accept"))
+    with stage("serialize"):
+        body = encode(payload, media_type)
+    with stage("compress"):
+        body, coding = compress(body, negotiate_content_encoding(request.headers.get("accept-encoding")))
+    headers = {"Vary": VARY_HEADER, **(headers or {})}
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def _compute(func: Any, *args: Any) -> Any:
+    """Run blocking dataset work on the compute executor, mapping backpressure to HTTP errors."""
+    try:
+        return await get_executor().run(func, *args)
+    except ExecutorSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)}
+        ) from exc
+    except ExecutorDeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+
+
+def _finalize_query_response(response: Dict[str, Any]) -> Dict[str, Any]:
     response.setdefault("metadata", {})
     metadata = response["metadata"]
     metadata.setdefault("generated_at", datetime.utcnow().isoformat() + "Z")
@@ -133,16 +307,261 @@ async def query_weather(payload: WeatherQuery) -> dict:
     return response
 
 
+@app.post("/query", response_model=None)
+async def query_weather(payload: WeatherQuery, request: Request) -> Response:
+    if not payload.conditions:
+        raise HTTPException(status_code=400, detail="Select at least one weather condition.")
+
+    response = await _compute(
+        _run_query,
+        payload.location.lat,
+        payload.location.lon,
+        payload.date_of_year,
+        payload.conditions,
+        payload.thresholds,
+        payload.requested_curve_points
+    )
+    return _encoded_response(request, _finalize_query_response(response))
+
+
+def _parse_thresholds(value: Optional[str]) -> Optional[Dict[str, float]]:
+    """``very_hot:30,very_wet:12`` -> ``{"very_hot": 30.0, "very_wet": 12.0}``."""
+    if not value:
+        return None
+    thresholds: Dict[str, float] = {}
+    for pair in value.split(","):
+        name, _, number = pair.partition(":")
+        try:
+            thresholds[name.strip()] = float(number)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail="thresholds must look like very_hot:30,very_wet:12") from exc
+    return thresholds
+
+
+@app.get("/query", response_model=None)
+async def query_weather_cacheable(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    date_of_year: str = Query(..., description="MM-DD"),
+    conditions: List[str] = Query(..., description="Comma-separated or repeated condition names"),
+    thresholds: Optional[str] = Query(default=None, description="Custom cutoffs, e.g. very_hot:30,very_wet:12"),
+    exceedance_curve: bool = False,
+    curve_points: int = Query(default=DEFAULT_CURVE_POINTS, ge=2, le=MAX_CURVE_POINTS)
+) -> Response:
+    """``/query`` as a GET, with an ETag and ``Cache-Control`` so browsers and CDNs can reuse it."""
+    try:
+        payload = WeatherQuery(
+            location=Location(lat=lat, lon=lon),
+            date_of_year=date_of_year,
+            conditions=[name for value in conditions for name in value.split(",") if name],
+            thresholds=_parse_thresholds(thresholds),
+            exceedance_curve=exceedance_curve,
+            curve_points=curve_points
+        )
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors()) from exc
+    if not payload.conditions:
+        raise HTTPException(status_code=400, detail="Select at least one weather condition.")
+
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    response, etag = await _compute(
+        _run_conditional_query,
+        request.headers.get("if-none-match"),
+        media_type,
+        payload.location.lat,
+        payload.location.lon,
+        payload.date_of_year,
+        payload.conditions,
+        payload.thresholds,
+        payload.requested_curve_points
+    )
+    # Without a tag (the dataset could not be opened) the answer may be a fallback; don't let it be kept.
+    headers = {"Cache-Control": query_cache_control() if etag else "no-cache"}
+    if etag:
+        headers["ETag"] = etag
+    if response is None:
+        return Response(status_code=304, headers={"Vary": VARY_HEADER, **headers})
+    return _encoded_response(request, _finalize_query_response(response), media_type=media_type, headers=headers)
+
+
+def _validation_message(exc: ValidationError) -> str:
+    """One line per field error, e.g. ``location.lat: Input should be less than or equal to 90``."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    )
+
+
+@app.post("/query/batch", response_model=None)
+async def query_weather_batch(payload: BatchWeatherQuery, request: Request) -> Response:
+    """Evaluate many location/date pairs together; failures are reported per item."""
+    items: List[Dict[str, Any]] = [{"index": index} for index in range(len(payload.items))]
+    queries: Dict[int, WeatherQuery] = {}
+    for index, raw in enumerate(payload.items):
+        try:
+            query = WeatherQuery.model_validate(raw)
+        except ValidationError as exc:
+            items[index]["error"] = _validation_message(exc)
+            continue
+        if query.conditions:
+            queries[index] = query
+        else:
+            items[index]["error"] = "Select at least one weather condition."
+
+    pending = list(queries)
+    outcomes = await _compute(_run_query_batch, [
+        {
+            "lat": queries[index].location.lat,
+            "lon": queries[index].location.lon,
+            "date_of_year": queries[index].date_of_year,
+            "conditions": queries[index].conditions,
+            "thresholds": queries[index].thresholds,
+            "curve_points": queries[index].requested_curve_points
+        }
+        for index in pending
+    ]) if pending else []
+    for index, outcome in zip(pending, outcomes):
+        if isinstance(outcome, Exception):
+            items[index]["error"] = str(outcome)
+        else:
+            items[index]["response"] = _finalize_query_response(outcome)
+    return _encoded_response(request, {"items": items})
+
+
+@app.post("/query/calendar", response_model=None)
+async def query_risk_calendar(payload: RiskCalendarQuery, request: Request) -> Response:
+    """Probability for every day of the year at one location, plus optional lowest-risk windows."""
+    try:
+        response = await _compute(
+            _run_risk_calendar,
+            payload.location.lat,
+            payload.location.lon,
+            payload.conditions,
+            payload.top_n,
+            payload.window_length
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except (FileNotFoundError, RuntimeError) as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return _encoded_response(request, response)
+
+
+@app.get("/tiles/{condition}/{z}/{x}/{y}.{fmt}", response_model=None)
+async def probability_tile(
+    condition: str,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str,
+    date_of_year: str = Query(..., description="MM-DD")
+) -> Response:
+    """Heatmap tile of a condition's probability; ``png`` for display, ``bin`` for packed percentages."""
+    from .tiles import TILE_FORMATS
+
+    if fmt not in TILE_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown tile format {fmt!r}.")
+    if condition not in CONDITION_SETTINGS:
+        raise HTTPException(status_code=404, detail=f"Unknown condition {condition!r}.")
+    try:
+        normalized_date = datetime.strptime(date_of_year, "%m-%d").strftime("%m-%d")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="date_of_year must be formatted as MM-DD") from exc
+
+    try:
+        tile = await _compute(_render_tile, condition, normalized_date, z, x, y, fmt)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except (FileNotFoundError, RuntimeError) as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return Response(
+        content=tile,
+        media_type=TILE_FORMATS[fmt],
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
+
+
+def _insight_budget(payload: InsightRequest) -> float:
+    from .groq_insights import latency_budget
+
+    return latency_budget(payload.latency_budget_ms)
+
+
 @app.post("/insights")
-async def generate_ai_insight(payload: InsightRequest) -> dict[str, str]:
+async def generate_ai_insight(payload: InsightRequest) -> dict[str, Any]:
+    """Groq insight, or a template one (``fallback: true``) when Groq misses the latency budget"""
+    from .groq_insights import GroqClientError, agenerate_insight
+
     try:
-        insight = call_groq_api(
+        result = await agenerate_insight(
             payload.model_dump(by_alias=True),
-            user_prompt=payload.user_prompt
+            user_prompt=payload.user_prompt,
+            budget=_insight_budget(payload)
         )
     except GroqClientError as exc:  # pragma: no cover - external service
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
-    return {
-        "insight": insight
-    }
+    return result.as_response()
+
+
+@app.post("/insights/batch")
+async def generate_ai_insight_batch(payload: BatchInsightRequest) -> dict[str, Any]:
+    """Insights for many payloads under the Groq rate limits; failures are reported per item."""
+    from .groq_insights import GroqClientError, agenerate_insight_batch
+
+    try:
+        return await agenerate_insight_batch(
+            [(item.model_dump(by_alias=True), item.user_prompt) for item in payload.items],
+            fallback=payload.fallback
+        )
+    except GroqClientError as exc:  # pragma: no cover - external service
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/insights/stream")
+async def stream_ai_insight(payload: InsightRequest) -> StreamingResponse:
+    """Stream the insight as server-sent events: ``start``, ``delta`` chunks, then ``done`` or ``error``.
+
+    A template insight replaces a Groq stream whose first token misses the latency budget;
+    ``done`` then carries ``fallback: true`` and the reason.
+    """
+    from .groq_insights import GroqClientError, astream_insight, open_async_client
+
+    try:
+        open_async_client()
+    except GroqClientError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    request_payload = payload.model_dump(by_alias=True)
+
+    async def events() -> AsyncIterator[str]:
+        # An immediate event gets headers and first bytes to the browser before Groq answers.
+        yield _sse_event("start", {})
+        # When the client disconnects Starlette cancels this generator; the upstream stream is
+        # closed in astream_groq_api's cleanup so the generation stops too.
+        fallback_reason: Optional[str] = None
+        try:
+            async with aclosing(
+                astream_insight(request_payload, user_prompt=payload.user_prompt, budget=_insight_budget(payload))
+            ) as parts:
+                async for part in parts:
+                    fallback_reason = part.fallback_reason
+                    yield _sse_event("delta", {"text": part.text})
+        except GroqClientError as exc:
+            yield _sse_event("error", {"detail": str(exc)})
+            return
+        if fallback_reason:
+            yield _sse_event("done", {"fallback": True, "fallback_reason": fallback_reason})
+        else:
+            yield _sse_event("done", {"fallback": False})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
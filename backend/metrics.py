@@ -0,0 +1,177 @@
+"""
+Per-stage latency instrumentation.
+
+Code paths wrap their stages in :func:`stage` (``with stage("window"): ...``). Each stage's
+duration goes into the ``weatherwise_stage_seconds`` histogram and, while a request is being
+served, into that request's ``Server-Timing`` header. :class:`TimingMiddleware` adds the
+header and the ``weatherwise_request_seconds`` histogram per route; :func:`render_metrics`
+produces the Prometheus text format served on ``/metrics``.
+
+Set ``WEATHERWISE_METRICS=0`` to turn everything off: :func:`stage` then returns one shared
+no-op context manager and the middleware is not installed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_ENABLED = os.getenv("WEATHERWISE_METRICS", "1").lower() not in {"0", "false", "no"}
+
+# Stage timings of the request being served. Executor threads run in a copy of the caller's
+# context, which shares this list, so stages timed off the event loop still reach the header.
+_REQUEST_TIMINGS: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "weatherwise_request_timings",
+    default=None
+)
+_NULL_STAGE = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by label values, rendered for Prometheus."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # Per series: one count per bucket (non-cumulative), then +Inf count and sum.
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in sorted(self._series.items())}
+        for label_values, series in snapshot.items():
+            labels = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(self.labels, label_values))
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {cumulative:g}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative:g}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative:g}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram(
+    "weatherwise_stage_seconds",
+    "Time spent in each instrumented stage of request handling.",
+    ("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "weatherwise_request_seconds",
+    "End-to-end HTTP request latency by route.",
+    ("method", "route", "status")
+)
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        record(self.name, time.perf_counter() - self.started)
+
+
+def stage(name: str) -> ContextManager[Any]:
+    """Time the enclosed block as stage ``name``."""
+    if not METRICS_ENABLED:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Record a stage duration measured by the caller."""
+    if not METRICS_ENABLED:
+        return
+    STAGE_SECONDS.observe(seconds, name)
+    timings = _REQUEST_TIMINGS.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def server_timing(timings: Sequence[Tuple[str, float]], total: float) -> str:
+    """``Server-Timing`` value with repeated stages summed, in first-seen order, plus ``total``."""
+    merged: Dict[str, float] = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    merged["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in merged.items())
+
+
+class TimingMiddleware:
+    """ASGI middleware adding ``Server-Timing`` and observing request latency per route.
+
+    The header is written when the response starts, so for streamed responses ``total`` is
+    the time to the first byte; the request histogram covers the full response.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _REQUEST_TIMINGS.set(timings)
+        started = time.perf_counter()
+        status = ["500"]
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+                header = server_timing(timings, time.perf_counter() - started)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _REQUEST_TIMINGS.reset(token)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], _route_label(scope), status[0])
+
+
+def _route_label(scope: Dict[str, Any]) -> str:
+    # The route template (not the raw path) keeps tile URLs from creating one series each.
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched")
+
+
+def render_metrics() -> str:
+    return "\n".join(STAGE_SECONDS.render() + REQUEST_SECONDS.render()) + "\n"
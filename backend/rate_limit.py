@@ -0,0 +1,155 @@
+"""
+Token-bucket scheduling for calls to a rate-limited API (Groq).
+
+Groq limits each key by requests per minute and tokens per minute. :class:`RateLimiter`
+keeps one bucket for each, refilled continuously, and makes callers wait in arrival order
+until both hold enough for their call. A ``429`` pauses everyone until its retry time.
+
+Buckets hold ``burst`` seconds' worth of allowance rather than a whole minute. Providers
+may enforce per-minute limits over shorter windows, so a full minute's burst at once can
+still be rejected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_REQUESTS_PER_MINUTE = 30.0
+DEFAULT_TOKENS_PER_MINUTE = 12000.0
+DEFAULT_BURST_SECONDS = 10.0
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` per second and holds up to ``burst`` seconds of it.
+
+    The level may go negative when usage is charged after the fact; callers then wait
+    until it is paid back. ``per_minute <= 0`` means unlimited.
+    """
+
+    def __init__(self, per_minute: float, *, burst: float = DEFAULT_BURST_SECONDS, clock: Callable[[], float] = time.monotonic) -> None:
+        self.per_minute = max(0.0, per_minute)
+        self.capacity = max(1.0, self.per_minute * min(60.0, max(burst, 0.0)) / 60)
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def level(self) -> float:
+        if self.unlimited:
+            return float("inf")
+        self._refill()
+        return self._level
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` (capped at the capacity) is available."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        # A single call larger than the bucket only waits for a full bucket.
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self._level -= amount
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets shared by every Groq caller in the process."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        burst: float = DEFAULT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._clock = clock
+        self.requests = TokenBucket(requests_per_minute, burst=burst, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, burst=burst, clock=clock)
+        self._lock: Optional[asyncio.Lock] = None
+        self._paused_until = 0.0
+        self._acquired = 0
+        self._waited_seconds = 0.0
+        self._pauses = 0
+
+    def _wait_time(self, tokens: float) -> float:
+        return max(
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+            self._paused_until - self._clock()
+        )
+
+    async def acquire(self, tokens: float) -> float:
+        """Wait for one request and ``tokens`` tokens, take them and return the seconds waited."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = self._clock()
+        # Holding the lock while sleeping keeps callers first-come, first-served.
+        async with self._lock:
+            while True:
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+        waited = self._clock() - started
+        self._acquired += 1
+        self._waited_seconds += waited
+        return waited
+
+    def charge(self, tokens: float) -> None:
+        """Record a call made without :meth:`acquire` (e.g. an interactive insight) so batches yield to it."""
+        self.requests.take(1)
+        self.tokens.take(tokens)
+
+    def settle(self, estimated: float, actual: float) -> None:
+        """Correct a token estimate once the response reports real usage."""
+        self.tokens.take(actual - estimated)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds``, e.g. after the API answered ``429``."""
+        until = self._clock() + max(0.0, seconds)
+        if until > self._paused_until:
+            self._paused_until = until
+            self._pauses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests.per_minute,
+            "tokens_per_minute": self.tokens.per_minute,
+            "requests_available": None if self.requests.unlimited else round(self.requests.level(), 2),
+            "tokens_available": None if self.tokens.unlimited else round(self.tokens.level(), 1),
+            "acquired": self._acquired,
+            "waited_seconds": round(self._waited_seconds, 3),
+            "pauses": self._pauses
+        }
+
+
+_RATE_LIMITER: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured by GROQ_RATE_LIMIT_RPM, GROQ_RATE_LIMIT_TPM (``0`` = unlimited) and GROQ_RATE_LIMIT_BURST."""
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None:
+        _RATE_LIMITER = RateLimiter(
+            requests_per_minute=float(os.getenv("GROQ_RATE_LIMIT_RPM", str(DEFAULT_REQUESTS_PER_MINUTE))),
+            tokens_per_minute=float(os.getenv("GROQ_RATE_LIMIT_TPM", str(DEFAULT_TOKENS_PER_MINUTE))),
+            burst=float(os.getenv("GROQ_RATE_LIMIT_BURST", str(DEFAULT_BURST_SECONDS)))
+        )
+    return _RATE_LIMITER
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Set
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_MEGABYTES = 64.0
+
+# Rough per-object costs used to keep the cache inside its memory budget.
+_ENTRY_OVERHEAD_BYTES = 512
+_RESULT_OVERHEAD_BYTES = 640
+_HISTORY_VALUE_BYTES = 32
+
+
+class ResultKey(NamedTuple):
+    """Identifies one grid cell's answer for one target day; raw lat/lon never appear here."""
+
+    uri: str
+    version: str
+    window_days: int
+    lat_index: int
+    lon_index: int
+    day_of_year: int
+
+
+@dataclass
+class CachedCell:
+    """Per-condition results plus the metadata shared by every condition of a grid cell."""
+
+    time_range: str
+    samples: int
+    lat: float
+    lon: float
+    # ``None`` records a condition that was evaluated but produced no result.
+    results: Dict[str, Optional[Dict[str, Any]]] = field(default_factory=dict)
+    nbytes: int = _ENTRY_OVERHEAD_BYTES
+
+
+def _result_size(result: Optional[Dict[str, Any]]) -> int:
+    if result is None:
+        return 64
+    return _RESULT_OVERHEAD_BYTES + _HISTORY_VALUE_BYTES * len(result.get("historical_values", ()))
+
+
+def copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached condition result so callers can never mutate the cached one."""
+    return {
+        **result,
+        "threshold": dict(result["threshold"]),
+        "historical_values": list(result["historical_values"])
+    }
+
+
+class ResultCache:
+    """Thread-safe LRU of per-cell query results bounded by entry count and estimated bytes.
+
+    Entries are keyed by the dataset version as well as its URI; the first lookup that sees a
+    new version for a URI drops everything cached for the old one. Requests still running
+    against a version that has since been replaced neither flush nor fill the cache.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = int(DEFAULT_MAX_MEGABYTES * 1024 * 1024)) -> None:
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[ResultKey, CachedCell]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._superseded: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._partial_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _check_version(self, key: ResultKey) -> bool:
+        """Record ``key``'s version as current for its URI; ``False`` if it was already replaced."""
+        current = self._versions.get(key.uri)
+        if current == key.version:
+            return True
+        superseded = self._superseded.setdefault(key.uri, set())
+        if key.version in superseded:
+            return False
+        if current is not None:
+            stale = [existing for existing in self._entries if existing.uri == key.uri]
+            for existing in stale:
+                self._bytes -= self._entries.pop(existing).nbytes
+            superseded.add(current)
+            self._invalidations += 1
+        self._versions[key.uri] = key.version
+        return True
+
+    def lookup(self, key: ResultKey, conditions: Iterable[str]) -> Optional[CachedCell]:
+        """Return the cached cell (possibly covering only some ``conditions``) and count the outcome."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key) if self._check_version(key) else None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if all(condition in entry.results for condition in conditions):
+                self._hits += 1
+            else:
+                self._partial_hits += 1
+            return entry
+
+    def store(self, key: ResultKey, cell: CachedCell, results: Dict[str, Optional[Dict[str, Any]]]) -> CachedCell:
+        """Merge freshly computed ``results`` into the entry for ``key`` and return it."""
+        if not self.enabled:
+            cell.results.update(results)
+            return cell
+        with self._lock:
+            if not self._check_version(key):
+                cell.results.update(results)
+                return cell
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = cell
+                self._entries[key] = entry
+                self._bytes += entry.nbytes
+            for condition, result in results.items():
+                previous = entry.results.get(condition)
+                if condition in entry.results:
+                    entry.nbytes -= _result_size(previous)
+                    self._bytes -= _result_size(previous)
+                entry.results[condition] = result
+                entry.nbytes += _result_size(result)
+                self._bytes += _result_size(result)
+            self._entries.move_to_end(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+            return entry
+
+    def invalidate(self, uri: Optional[str] = None) -> None:
+        with self._lock:
+            if uri is None:
+                self._entries.clear()
+                self._versions.clear()
+                self._superseded.clear()
+                self._bytes = 0
+            else:
+                for existing in [key for key in self._entries if key.uri == uri]:
+                    self._bytes -= self._entries.pop(existing).nbytes
+                self._versions.pop(uri, None)
+                self._superseded.pop(uri, None)
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._partial_hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "partial_hits": self._partial_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations
+            }
+
+
+_CACHE: Optional[ResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                entries = int(os.getenv("WEATHERWISE_RESULT_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES)))
+                megabytes = float(os.getenv("WEATHERWISE_RESULT_CACHE_MB", str(DEFAULT_MAX_MEGABYTES)))
+                _CACHE = ResultCache(max_entries=entries, max_bytes=int(megabytes * 1024 * 1024))
+    return _CACHE
@@ -0,0 +1,75 @@
+"""
+Production launcher: ``python -m backend.serve [--workers N] [--share-dataset]``.
+
+Plain ``uvicorn backend.main:app`` runs one process. With ``--workers`` several processes
+serve requests, and ``--share-dataset`` first copies the configured dataset into a shared
+read-only snapshot (see :mod:`backend.shared_arrays`) that every worker memory-maps instead
+of opening its own copy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from typing import List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "0").lower() in {"1", "true", "yes"}
+
+
+def prepare_shared_dataset() -> bool:
+    """Export the configured dataset's snapshot before workers start; ``False`` if there is none."""
+    from .data_fetcher import SAMPLE_NETCDF
+    from .shared_arrays import export_snapshot
+
+    if _env_flag("WEATHERWISE_FORCE_MOCK"):
+        LOGGER.info("Mock mode: no dataset to share")
+        return False
+    uri = os.getenv("WEATHERWISE_DATASET") or (str(SAMPLE_NETCDF) if SAMPLE_NETCDF.exists() else None)
+    if not uri:
+        LOGGER.info("No dataset configured: nothing to share")
+        return False
+    try:
+        path = export_snapshot(uri)
+    except Exception as exc:
+        # Workers still serve the dataset, each through its own handle.
+        LOGGER.warning("Could not build a shared snapshot of %s: %s", uri, exc)
+        return False
+    LOGGER.info("Workers will share %s from %s", uri, path)
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.serve", description="Run the WeatherWise API.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEATHERWISE_WORKERS", "1")),
+        help="Worker processes (default WEATHERWISE_WORKERS or 1)"
+    )
+    parser.add_argument(
+        "--share-dataset",
+        action="store_true",
+        default=_env_flag("WEATHERWISE_SHARED_ARRAYS"),
+        help="Load the dataset once into shared memory and map it read-only in every worker"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    # Workers inherit the environment, so this decides how each one opens the dataset.
+    os.environ["WEATHERWISE_SHARED_ARRAYS"] = "1" if args.share_dataset and prepare_shared_dataset() else "0"
+
+    import uvicorn
+
+    uvicorn.run("backend.main:app", host=args.host, port=args.port, workers=max(1, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
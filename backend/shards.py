@@ -0,0 +1,425 @@
+"""
+Federated datasets spread over many files.
+
+``WEATHERWISE_DATASET`` may name a JSON manifest, a glob such as ``/data/merra2/*.nc`` or a
+directory of NetCDF files instead of a single file. Each shard may hold any time span and
+lat/lon region of one regular grid, e.g. one file per year or per continent.
+
+A lightweight index records what each shard covers (compact coordinate ranges, variables
+and a file signature). It is stored next to a manifest as ``<manifest>.index.json`` (or at
+``WEATHERWISE_SHARD_INDEX``) and only rebuilt for shards whose files changed. The shards
+are presented as one lazily-indexed ``xarray.Dataset`` on the union grid. A read opens only
+the shards its selection touches, through a small LRU of handles
+(``WEATHERWISE_SHARD_HANDLES``), so memory and open files stay bounded as the archive grows.
+
+Manifest format::
+
+    {"shards": ["merra2_2000.nc", "merra2_2001.nc", "..."]}
+
+Relative paths resolve against the manifest's directory; globs are allowed in the list.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import xarray as xr  # type: ignore
+    from xarray.backends import BackendArray  # type: ignore
+    from xarray.core import indexing  # type: ignore
+except Exception:  # pragma: no cover - optional dependency for demo
+    xr = None
+    BackendArray = object  # type: ignore[assignment,misc]
+    indexing = None
+
+from .dataset_pool import ZARR_MARKERS
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+DEFAULT_SHARD_HANDLES = 8
+# Seconds between full re-listings of a shard set on the query path.
+DEFAULT_SIGNATURE_RECHECK = 5.0
+SHARD_SUFFIXES = (".nc", ".nc4", ".netcdf")
+GLOB_CHARACTERS = ("*", "?", "[")
+AXES = ("time", "lat", "lon")
+
+
+def is_sharded_source(uri: str) -> bool:
+    if uri.startswith(("http://", "https://")):
+        return False
+    if uri.endswith(".json") or any(character in uri for character in GLOB_CHARACTERS):
+        return True
+    return os.path.isdir(uri) and not any(os.path.exists(os.path.join(uri, marker)) for marker in ZARR_MARKERS)
+
+
+def shard_paths(uri: str) -> List[str]:
+    """Resolve a manifest, glob or directory to the sorted list of shard files."""
+    if uri.endswith(".json"):
+        with open(uri, "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        entries = manifest.get("shards", []) if isinstance(manifest, dict) else manifest
+        base = os.path.dirname(os.path.abspath(uri))
+        paths: List[str] = []
+        for entry in entries:
+            pattern = entry if os.path.isabs(entry) else os.path.join(base, entry)
+            matches = sorted(glob.glob(pattern)) if any(c in pattern for c in GLOB_CHARACTERS) else [pattern]
+            paths.extend(matches)
+    elif os.path.isdir(uri):
+        paths = sorted(
+            os.path.join(uri, name) for name in os.listdir(uri) if name.lower().endswith(SHARD_SUFFIXES)
+        )
+    else:
+        paths = sorted(glob.glob(uri))
+    if not paths:
+        raise FileNotFoundError(f"No dataset shards found for {uri}.")
+    return [os.path.abspath(path) for path in paths]
+
+
+def _stat_signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def sharded_signature(uri: str) -> Optional[Tuple[int, int]]:
+    """Change marker for a shard set: newest mtime (manifest included) and a digest of every shard's signature."""
+    try:
+        paths = shard_paths(uri)
+        signatures = [_stat_signature(path) for path in paths]
+        newest = max(mtime for mtime, _ in signatures)
+        if uri.endswith(".json"):
+            newest = max(newest, os.stat(uri).st_mtime_ns)
+    except OSError:
+        return None
+    digest = hashlib.sha256(json.dumps([paths, signatures]).encode("utf-8")).hexdigest()
+    return newest, int(digest[:12], 16)
+
+
+_SIGNATURES: Dict[str, Tuple[float, Optional[Tuple[int, int]], Optional[Tuple[int, int]]]] = {}
+
+
+def signature_recheck_seconds() -> float:
+    return float(os.getenv("WEATHERWISE_SHARD_RECHECK", str(DEFAULT_SIGNATURE_RECHECK)))
+
+
+def cached_sharded_signature(uri: str) -> Optional[Tuple[int, int]]:
+    """
+    :func:`sharded_signature` re-listed and re-stat'ed at most every WEATHERWISE_SHARD_RECHECK seconds.
+
+    A manifest's own file is still stat'ed on every call, so an ingest (which swaps the
+    manifest atomically) is seen at once; shards changed behind its back are seen within
+    the recheck interval.
+    """
+    manifest: Optional[Tuple[int, int]] = None
+    if uri.endswith(".json"):
+        try:
+            manifest = _stat_signature(uri)
+        except OSError:
+            return None
+    now = time.monotonic()
+    cached = _SIGNATURES.get(uri)
+    if cached is not None and cached[1] == manifest and now - cached[0] < signature_recheck_seconds():
+        return cached[2]
+    signature = sharded_signature(uri)
+    _SIGNATURES[uri] = (now, manifest, signature)
+    return signature
+
+
+def _encode_axis(values: np.ndarray) -> Dict[str, Any]:
+    if values.size > 2:
+        steps = np.diff(values)
+        if np.all(steps == steps[0]):
+            return {"start": values[0].item(), "step": steps[0].item(), "count": int(values.size)}
+    return {"values": values.tolist()}
+
+
+def _decode_axis(encoded: Dict[str, Any], dtype: Any) -> np.ndarray:
+    if "values" in encoded:
+        return np.asarray(encoded["values"], dtype=dtype)
+    return (encoded["start"] + encoded["step"] * np.arange(encoded["count"])).astype(dtype)
+
+
+def _describe_shard(path: str) -> Dict[str, Any]:
+    with xr.open_dataset(path) as dataset:
+        for axis in AXES:
+            if axis not in dataset.indexes:
+                raise ValueError(f"Shard {path} has no '{axis}' coordinate.")
+            if not dataset.indexes[axis].is_monotonic_increasing:
+                raise ValueError(f"Shard {path} must have ascending '{axis}' values.")
+        variables = {
+            name: {"dims": list(variable.dims), "dtype": variable.dtype.str, "attrs": _json_attrs(variable.attrs)}
+            for name, variable in dataset.data_vars.items()
+            if set(variable.dims) <= set(AXES)
+        }
+        return {
+            "path": path,
+            "signature": list(_stat_signature(path)),
+            "time": _encode_axis(dataset["time"].values.astype("datetime64[ns]").astype(np.int64)),
+            "lat": _encode_axis(np.asarray(dataset["lat"].values, dtype=float)),
+            "lon": _encode_axis(np.asarray(dataset["lon"].values, dtype=float)),
+            "variables": variables,
+            "attrs": _json_attrs(dataset.attrs)
+        }
+
+
+def _json_attrs(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    clean: Dict[str, Any] = {}
+    for key, value in attrs.items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, (str, int, float, bool)):
+            clean[key] = value
+    return clean
+
+
+def index_path_for(uri: str) -> Optional[str]:
+    override = os.getenv("WEATHERWISE_SHARD_INDEX")
+    if override:
+        return override
+    return f"{uri}.index.json" if uri.endswith(".json") else None
+
+
+def build_shard_index(uri: str, index_path: Optional[str] = None) -> Dict[str, Any]:
+    """Describe every shard, reusing entries from an existing index whose file signature still matches."""
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+    index_path = index_path or index_path_for(uri)
+    previous: Dict[str, Dict[str, Any]] = {}
+    if index_path and os.path.exists(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+            if stored.get("format") == INDEX_FORMAT:
+                previous = {entry["path"]: entry for entry in stored.get("shards", [])}
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Rebuilding unreadable shard index %s: %s", index_path, exc)
+
+    shards: List[Dict[str, Any]] = []
+    described = 0
+    for path in shard_paths(uri):
+        entry = previous.get(path)
+        if entry is None or tuple(entry["signature"]) != _stat_signature(path):
+            entry = _describe_shard(path)
+            described += 1
+        shards.append(entry)
+    index = {"format": INDEX_FORMAT, "source": uri, "shards": shards}
+
+    if index_path and (described or len(previous) != len(shards)):
+        staging = f"{index_path}.tmp-{os.getpid()}"
+        with open(staging, "w", encoding="utf-8") as handle:
+            json.dump(index, handle)
+        os.replace(staging, index_path)
+    if described:
+        LOGGER.info("Shard index for %s: described %d of %d shards", uri, described, len(shards))
+    return index
+
+
+@dataclass
+class _Shard:
+    path: str
+    # Sorted positions of this shard's coordinates on the federated axes, keyed by axis name.
+    positions: Dict[str, np.ndarray]
+    variables: Dict[str, Dict[str, Any]]
+
+
+@dataclass
+class _ShardHandle:
+    dataset: Any
+    readers: int = 0
+    evicted: bool = False
+
+
+class ShardFederation:
+    """
+    The union grid of a shard set plus a bounded LRU of open shard handles.
+
+    Reads lease a handle for their duration. A handle evicted (or the federation closed)
+    while another thread is still reading it is closed when the last reader lets go.
+    """
+
+    def __init__(self, index: Dict[str, Any], max_handles: int = DEFAULT_SHARD_HANDLES) -> None:
+        entries = index["shards"]
+        axes: Dict[str, List[np.ndarray]] = {axis: [] for axis in AXES}
+        for entry in entries:
+            axes["time"].append(_decode_axis(entry["time"], np.int64))
+            axes["lat"].append(_decode_axis(entry["lat"], float))
+            axes["lon"].append(_decode_axis(entry["lon"], float))
+        self.coords = {axis: np.unique(np.concatenate(values)) for axis, values in axes.items()}
+        self.shards = [
+            _Shard(
+                path=entry["path"],
+                positions={axis: np.searchsorted(self.coords[axis], axes[axis][number]) for axis in AXES},
+                variables=entry["variables"]
+            )
+            for number, entry in enumerate(entries)
+        ]
+        self.attrs = entries[0].get("attrs", {}) if entries else {}
+        self.max_handles = max(1, max_handles)
+        self._handles: "OrderedDict[str, _ShardHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.opens = 0
+
+    def _retire_locked(self, handle: _ShardHandle) -> Optional[Any]:
+        """Mark ``handle`` evicted; returns its dataset when nobody is reading it and it can be closed now."""
+        handle.evicted = True
+        return handle.dataset if handle.readers == 0 else None
+
+    def _acquire(self, path: str) -> _ShardHandle:
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is not None:
+                self._handles.move_to_end(path)
+                handle.readers += 1
+                return handle
+        from .chunked_store import open_store
+
+        dataset = open_store(path)
+        to_close: List[Any] = []
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is not None:
+                # Another thread opened it meanwhile; our copy was never shared.
+                to_close.append(dataset)
+                self._handles.move_to_end(path)
+            else:
+                self.opens += 1
+                handle = self._handles[path] = _ShardHandle(dataset)
+            handle.readers += 1
+            while len(self._handles) > self.max_handles:
+                idle = self._retire_locked(self._handles.popitem(last=False)[1])
+                if idle is not None:
+                    to_close.append(idle)
+        for stale in to_close:
+            stale.close()
+        return handle
+
+    def _release(self, handle: _ShardHandle) -> None:
+        with self._lock:
+            handle.readers -= 1
+            close = handle.evicted and handle.readers == 0
+        if close:
+            handle.dataset.close()
+
+    @contextmanager
+    def lease(self, path: str) -> Iterator[Any]:
+        """The open dataset for shard ``path``, kept open until the block exits."""
+        handle = self._acquire(path)
+        try:
+            yield handle.dataset
+        finally:
+            self._release(handle)
+
+    def close(self) -> None:
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+            idle = [dataset for dataset in map(self._retire_locked, handles) if dataset is not None]
+        for dataset in idle:
+            dataset.close()
+
+    def read(self, name: str, dims: Sequence[str], positions: Sequence[np.ndarray], fill: Any, dtype: Any) -> np.ndarray:
+        """Values of ``name`` at the outer product of federated ``positions`` (one array per dim)."""
+        out = np.full([selection.size for selection in positions], fill, dtype=dtype)
+        # Visit shards that are already open first. A read spanning more shards than there are
+        # handles would otherwise evict each one just before it is needed again (LRU cycling).
+        with self._lock:
+            open_paths = set(self._handles)
+        for shard in sorted(self.shards, key=lambda shard: shard.path not in open_paths):
+            if name not in shard.variables:
+                continue
+            local: Dict[str, Any] = {}
+            targets: List[np.ndarray] = []
+            for dim, wanted in zip(dims, positions):
+                covered = shard.positions[dim]
+                slots = np.minimum(np.searchsorted(covered, wanted), covered.size - 1)
+                hit = covered[slots] == wanted
+                if not hit.any():
+                    break
+                local[dim] = slots[hit]
+                targets.append(np.flatnonzero(hit))
+            else:
+                with self.lease(shard.path) as dataset:
+                    out[np.ix_(*targets)] = _read_outer(dataset[name], local)
+        return out
+
+
+def _read_outer(variable: Any, local: Dict[str, np.ndarray]) -> np.ndarray:
+    # Read the bounding slice along each dim and pick within it; point-wise indexing is slow on NetCDF.
+    bounds = {dim: slice(int(picks.min()), int(picks.max()) + 1) for dim, picks in local.items()}
+    block = np.asarray(variable.isel(bounds).values)
+    picks = tuple(local[dim] - bounds[dim].start for dim in variable.dims)
+    return block[np.ix_(*picks)]
+
+
+class ShardedArray(BackendArray):
+    """Lazily indexed view of one variable across every shard of a federation."""
+
+    def __init__(self, federation: ShardFederation, name: str, dims: Sequence[str], dtype: Any) -> None:
+        self.federation = federation
+        self.name = name
+        self.dims = tuple(dims)
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(federation.coords[dim].size for dim in self.dims)
+        self._fill = np.nan if self.dtype.kind == "f" else 0
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        return indexing.explicit_indexing_adapter(
+            key,
+            self.shape,
+            indexing.IndexingSupport.OUTER,
+            self._raw_indexing_method
+        )
+
+    def _raw_indexing_method(self, key: Tuple[Any, ...]) -> np.ndarray:
+        positions: List[np.ndarray] = []
+        scalar_axes: List[int] = []
+        for axis, (selection, size) in enumerate(zip(key, self.shape)):
+            if isinstance(selection, (int, np.integer)):
+                positions.append(np.asarray([selection]))
+                scalar_axes.append(axis)
+            elif isinstance(selection, slice):
+                positions.append(np.arange(size)[selection])
+            else:
+                positions.append(np.asarray(selection, dtype=np.intp))
+        values = self.federation.read(self.name, self.dims, positions, self._fill, self.dtype)
+        return values.squeeze(axis=tuple(scalar_axes)) if scalar_axes else values
+
+
+def open_sharded(uri: str) -> Any:
+    """Open a manifest, glob or directory of shards as one lazily-read dataset."""
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+    index = build_shard_index(uri)
+    federation = ShardFederation(
+        index,
+        max_handles=int(os.getenv("WEATHERWISE_SHARD_HANDLES", str(DEFAULT_SHARD_HANDLES)))
+    )
+
+    variables: Dict[str, Any] = {}
+    for entry in index["shards"]:
+        for name, spec in entry["variables"].items():
+            if name not in variables:
+                array = ShardedArray(federation, name, spec["dims"], spec["dtype"])
+                variables[name] = xr.Variable(spec["dims"], indexing.LazilyIndexedArray(array), spec.get("attrs", {}))
+
+    coords = {
+        "time": federation.coords["time"].astype("datetime64[ns]"),
+        "lat": federation.coords["lat"],
+        "lon": federation.coords["lon"]
+    }
+    dataset = xr.Dataset(variables, coords=coords, attrs=federation.attrs)
+    dataset.set_close(federation.close)
+    dataset.attrs["shard_count"] = len(federation.shards)
+    return dataset
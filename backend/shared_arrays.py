@@ -0,0 +1,205 @@
+"""
+Read-only dataset snapshots shared by every worker process.
+
+With several uvicorn workers, each process would otherwise open the dataset and fill its
+own chunk cache with the same values. :func:`export_snapshot` copies the dataset's gridded
+variables once into raw ``.npy`` files under ``WEATHERWISE_SHARED_DIR`` (``/dev/shm`` when
+available, so the copy lives in shared memory). Workers open the snapshot with
+:func:`open_snapshot`, which memory-maps every array read-only. All processes then read the
+same physical pages, and a worker's own memory is only its interpreter, caches and
+per-request temporaries.
+
+Arrays are stored point-major (``time`` as the last axis), so one cell's series is a single
+contiguous run. A snapshot records the dataset version it was copied from; the dataset
+pool only uses it while that version is still current and otherwise opens the dataset
+directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    import xarray as xr  # type: ignore
+except Exception:  # pragma: no cover - optional dependency for demo
+    xr = None
+
+from .shards import _json_attrs
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+SHARED_MEMORY_ROOT = "/dev/shm"
+DEFAULT_COPY_BLOCK = 8
+AXES = ("time", "lat", "lon")
+
+_STATS_LOCK = threading.Lock()
+_OPENED: Dict[str, str] = {}
+_STALE = 0
+
+
+def shared_arrays_enabled() -> bool:
+    return os.getenv("WEATHERWISE_SHARED_ARRAYS", "0").lower() in {"1", "true", "yes"}
+
+
+def shared_root() -> Path:
+    override = os.getenv("WEATHERWISE_SHARED_DIR")
+    if override:
+        return Path(override)
+    base = SHARED_MEMORY_ROOT if os.path.isdir(SHARED_MEMORY_ROOT) else tempfile.gettempdir()
+    return Path(base) / "weatherwise"
+
+
+def _canonical_uri(uri: str) -> str:
+    return uri if uri.startswith(("http://", "https://")) else os.path.abspath(uri)
+
+
+def snapshot_path_for(uri: str) -> Path:
+    digest = hashlib.sha256(_canonical_uri(uri).encode("utf-8")).hexdigest()[:16]
+    return shared_root() / f"snapshot-{digest}"
+
+
+def _current_version(uri: str) -> str:
+    from .dataset_pool import _file_signature, _version_for
+
+    return _version_for(_file_signature(uri))
+
+
+def _layout(dims: Any) -> tuple:
+    # Time last: a grid cell's whole series is contiguous in the mapped file.
+    return tuple(dim for dim in dims if dim != "time") + (("time",) if "time" in dims else ())
+
+
+def export_snapshot(uri: str, target: Optional[Path] = None, *, block: int = DEFAULT_COPY_BLOCK) -> Path:
+    """Copy the gridded variables of ``uri`` into a memory-mappable snapshot directory.
+
+    Values are copied ``block`` latitude rows at a time, so the exporting process never
+    holds more than one block in memory. An existing snapshot of the same dataset version
+    is reused as is; the directory is replaced atomically otherwise.
+    """
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+    from .chunked_store import open_store
+
+    target = target or snapshot_path_for(uri)
+    version = _current_version(uri)
+    existing = _read_meta(target)
+    if existing is not None and existing.get("version") == version:
+        LOGGER.info("Shared snapshot %s is current", target)
+        return target
+
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    dataset = open_store(uri)
+    try:
+        variables: Dict[str, Dict[str, Any]] = {}
+        for name, variable in dataset.data_vars.items():
+            if not set(variable.dims) <= set(AXES):
+                continue
+            dims = _layout(variable.dims)
+            source = variable.transpose(*dims)
+            out = np.lib.format.open_memmap(
+                staging / f"{name}.npy", mode="w+", dtype=source.dtype, shape=source.shape
+            )
+            if dims and dims[0] == "lat":
+                step = max(1, block)
+                for start in range(0, source.sizes["lat"], step):
+                    rows = slice(start, start + step)
+                    out[rows] = np.asarray(source.isel(lat=rows).values)
+            else:
+                out[...] = np.asarray(source.values)
+            out.flush()
+            del out
+            variables[name] = {"dims": list(dims), "attrs": _json_attrs(variable.attrs)}
+            LOGGER.info("Shared snapshot: copied %s", name)
+
+        coords = [name for name in AXES if name in dataset.coords]
+        for name in coords:
+            np.save(staging / f"coord_{name}.npy", np.asarray(dataset[name].values))
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "dataset_uri": _canonical_uri(uri),
+            "version": version,
+            "variables": variables,
+            "coords": coords,
+            "attrs": _json_attrs(dataset.attrs)
+        }
+    finally:
+        dataset.close()
+
+    with (staging / "meta.json").open("w", encoding="utf-8") as handle:
+        json.dump(meta, handle, indent=2)
+    if target.exists():
+        shutil.rmtree(target)
+    os.replace(staging, target)
+    return target
+
+
+def _read_meta(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with (path / "meta.json").open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == SNAPSHOT_FORMAT else None
+
+
+def open_snapshot(path: Path) -> Any:
+    """Open a snapshot as an ``xarray.Dataset`` whose arrays are read-only memory maps."""
+    if xr is None:  # pragma: no cover - optional dependency
+        raise RuntimeError("xarray is not available. Install dependencies to use NetCDF mode.")
+    meta = _read_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"No readable shared snapshot at {path}.")
+    variables = {
+        name: xr.Variable(spec["dims"], np.load(path / f"{name}.npy", mmap_mode="r"), spec.get("attrs", {}))
+        for name, spec in meta["variables"].items()
+    }
+    coords = {name: np.load(path / f"coord_{name}.npy") for name in meta["coords"]}
+    dataset = xr.Dataset(variables, coords=coords, attrs=meta.get("attrs", {}))
+    dataset.attrs["shared_snapshot"] = str(path)
+    return dataset
+
+
+def open_shared_if_current(uri: str) -> Optional[Any]:
+    """The shared snapshot of ``uri`` when sharing is on and the snapshot is up to date."""
+    global _STALE
+    if not shared_arrays_enabled():
+        return None
+    path = snapshot_path_for(uri)
+    meta = _read_meta(path)
+    if meta is None:
+        return None
+    if meta.get("version") != _current_version(uri):
+        with _STATS_LOCK:
+            _STALE += 1
+        LOGGER.warning("Shared snapshot %s is older than %s; opening the dataset per worker", path, uri)
+        return None
+    dataset = open_snapshot(path)
+    with _STATS_LOCK:
+        _OPENED[_canonical_uri(uri)] = str(path)
+    return dataset
+
+
+def shared_arrays_stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        return {
+            "enabled": shared_arrays_enabled(),
+            "root": str(shared_root()),
+            "pid": os.getpid(),
+            "snapshots": dict(_OPENED),
+            "stale_skips": _STALE
+        }
@@ -0,0 +1,94 @@
+"""
+Vectorized per-condition statistics for one window of samples.
+
+All requested variables are stacked into a single ``(variables, samples)`` array, and the
+finite mask, exceedance counts and per-variable samples are computed once. Conditions
+that share a variable share its sample, trend and history instead of recomputing them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+TREND_MIN_SAMPLES = 12
+
+
+@dataclass
+class VariableSummary:
+    """Finite window sample of one variable and the statistics derived from it."""
+
+    sample: np.ndarray
+    history: List[float]
+    early_mean: Optional[float]
+    late_mean: Optional[float]
+    ordered: Optional[np.ndarray] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+
+
+@dataclass
+class KernelResult:
+    """``probabilities[c]`` is NaN when condition ``c``'s variable has no finite sample."""
+
+    probabilities: np.ndarray
+    variables: List[VariableSummary]
+
+
+def condition_statistics(
+    stacked: np.ndarray,
+    variable_rows: Sequence[int],
+    thresholds: Sequence[float],
+    greater_equal: Sequence[bool],
+    *,
+    history_limit: int,
+    distribution: bool = False
+) -> KernelResult:
+    """Compute every condition's probability plus each variable's sample, trend and history.
+
+    ``stacked`` holds transformed values, one row per variable. Condition ``c`` compares row
+    ``variable_rows[c]`` against ``thresholds[c]`` using ``>=`` (or ``<=`` when
+    ``greater_equal[c]`` is false). With ``distribution`` each variable's sample is also
+    sorted once and its mean and standard deviation are filled in.
+    """
+    stacked = np.asarray(stacked, dtype=float)
+    finite = np.isfinite(stacked)
+    valid = np.count_nonzero(finite, axis=1)
+
+    rows = np.asarray(variable_rows, dtype=np.intp)
+    # x <= t is the same test as -x >= -t, so both comparisons run as one array operation.
+    sign = np.where(np.asarray(greater_equal, dtype=bool), 1.0, -1.0)
+    hits = stacked[rows] * sign[:, None] >= (np.asarray(thresholds, dtype=float) * sign)[:, None]
+    hits &= finite[rows]
+    row_valid = valid[rows]
+    probabilities = np.full(rows.size, np.nan)
+    populated = row_valid > 0
+    probabilities[populated] = np.count_nonzero(hits, axis=1)[populated] / row_valid[populated] * 100.0
+
+    summaries: List[VariableSummary] = []
+    for row in range(stacked.shape[0]):
+        sample = stacked[row][finite[row]]
+        size = sample.size
+        early_mean: Optional[float] = None
+        late_mean: Optional[float] = None
+        if size >= TREND_MIN_SAMPLES:
+            # sum / count is exactly what np.mean computes, without its per-call overhead.
+            midpoint = size // 2
+            early_mean = float(sample[:midpoint].sum() / midpoint)
+            late_mean = float(sample[midpoint:].sum() / (size - midpoint))
+        summary = VariableSummary(
+            sample=sample,
+            # Only the values that are reported get rounded.
+            history=sample[:history_limit].round(1).tolist(),
+            early_mean=early_mean,
+            late_mean=late_mean
+        )
+        if distribution and size:
+            summary.ordered = np.sort(sample)
+            summary.mean = float(sample.sum() / size)
+            summary.std = float(np.std(sample))
+        summaries.append(summary)
+
+    return KernelResult(probabilities=probabilities, variables=summaries)
@@ -0,0 +1,198 @@
+"""
+Probability heatmap tiles for the map view.
+
+Tiles follow the slippy-map ``z/x/y`` scheme (Web Mercator, 256 px). Each pixel takes the
+probability of its nearest grid cell, so a tile costs one vectorized evaluation of the
+cells under it. Tiles are rendered as RGBA PNG or as a packed ``.bin`` raster of
+percentages (one byte per pixel, ``255`` = no data), and cached by dataset version,
+window, condition and date.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_fetcher import get_fetcher
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+NO_DATA = 255
+DEFAULT_TILE_CACHE_MB = 32.0
+TILE_FORMATS = {"png": "image/png", "bin": "application/octet-stream"}
+
+# Probability (%) -> RGBA stops: transparent green at 0 %, yellow around 40 %, deep red at 100 %.
+_COLOR_STOPS = np.array([0.0, 10.0, 40.0, 70.0, 100.0])
+_COLOR_VALUES = np.array([
+    [34, 197, 94, 40],
+    [132, 204, 22, 120],
+    [250, 204, 21, 170],
+    [249, 115, 22, 190],
+    [185, 28, 28, 210]
+], dtype=float)
+_PALETTE = np.stack(
+    [np.interp(np.arange(101), _COLOR_STOPS, _COLOR_VALUES[:, channel]) for channel in range(4)],
+    axis=1
+).round().astype(np.uint8)
+
+TileKey = Tuple[str, str, int, str, str, int, int, int, str]
+
+
+def tile_pixel_coordinates(z: int, x: int, y: int, size: int = TILE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude of every pixel row and longitude of every pixel column at their centres."""
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f"Zoom must be between 0 and {MAX_ZOOM}.")
+    scale = 2 ** z
+    if not (0 <= x < scale and 0 <= y < scale):
+        raise ValueError(f"Tile {x}/{y} is outside zoom level {z}.")
+    fractions = (np.arange(size) + 0.5) / size
+    lons = (x + fractions) / scale * 360.0 - 180.0
+    mercator = np.pi * (1.0 - 2.0 * (y + fractions) / scale)
+    lats = np.degrees(np.arctan(np.sinh(mercator)))
+    return lats, lons
+
+
+def _nearest_positions(axis: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest index on ``axis`` for each value, plus whether the value lies within the grid's extent."""
+    positions = pd.Index(axis).get_indexer(values, method="nearest")
+    if axis.size > 1:
+        half_step = float(np.median(np.abs(np.diff(axis)))) / 2.0
+    else:
+        half_step = 0.5
+    inside = (values >= axis.min() - half_step) & (values <= axis.max() + half_step)
+    return positions, inside
+
+
+def probability_pixels(condition: str, date_of_year: str, z: int, x: int, y: int) -> np.ndarray:
+    """``[row, column]`` probabilities for a tile's pixels; NaN outside the data or without samples."""
+    lats, lons = tile_pixel_coordinates(z, x, y)
+    grid_lat, grid_lon, probabilities = get_fetcher().probability_grid(
+        condition,
+        date_of_year,
+        (float(lats.min()), float(lats.max())),
+        (float(lons.min()), float(lons.max()))
+    )
+    rows, rows_inside = _nearest_positions(grid_lat, lats)
+    cols, cols_inside = _nearest_positions(grid_lon, lons)
+    pixels = probabilities[np.ix_(rows, cols)]
+    pixels[~rows_inside, :] = np.nan
+    pixels[:, ~cols_inside] = np.nan
+    return pixels
+
+
+def pack_percentages(pixels: np.ndarray) -> np.ndarray:
+    packed = np.full(pixels.shape, NO_DATA, dtype=np.uint8)
+    finite = np.isfinite(pixels)
+    packed[finite] = np.clip(np.round(pixels[finite]), 0, 100).astype(np.uint8)
+    return packed
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Minimal RGBA PNG encoder (no filtering), enough for small overlay tiles."""
+    height, width, _ = rgba.shape
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", header),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)),
+        chunk(b"IEND", b"")
+    ])
+
+
+def render_pixels(pixels: np.ndarray, fmt: str) -> bytes:
+    packed = pack_percentages(pixels)
+    if fmt == "bin":
+        return packed.tobytes()
+    rgba = np.zeros(packed.shape + (4,), dtype=np.uint8)
+    has_data = packed != NO_DATA
+    rgba[has_data] = _PALETTE[packed[has_data]]
+    return encode_png(rgba)
+
+
+class TileCache:
+    """Thread-safe LRU of rendered tiles bounded by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        with self._lock:
+            tile = self._entries.get(key)
+            if tile is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return tile
+
+    def put(self, key: TileKey, tile: bytes) -> None:
+        if len(tile) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = tile
+            self._bytes += len(tile)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions
+            }
+
+
+_TILE_CACHE: Optional[TileCache] = None
+_TILE_CACHE_LOCK = threading.Lock()
+
+
+def get_tile_cache() -> TileCache:
+    global _TILE_CACHE
+    if _TILE_CACHE is None:
+        with _TILE_CACHE_LOCK:
+            if _TILE_CACHE is None:
+                megabytes = float(os.getenv("WEATHERWISE_TILE_CACHE_MB", str(DEFAULT_TILE_CACHE_MB)))
+                _TILE_CACHE = TileCache(int(megabytes * 1024 * 1024))
+    return _TILE_CACHE
+
+
+def render_tile(condition: str, date_of_year: str, z: int, x: int, y: int, fmt: str = "png") -> bytes:
+    """Module-level entry point so tiles can be rendered on the compute executor."""
+    if fmt not in TILE_FORMATS:
+        raise ValueError(f"Unsupported tile format {fmt!r}; use one of {', '.join(TILE_FORMATS)}.")
+    uri, version, window_days = get_fetcher().dataset_key()
+    key: TileKey = (uri, version, window_days, condition, date_of_year, z, x, y, fmt)
+    cache = get_tile_cache()
+    tile = cache.get(key)
+    if tile is None:
+        tile = render_pixels(probability_pixels(condition, date_of_year, z, x, y), fmt)
+        cache.put(key, tile)
+    return tile
@@ -0,0 +1,321 @@
+"""
+Benchmark suite for the query, insight-prompt and HTTP paths.
+
+Generates a synthetic MERRA-2-like dataset (see :mod:`backend.tools.synthetic_dataset`)
+unless ``--dataset`` is given, then times each case and measures its peak Python/numpy
+allocation with ``tracemalloc``. Results can be saved and compared across commits:
+
+    python -m backend.tools.benchmark --lat 20 --lon 30 --years 2000 2023 --output before.json
+    python -m backend.tools.benchmark --lat 20 --lon 30 --years 2000 2023 --compare before.json
+
+Cases marked *cold* drop the result cache before every call, so they measure the raw
+computation; *warm* cases are what a repeated request costs. The climatology cube is
+ignored unless ``--climatology`` is passed, in which case it is built first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+Case = Tuple[str, Callable[[int], Any]]
+
+DATES = ("01-15", "03-01", "05-20", "07-15", "09-10", "11-30")
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _max_rss_mib() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _points(dataset: Any, count: int, seed: int = 1) -> List[Tuple[float, float]]:
+    rng = np.random.default_rng(seed)
+    lat = np.asarray(dataset["lat"].values, dtype=float)
+    lon = np.asarray(dataset["lon"].values, dtype=float)
+    return [
+        (float(rng.uniform(lat.min(), lat.max())), float(rng.uniform(lon.min(), lon.max())))
+        for _ in range(count)
+    ]
+
+
+def measure(call: Callable[[int], Any], repeat: int) -> Dict[str, Any]:
+    """Median/p95/min wall time over ``repeat`` calls, then peak allocation of one more call."""
+    call(0)  # warm-up: opens the dataset, builds indexes, imports lazily loaded modules
+    durations: List[float] = []
+    for iteration in range(1, repeat + 1):
+        started = time.perf_counter()
+        call(iteration)
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        call(repeat + 1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    ordered = sorted(durations)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "calls": repeat
+    }
+
+
+def library_cases(dataset_uri: str, batch_size: int) -> List[Case]:
+    from backend.data_fetcher import CONDITION_SETTINGS, WeatherDataFetcher, _required_variables
+    from backend.groq_insights import build_farmer_prompt
+    from backend.result_cache import get_result_cache
+    from backend.tiles import probability_pixels
+
+    conditions = list(CONDITION_SETTINGS)
+    fetcher = WeatherDataFetcher(dataset_uri=dataset_uri, force_mock=False, window_days=3, allow_mock_fallback=False)
+    dataset = fetcher._ensure_dataset()
+    points = _points(dataset, 64)
+    cache = get_result_cache()
+
+    def point(iteration: int) -> Tuple[float, float, str]:
+        lat, lon = points[iteration % len(points)]
+        return lat, lon, DATES[iteration % len(DATES)]
+
+    def window_series(iteration: int) -> Any:
+        lat, lon, date = point(iteration)
+        lat_pos, lon_pos = fetcher._grid_cell(dataset, None, lat, lon)
+        return fetcher._window_series(dataset, lat_pos, lon_pos, date, _required_variables(conditions))
+
+    def build_cold(iteration: int) -> Any:
+        cache.invalidate()
+        lat, lon, date = point(iteration)
+        return fetcher._build_from_dataset(lat, lon, date, conditions)
+
+    def query_warm(iteration: int) -> Any:
+        lat, lon, date = point(0)
+        return fetcher.query(lat, lon, date, conditions)
+
+    def query_curve(iteration: int) -> Any:
+        lat, lon, date = point(iteration)
+        return fetcher.query(lat, lon, date, conditions, curve_points=200)
+
+    batch_items = [
+        {"lat": lat, "lon": lon, "date_of_year": DATES[index % len(DATES)], "conditions": conditions}
+        for index, (lat, lon) in enumerate(_points(dataset, batch_size, seed=2))
+    ]
+
+    def query_batch(iteration: int) -> Any:
+        return fetcher.query_batch(batch_items)
+
+    def calendar(iteration: int) -> Any:
+        cache.invalidate()
+        lat, lon, _ = point(iteration)
+        return fetcher.risk_calendar(lat, lon, conditions, top_n=3)
+
+    def tile(iteration: int) -> Any:
+        return probability_pixels("very_hot", DATES[iteration % len(DATES)], 3, 1, 3)
+
+    prompt_payload = fetcher.query(*point(0), conditions)
+    prompt_payload["metadata"] = prompt_payload.get("metadata") or {"data_source": "synthetic"}
+
+    def farmer_prompt(iteration: int) -> Any:
+        return build_farmer_prompt(prompt_payload, "Should I irrigate this week?" if iteration % 2 else None)
+
+    return [
+        ("window_series", window_series),
+        ("build_from_dataset (cold)", build_cold),
+        ("query (warm)", query_warm),
+        ("query + exceedance curve", query_curve),
+        (f"query_batch x{batch_size}", query_batch),
+        ("risk_calendar (cold)", calendar),
+        ("probability_pixels z3", tile),
+        ("build_farmer_prompt", farmer_prompt)
+    ]
+
+
+def endpoint_cases(dataset_uri: str, batch_size: int) -> List[Case]:
+    from fastapi.testclient import TestClient
+
+    from backend.data_fetcher import CONDITION_SETTINGS, get_fetcher
+    from backend.main import app
+    from backend.result_cache import get_result_cache
+
+    conditions = list(CONDITION_SETTINGS)
+    client = TestClient(app)
+    points = _points(get_fetcher()._ensure_dataset(), 64, seed=3)
+    cache = get_result_cache()
+
+    def body(iteration: int) -> Dict[str, Any]:
+        lat, lon = points[iteration % len(points)]
+        return {"location": {"lat": lat, "lon": lon}, "date_of_year": DATES[iteration % len(DATES)], "conditions": conditions}
+
+    def checked(response: Any) -> Any:
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.request.url} answered {response.status_code}: {response.text[:200]}")
+        return response
+
+    def query_cold(iteration: int) -> Any:
+        cache.invalidate()
+        return checked(client.post("/query", json=body(iteration)))
+
+    def query_warm(iteration: int) -> Any:
+        return checked(client.post("/query", json=body(0)))
+
+    def query_batch(iteration: int) -> Any:
+        return checked(client.post("/query/batch", json={"items": [body(iteration + index) for index in range(batch_size)]}))
+
+    def calendar(iteration: int) -> Any:
+        payload = body(iteration)
+        return checked(client.post("/query/calendar", json={"location": payload["location"], "conditions": conditions}))
+
+    def tile(iteration: int) -> Any:
+        # Cycle through tiles x dates so most calls miss the tile cache.
+        x = iteration % 8
+        return checked(client.get(f"/tiles/very_hot/4/{x}/6.bin", params={"date_of_year": DATES[iteration % len(DATES)]}))
+
+    return [
+        ("POST /query (cold)", query_cold),
+        ("POST /query (warm)", query_warm),
+        (f"POST /query/batch x{batch_size}", query_batch),
+        ("POST /query/calendar", calendar),
+        ("GET /tiles .bin", tile)
+    ]
+
+
+def run(dataset_uri: str, *, repeat: int, batch_size: int, endpoints: bool, only: Sequence[str]) -> List[Dict[str, Any]]:
+    cases = library_cases(dataset_uri, batch_size)
+    if endpoints:
+        cases += endpoint_cases(dataset_uri, batch_size)
+    rows: List[Dict[str, Any]] = []
+    for name, call in cases:
+        if only and not any(fragment in name for fragment in only):
+            continue
+        rows.append({"case": name, **measure(call, repeat)})
+        print(f"  {name}: {rows[-1]['median_ms']} ms", file=sys.stderr)
+    return rows
+
+
+def _print_rows(rows: Sequence[Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    header = f"{'case':<30} {'median ms':>10} {'p95 ms':>9} {'min ms':>9} {'peak KiB':>10}"
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    print(header)
+    for row in rows:
+        line = (
+            f"{row['case']:<30} {row['median_ms']:>10} {row['p95_ms']:>9} {row['min_ms']:>9} {row['peak_kib']:>10}"
+        )
+        if baseline is not None:
+            previous = baseline.get(row["case"])
+            if previous and previous["median_ms"] > 0:
+                line += f" {row['median_ms'] / previous['median_ms']:>7.2f}x"
+            else:
+                line += f" {'-':>8}"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark WeatherWise query paths on a synthetic dataset.")
+    parser.add_argument("--dataset", help="Existing dataset to benchmark instead of generating one")
+    parser.add_argument("--lat", type=int, default=20, help="Synthetic latitude points")
+    parser.add_argument("--lon", type=int, default=30, help="Synthetic longitude points")
+    parser.add_argument("--years", type=int, nargs=2, default=[2000, 2023], metavar=("FIRST", "LAST"))
+    parser.add_argument("--per-year", action="store_true", help="Generate one file per year behind a manifest")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per case")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--climatology", action="store_true", help="Build and use the climatology cube")
+    parser.add_argument("--no-endpoints", action="store_true", help="Skip the FastAPI endpoint cases")
+    parser.add_argument("--only", nargs="*", default=[], help="Run cases whose name contains any of these")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Previous --output file to compare medians against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="weatherwise-bench-") as workdir:
+        dataset_uri = args.dataset
+        if not dataset_uri:
+            from backend.tools.synthetic_dataset import generate_dataset
+
+            target = os.path.join(workdir, "synthetic" if args.per_year else "synthetic.nc")
+            started = time.perf_counter()
+            dataset_uri = str(generate_dataset(
+                target,
+                lat_points=args.lat,
+                lon_points=args.lon,
+                start_year=args.years[0],
+                end_year=args.years[1],
+                per_year=args.per_year
+            ))
+            print(f"Generated {dataset_uri} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        # get_fetcher() (and so every endpoint) reads its configuration from the environment.
+        os.environ["WEATHERWISE_DATASET"] = dataset_uri
+        os.environ["WEATHERWISE_FORCE_MOCK"] = "0"
+        os.environ["WEATHERWISE_WINDOW_DAYS"] = "3"
+        os.environ["WEATHERWISE_USE_CLIMATOLOGY"] = "1" if args.climatology else "0"
+        os.environ.setdefault("WEATHERWISE_CLIMATOLOGY", os.path.join(workdir, "bench.climatology"))
+        if args.climatology:
+            from backend.data_fetcher import build_climatology_cube
+
+            build_climatology_cube(dataset_uri, os.environ["WEATHERWISE_CLIMATOLOGY"], window_days=3)
+
+        rows = run(
+            dataset_uri,
+            repeat=max(1, args.repeat),
+            batch_size=max(1, args.batch_size),
+            endpoints=not args.no_endpoints,
+            only=args.only
+        )
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "dataset": args.dataset or {"lat": args.lat, "lon": args.lon, "years": args.years, "per_year": args.per_year},
+        "climatology": args.climatology,
+        "max_rss_mib": _max_rss_mib(),
+        "results": rows
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as handle:
+            baseline = {row["case"]: row for row in json.load(handle)["results"]}
+    _print_rows(rows, baseline)
+    print(f"revision {report['revision']}  max RSS {report['max_rss_mib']} MiB")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Cold-start check: import time of ``backend.main`` and latency of the first requests.
+
+Every measurement runs in a fresh interpreter, like a server waking up on the free Render
+plan. Three scenarios are timed:
+
+* ``import`` — ``import backend.main`` alone (median of ``--runs``);
+* ``first_query_cold`` — start the app and send ``/query`` immediately, racing the warm-up;
+* ``first_query_ready`` — start the app, wait for ``/ready``, then send ``/query``.
+
+``--max-import-ms`` / ``--max-first-query-ms`` turn it into a pass/fail check (exit code 1
+when a budget is exceeded)::
+
+    python -m backend.tools.benchmark_coldstart --max-import-ms 800 --max-first-query-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - started
+heavy = [name for name in ("numpy", "pandas", "xarray", "groq", "httpx") if name in sys.modules]
+print(json.dumps({"import_ms": elapsed * 1000, "heavy_modules": heavy}))
+"""
+
+_REQUEST_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+import backend.main
+body = {"location": {"lat": LAT, "lon": LON}, "date_of_year": "07-15", "conditions": ["very_hot", "very_wet"]}
+with TestClient(backend.main.app) as client:
+    booted = time.perf_counter()
+    ready_ms = None
+    if WAIT_READY:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.01)
+        ready_ms = (time.perf_counter() - booted) * 1000
+    sent = time.perf_counter()
+    response = client.post("/query", json=body)
+    first_ms = (time.perf_counter() - sent) * 1000
+    sent = time.perf_counter()
+    client.post("/query", json=body)
+    second_ms = (time.perf_counter() - sent) * 1000
+    print(json.dumps({
+        "status": response.status_code,
+        "startup_ms": (booted - started) * 1000,
+        "ready_ms": ready_ms,
+        "first_query_ms": first_ms,
+        "second_query_ms": second_ms,
+        "warmup": client.get("/ready").json()
+    }))
+"""
+
+
+def _probe(code: str, env: Dict[str, str]) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(dataset_uri: Optional[str], runs: int, lat: float, lon: float) -> Dict[str, Any]:
+    env = dict(os.environ)
+    if dataset_uri:
+        env.update(WEATHERWISE_DATASET=dataset_uri, WEATHERWISE_FORCE_MOCK="0")
+
+    imports = [_probe(_IMPORT_PROBE, env) for _ in range(max(1, runs))]
+    request_code = _REQUEST_PROBE.replace("LAT", repr(lat)).replace("LON", repr(lon))
+    cold = _probe(request_code.replace("WAIT_READY", "False"), env)
+    ready = _probe(request_code.replace("WAIT_READY", "True"), env)
+    return {
+        "import_ms": round(statistics.median(probe["import_ms"] for probe in imports), 1),
+        "heavy_modules_at_import": imports[0]["heavy_modules"],
+        "first_query_cold_ms": round(cold["first_query_ms"], 1),
+        "second_query_cold_ms": round(cold["second_query_ms"], 1),
+        "warmup_ready_ms": round(ready["ready_ms"], 1),
+        "first_query_ready_ms": round(ready["first_query_ms"], 1),
+        "warmup_steps": ready["warmup"]["steps"]
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and first-request latency.")
+    parser.add_argument("--dataset", help="Dataset to serve (default: a generated synthetic one)")
+    parser.add_argument("--mock", action="store_true", help="Measure the mock-data mode instead")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters for the import timing")
+    parser.add_argument("--max-import-ms", type=float, help="Fail when the median import exceeds this")
+    parser.add_argument("--max-first-query-ms", type=float, help="Fail when the cold first /query exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="weatherwise-coldstart-") as workdir:
+        dataset_uri = args.dataset
+        lat, lon = 37.5, -95.0
+        if args.mock:
+            os.environ["WEATHERWISE_FORCE_MOCK"] = "1"
+            dataset_uri = None
+        elif not dataset_uri:
+            from backend.tools.synthetic_dataset import generate_dataset
+
+            dataset_uri = str(generate_dataset(os.path.join(workdir, "synthetic.nc")))
+        # Keep the probes away from any cube or snapshot built for a real deployment.
+        os.environ["WEATHERWISE_CLIMATOLOGY"] = os.path.join(workdir, "none.climatology")
+        report = run(dataset_uri, args.runs, lat, lon)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import backend.main       {report['import_ms']:>9} ms  (heavy modules loaded: {report['heavy_modules_at_import'] or 'none'})")
+        print(f"first /query, cold        {report['first_query_cold_ms']:>9} ms  (second: {report['second_query_cold_ms']} ms)")
+        print(f"warm-up until /ready      {report['warmup_ready_ms']:>9} ms")
+        print(f"first /query after ready  {report['first_query_ready_ms']:>9} ms")
+        for name, step in report["warmup_steps"].items():
+            detail = step.get("note") or step.get("error") or ""
+            print(f"  {name:<14} {step['status']:<8} {step.get('seconds', '')!s:>7} s  {detail}")
+
+    failures = []
+    if args.max_import_ms is not None and report["import_ms"] > args.max_import_ms:
+        failures.append(f"import took {report['import_ms']} ms (budget {args.max_import_ms} ms)")
+    if args.max_first_query_ms is not None and report["first_query_cold_ms"] > args.max_first_query_ms:
+        failures.append(f"first /query took {report['first_query_cold_ms']} ms (budget {args.max_first_query_ms} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,139 @@
+"""
+Bytes on the wire and encode time for each response encoding.
+
+Builds real ``/query``, ``/query/batch`` and ``/query/calendar`` payloads from a synthetic
+dataset (or ``--dataset``), then encodes each one as:
+
+* ``json`` — the standard library, as ``JSONResponse`` did;
+* ``json+orjson`` — what the API sends by default when ``orjson`` is installed;
+* ``msgpack`` — plain MessagePack, lists left as they are;
+* ``msgpack+packed`` — what ``Accept: application/msgpack`` returns (float32 / delta-packed series);
+
+each uncompressed, gzipped and brotli-compressed (when the modules are installed)::
+
+    python -m backend.tools.benchmark_encoding --json > encoding.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend import encoding
+
+Encoder = Callable[[Any], bytes]
+
+
+def _stdlib_json(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def encoders() -> List[Tuple[str, Encoder]]:
+    available: List[Tuple[str, Encoder]] = [("json", _stdlib_json)]
+    if encoding.orjson is not None:
+        available.append(("json+orjson", encoding.encode_json))
+    if encoding.msgpack is not None:
+        available.append(("msgpack", lambda payload: encoding.msgpack.packb(payload, use_bin_type=True)))
+        available.append(("msgpack+packed", encoding.encode_msgpack))
+    return available
+
+
+def compressors() -> List[Tuple[str, Callable[[bytes], bytes]]]:
+    available: List[Tuple[str, Callable[[bytes], bytes]]] = [
+        ("none", lambda body: body),
+        ("gzip", lambda body: gzip.compress(body, compresslevel=encoding.GZIP_LEVEL, mtime=0))
+    ]
+    if encoding.brotli is not None:
+        available.append(("br", lambda body: encoding.brotli.compress(body, quality=encoding.BROTLI_QUALITY)))
+    return available
+
+
+def payloads(batch_size: int) -> List[Tuple[str, Dict[str, Any]]]:
+    from backend.conditions import CONDITION_SETTINGS
+    from backend.data_fetcher import run_query, run_query_batch, run_risk_calendar
+
+    conditions = list(CONDITION_SETTINGS)
+    lat, lon = 40.0, -100.0
+    batch = run_query_batch([
+        {"lat": lat + index * 0.5, "lon": lon, "date_of_year": "07-15", "conditions": conditions}
+        for index in range(batch_size)
+    ])
+    return [
+        ("query (1 condition)", run_query(lat, lon, "07-15", conditions[:1])),
+        (f"query ({len(conditions)} conditions)", run_query(lat, lon, "07-15", conditions)),
+        ("query + exceedance curves", run_query(lat, lon, "07-15", conditions, curve_points=50)),
+        (f"query/batch x{batch_size}", {"items": [{"index": index, "response": item} for index, item in enumerate(batch)]}),
+        ("query/calendar", run_risk_calendar(lat, lon, conditions, 3, 7))
+    ]
+
+
+def _median_us(call: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1e6, 1)
+
+
+def run(batch_size: int, repeat: int) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for name, payload in payloads(batch_size):
+        for encoder_name, encoder in encoders():
+            body = encoder(payload)
+            encode_us = _median_us(lambda: encoder(payload), repeat)
+            for compressor_name, compressor in compressors():
+                compressed = compressor(body)
+                compress_us = 0.0 if compressor_name == "none" else _median_us(lambda: compressor(body), repeat)
+                rows.append({
+                    "payload": name,
+                    "encoding": encoder_name,
+                    "compression": compressor_name,
+                    "bytes": len(compressed),
+                    "encode_us": encode_us,
+                    "compress_us": compress_us,
+                    "total_us": round(encode_us + compress_us, 1)
+                })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare response encodings by size and encode time.")
+    parser.add_argument("--dataset", help="Dataset to build payloads from (default: a generated synthetic one)")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200, help="Timed encodes per case")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="weatherwise-encoding-") as workdir:
+        dataset_uri = args.dataset
+        if not dataset_uri:
+            from backend.tools.synthetic_dataset import generate_dataset
+
+            dataset_uri = str(generate_dataset(os.path.join(workdir, "synthetic.nc"), lat_points=20, lon_points=30))
+        os.environ["WEATHERWISE_DATASET"] = dataset_uri
+        os.environ["WEATHERWISE_FORCE_MOCK"] = "0"
+        os.environ["WEATHERWISE_CLIMATOLOGY"] = os.path.join(workdir, "none.climatology")
+        rows = run(max(1, args.batch_size), max(1, args.repeat))
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "rows": rows}, indent=2))
+        return 0
+    print(f"{'payload':<28} {'encoding':<15} {'compression':<11} {'bytes':>9} {'encode us':>10} {'compress us':>12}")
+    for row in rows:
+        print(
+            f"{row['payload']:<28} {row['encoding']:<15} {row['compression']:<11} {row['bytes']:>9} "
+            f"{row['encode_us']:>10} {row['compress_us']:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
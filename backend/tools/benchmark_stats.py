@@ -0,0 +1,136 @@
+"""
+Micro-benchmark for the per-condition statistics kernel.
+
+Times ``_summarize_conditions`` (the stacked single-pass kernel) against the previous
+per-condition implementation on synthetic windows, and checks both produce the same
+results before reporting anything:
+
+    python -m backend.tools.benchmark_stats --samples 168 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.data_fetcher import (
+    CONDITION_SETTINGS,
+    HISTORY_LIMIT,
+    _apply_transform,
+    _condition_result,
+    _summarize_conditions,
+    _trend_label
+)
+
+ALL_CONDITIONS = list(CONDITION_SETTINGS)
+
+
+def _legacy_probability(values: np.ndarray, threshold: float, comparison: str) -> Optional[float]:
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return None
+    if comparison == ">=":
+        hits = finite >= threshold
+    else:
+        hits = finite <= threshold
+    return float(np.mean(hits) * 100.0)
+
+
+def _legacy_trend(values: np.ndarray) -> Optional[str]:
+    finite = values[np.isfinite(values)]
+    if finite.size < 12:
+        return None
+    midpoint = finite.size // 2
+    return _trend_label(float(np.mean(finite[:midpoint])), float(np.mean(finite[midpoint:])))
+
+
+def legacy_summarize(conditions: Sequence[str], series: Dict[str, Any]) -> Dict[str, Any]:
+    """The per-condition loop the kernel replaced, kept verbatim for comparison."""
+    results: Dict[str, Any] = {}
+    for condition in conditions:
+        settings = CONDITION_SETTINGS.get(condition)
+        if not settings:
+            continue
+        variable = settings["variable"]
+        if variable not in series:
+            continue
+
+        values = np.asarray(series[variable], dtype=float).flatten()
+        values = _apply_transform(variable, values)
+
+        probability = _legacy_probability(values, settings["threshold"], settings["comparison"])
+        if probability is None:
+            continue
+
+        historical_sample = values[np.isfinite(values)]
+        rounded_sample = np.round(historical_sample, 1)
+        historical_list = rounded_sample.tolist()[:HISTORY_LIMIT]
+        trend = _legacy_trend(historical_sample) or "stable"
+
+        results[condition] = _condition_result(settings, probability, historical_list, trend)
+    return results
+
+
+def synthetic_series(samples: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    tmax = 273.15 + 30 + rng.normal(0, 4, samples)
+    series = {
+        "T2M_MAX": tmax,
+        "T2M_MIN": tmax - 14 + rng.normal(0, 2, samples),
+        "T2M": tmax - 1 + rng.normal(0, 1, samples),
+        "PRECTOT": np.maximum(0, rng.gamma(0.6, 4, samples) - 1),
+        "WS10M": np.abs(rng.normal(5, 2.5, samples))
+    }
+    for values in series.values():
+        values[rng.random(samples) < 0.01] = np.nan
+    return {name: values.astype("float32") for name, values in series.items()}
+
+
+def run(sample_sizes: Sequence[int], conditions: Sequence[str], repeat: int) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for samples in sample_sizes:
+        series = synthetic_series(samples)
+        legacy = legacy_summarize(conditions, series)
+        kernel = _summarize_conditions(conditions, series)
+        if json.dumps(legacy, sort_keys=True) != json.dumps(kernel, sort_keys=True):
+            raise AssertionError(f"Kernel output differs from the legacy path for {samples} samples")
+
+        number = max(1, 20000 // max(samples, 1))
+        legacy_time = min(timeit.repeat(lambda: legacy_summarize(conditions, series), number=number, repeat=repeat))
+        kernel_time = min(timeit.repeat(lambda: _summarize_conditions(conditions, series), number=number, repeat=repeat))
+        rows.append({
+            "samples": samples,
+            "conditions": len(conditions),
+            "legacy_us": round(legacy_time / number * 1e6, 1),
+            "kernel_us": round(kernel_time / number * 1e6, 1),
+            "speedup": round(legacy_time / kernel_time, 2)
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the statistics kernel against the previous path.")
+    parser.add_argument("--samples", type=int, nargs="+", default=[168, 1000, 10000], help="Window sizes to test")
+    parser.add_argument("--conditions", nargs="+", default=ALL_CONDITIONS, choices=ALL_CONDITIONS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    rows = run(args.samples, args.conditions, args.repeat)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'samples':>8} {'conds':>5} {'legacy µs':>10} {'kernel µs':>10} {'speedup':>8}")
+    for row in rows:
+        print(
+            f"{row['samples']:>8} {row['conditions']:>5} {row['legacy_us']:>10} "
+            f"{row['kernel_us']:>10} {row['speedup']:>7}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
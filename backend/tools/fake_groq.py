@@ -0,0 +1,250 @@
+"""
+Local stand-in for the Groq chat-completions API.
+
+Point the backend at it with ``GROQ_BASE_URL=http://127.0.0.1:8100`` (any GROQ_API_KEY
+value works) to exercise /insights without network access or quota:
+
+    python -m backend.tools.fake_groq --port 8100 --latency 0.3
+
+``--rate-limit 30`` answers ``429`` with a ``Retry-After`` header once more than 30
+requests arrive within ``--rate-window`` seconds, like Groq's per-minute limits.
+``--drop-after 5`` cuts streamed responses off after five tokens, as a dropped upstream
+connection would.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import threading
+import math
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LOCATION_PATTERN = re.compile(r"\*\*Location:\*\* (.+)")
+
+
+@dataclass
+class FakeGroqSettings:
+    latency: float = 0.0
+    token_delay: float = 0.0
+    reply: Optional[str] = None
+    rate_limit: int = 0
+    rate_window: float = 60.0
+    drop_after: int = 0
+
+
+@dataclass
+class FakeGroqStats:
+    requests: int = 0
+    streams_completed: int = 0
+    streams_aborted: int = 0
+    rate_limited: int = 0
+    connections: Set[Tuple[str, int]] = field(default_factory=set)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "streams_completed": self.streams_completed,
+            "streams_aborted": self.streams_aborted,
+            "connections": len(self.connections)
+        }
+
+
+def _reply_for(prompt: str, settings: FakeGroqSettings) -> str:
+    if settings.reply:
+        return settings.reply
+    match = LOCATION_PATTERN.search(prompt)
+    location = match.group(1).strip() if match else "your location"
+    return (
+        f"In {location}, historical patterns for this time of year are summarised above. "
+        "Plan field work around the riskiest days and keep an eye on local forecasts. "
+        "(Would you like to know about seasonal variations?)"
+    )
+
+
+def create_app(settings: Optional[FakeGroqSettings] = None) -> FastAPI:
+    settings = settings or FakeGroqSettings()
+    stats = FakeGroqStats()
+    app = FastAPI(title="Fake Groq")
+    app.state.settings = settings
+    app.state.stats = stats
+    accepted: Deque[float] = deque()
+
+    def retry_after() -> Optional[float]:
+        """Seconds until another request fits in the window, or ``None`` to accept this one."""
+        if settings.rate_limit <= 0:
+            return None
+        now = time.monotonic()
+        while accepted and accepted[0] <= now - settings.rate_window:
+            accepted.popleft()
+        if len(accepted) >= settings.rate_limit:
+            return accepted[0] + settings.rate_window - now
+        accepted.append(now)
+        return None
+
+    async def stream_chunks(completion_id: str, model: str, content: str) -> AsyncIterator[str]:
+        finished = False
+        try:
+            words = content.split(" ")
+            for index, word in enumerate(words):
+                if 0 < settings.drop_after <= index:
+                    # Raising mid-body makes the server abort the connection without ending the response.
+                    raise ConnectionResetError("fake upstream dropped the stream")
+                if settings.token_delay > 0:
+                    await asyncio.sleep(settings.token_delay)
+                text = word if index == len(words) - 1 else f"{word} "
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+            finished = True
+        finally:
+            if finished:
+                stats.streams_completed += 1
+            else:
+                stats.streams_aborted += 1
+
+    @app.post("/openai/v1/chat/completions", response_model=None)
+    async def chat_completions(request: Request) -> Union[Dict[str, Any], JSONResponse, StreamingResponse]:
+        body = await request.json()
+        stats.requests += 1
+        if request.client is not None:
+            stats.connections.add((request.client.host, request.client.port))
+        wait = retry_after()
+        if wait is not None:
+            stats.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        content = _reply_for(prompt, settings)
+        if settings.latency > 0:
+            await asyncio.sleep(settings.latency)
+
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(f"chatcmpl-{uuid.uuid4().hex}", body.get("model", "fake-model"), content),
+                media_type="text/event-stream"
+            )
+
+        completion_tokens = len(content.split())
+        prompt_tokens = len(prompt.split())
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    @app.get("/stats")
+    async def fake_stats() -> Dict[str, Any]:
+        return stats.as_dict()
+
+    return app
+
+
+class FakeGroqServer:
+    """Runs the fake API on a background thread; ``base_url`` is ready once started."""
+
+    def __init__(self, settings: Optional[FakeGroqSettings] = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        import uvicorn
+
+        self.app = create_app(settings)
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="fake-groq", daemon=True)
+        self.host = host
+
+    @property
+    def stats(self) -> FakeGroqStats:
+        return self.app.state.stats
+
+    @property
+    def base_url(self) -> str:
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://{self.host}:{port}"
+
+    def start(self, timeout: float = 10.0) -> "FakeGroqServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake Groq server did not start in time.")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5.0)
+
+    def __enter__(self) -> "FakeGroqServer":
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Groq chat-completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--reply", help="Fixed reply text (default: templated from the prompt)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per window before answering 429 (0 = no limit)")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Rate-limit window in seconds")
+    parser.add_argument("--drop-after", type=int, default=0, help="Drop streamed responses after this many tokens (0 = never)")
+    args = parser.parse_args()
+
+    settings = FakeGroqSettings(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        reply=args.reply,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        drop_after=args.drop_after
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
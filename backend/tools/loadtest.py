@@ -0,0 +1,522 @@
+"""
+End-to-end load test of the API with a local Groq stand-in.
+
+Generates a synthetic dataset (see :mod:`backend.tools.synthetic_dataset`) unless
+``--dataset`` is given and starts :mod:`backend.tools.fake_groq` with ``--groq-latency``.
+The API is launched in its own process through ``python -m backend.serve``, so ``--workers``
+behaves as in production and the client never competes with the server for the GIL. Once
+``/ready`` answers, mixed traffic is sent for ``--duration`` seconds:
+
+    python -m backend.tools.loadtest --rps 40 --duration 30 --output before.json
+    python -m backend.tools.loadtest --concurrency 16 --mix query=0.6,query_get=0.2,insights=0.2 --compare before.json
+
+Request kinds: ``query`` (POST /query), ``query_get`` (GET /query), ``insights``
+(POST /insights) and ``insights_stream`` (POST /insights/stream, read to the end). Query
+points are drawn from ``--points`` grid locations, which sets how often the result cache
+hits. Each insight request carries a fresh question unless ``--repeat-insights`` is given,
+so it reaches the fake Groq server instead of the insight cache.
+
+``--rps`` is an open loop: requests start on a Poisson schedule whatever the server does,
+so queueing shows up as latency rather than as a lower send rate. ``--concurrency`` is a
+closed loop of virtual users that each send their next request when the last one finishes.
+
+The report gives throughput, p50/p95/p99 latency, errors by status and insight fallbacks for
+each kind and overall, plus server RSS (all worker processes, sampled from ``/proc``, Linux
+only) and the fake Groq counters. ``--json`` / ``--output`` write it as JSON with the git
+revision. ``--max-p95-ms`` and ``--max-error-rate`` exit with code 1 when exceeded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.tools.benchmark import DATES, _git_revision
+
+ROOT = Path(__file__).resolve().parents[2]
+KINDS = ("query", "query_get", "insights", "insights_stream")
+DEFAULT_MIX = "query=0.7,query_get=0.1,insights=0.2"
+CONDITIONS = ("very_hot", "very_cold", "very_wet", "very_windy", "very_uncomfortable")
+RSS_SAMPLE_SECONDS = 0.5
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """``query=0.7,insights=0.3`` -> normalized weights per request kind."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in KINDS:
+            raise ValueError(f"Unknown request kind {name!r}; choose from {', '.join(KINDS)}.")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("The traffic mix needs at least one positive weight.")
+    return {name: weight / total for name, weight in weights.items() if weight > 0}
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _process_tree(pid: int) -> List[int]:
+    """``pid`` and its descendants, from ``/proc/<pid>/task/*/children``."""
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children", encoding="utf-8") as handle:
+                    pending.extend(int(child) for child in handle.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def _rss_mib(pid: int) -> Optional[float]:
+    total_kib = 0
+    found = False
+    for member in _process_tree(pid):
+        try:
+            with open(f"/proc/{member}/status", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.startswith("VmRSS:"):
+                        total_kib += int(line.split()[1])
+                        found = True
+                        break
+        except OSError:
+            continue
+    return round(total_kib / 1024, 1) if found else None
+
+
+class RssSampler:
+    """Samples the server's resident memory (summed over its worker processes) on a thread."""
+
+    def __init__(self, pid: int, interval: float = RSS_SAMPLE_SECONDS) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            value = _rss_mib(self.pid)
+            if value is not None:
+                self.samples.append(value)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        if not self.samples:
+            return {"start_mib": None, "peak_mib": None, "end_mib": None}
+        return {"start_mib": self.samples[0], "peak_mib": max(self.samples), "end_mib": self.samples[-1]}
+
+
+@dataclass
+class KindStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+    fallbacks: int = 0
+
+    def record(self, seconds: float, error: Optional[str], fallback: bool = False) -> None:
+        if error is None:
+            self.latencies.append(seconds)
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        if fallback:
+            self.fallbacks += 1
+
+    def merge(self, other: "KindStats") -> None:
+        self.latencies.extend(other.latencies)
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+        self.fallbacks += other.fallbacks
+
+
+def _percentile(ordered: List[float], quantile: float) -> Optional[float]:
+    """Nearest-rank percentile of a sorted list, in milliseconds."""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(quantile * len(ordered)))
+    return round(ordered[rank - 1] * 1000, 2)
+
+
+def summarize(stats: KindStats, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(stats.latencies)
+    failed = sum(stats.errors.values())
+    total = len(ordered) + failed
+    return {
+        "requests": total,
+        "ok": len(ordered),
+        "errors": dict(sorted(stats.errors.items())),
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else None,
+        "p50_ms": _percentile(ordered, 0.50),
+        "p95_ms": _percentile(ordered, 0.95),
+        "p99_ms": _percentile(ordered, 0.99),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else None,
+        "fallbacks": stats.fallbacks
+    }
+
+
+class Traffic:
+    """Builds requests of each kind and records their outcome."""
+
+    def __init__(self, client: Any, points: List[Tuple[float, float]], insight_payloads: List[Dict[str, Any]], *, repeat_insights: bool, seed: int) -> None:
+        self.client = client
+        self.points = points
+        self.insight_payloads = insight_payloads
+        self.repeat_insights = repeat_insights
+        self.random = random.Random(seed)
+        self.stats: Dict[str, KindStats] = {kind: KindStats() for kind in KINDS}
+        self._questions = 0
+
+    def _query(self) -> Tuple[Tuple[float, float], str, List[str]]:
+        point = self.random.choice(self.points)
+        date_of_year = self.random.choice(DATES)
+        conditions = self.random.sample(CONDITIONS, self.random.randint(1, len(CONDITIONS)))
+        return point, date_of_year, conditions
+
+    def _insight_body(self) -> Dict[str, Any]:
+        body = dict(self.random.choice(self.insight_payloads))
+        if not self.repeat_insights:
+            self._questions += 1
+            body["userPrompt"] = f"Load test question {self._questions}: what should I plan for?"
+        return body
+
+    async def send(self, kind: str) -> None:
+        started = time.perf_counter()
+        error: Optional[str] = None
+        fallback = False
+        try:
+            if kind == "query":
+                (lat, lon), date_of_year, conditions = self._query()
+                response = await self.client.post("/query", json={
+                    "location": {"lat": lat, "lon": lon},
+                    "date_of_year": date_of_year,
+                    "conditions": conditions
+                })
+            elif kind == "query_get":
+                (lat, lon), date_of_year, conditions = self._query()
+                response = await self.client.get("/query", params={
+                    "lat": lat,
+                    "lon": lon,
+                    "date_of_year": date_of_year,
+                    "conditions": ",".join(conditions)
+                })
+            elif kind == "insights":
+                response = await self.client.post("/insights", json=self._insight_body())
+                if response.status_code == 200:
+                    fallback = bool(response.json().get("fallback"))
+            else:
+                async with self.client.stream("POST", "/insights/stream", json=self._insight_body()) as response:
+                    async for chunk in response.aiter_text():
+                        if '"fallback": true' in chunk or '"fallback":true' in chunk:
+                            fallback = True
+            if response.status_code >= 400:
+                error = str(response.status_code)
+        except Exception as exc:  # timeouts and connection failures count as errors, not crashes
+            error = type(exc).__name__
+        self.stats[kind].record(time.perf_counter() - started, error, fallback)
+
+
+async def _open_loop(traffic: Traffic, kinds: List[str], weights: List[float], rps: float, duration: float, max_in_flight: int) -> int:
+    """Poisson arrivals at ``rps``; returns how many were skipped because ``max_in_flight`` was reached."""
+    pending: set = set()
+    skipped = 0
+    deadline = time.perf_counter() + duration
+    next_start = time.perf_counter()
+    while True:
+        next_start += traffic.random.expovariate(rps)
+        if next_start >= deadline:
+            break
+        delay = next_start - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(pending) >= max_in_flight:
+            skipped += 1
+            continue
+        task = asyncio.create_task(traffic.send(traffic.random.choices(kinds, weights)[0]))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+    return skipped
+
+
+async def _closed_loop(traffic: Traffic, kinds: List[str], weights: List[float], concurrency: int, duration: float) -> int:
+    deadline = time.perf_counter() + duration
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            await traffic.send(traffic.random.choices(kinds, weights)[0])
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return 0
+
+
+async def _prepare(client: Any, points: List[Tuple[float, float]], count: int) -> List[Dict[str, Any]]:
+    """Real /query answers to send to /insights, fetched before the timed run."""
+    payloads = []
+    for index in range(count):
+        lat, lon = points[index % len(points)]
+        query = {
+            "location": {"lat": lat, "lon": lon, "name": f"Load test site {index}"},
+            "date_of_year": DATES[index % len(DATES)],
+            "conditions": list(CONDITIONS)
+        }
+        response = await client.post("/query", json=query)
+        response.raise_for_status()
+        answer = response.json()
+        payloads.append({"query": query, "results": answer["results"], "metadata": answer["metadata"]})
+    return payloads
+
+
+async def drive(base_url: str, args: argparse.Namespace, points: List[Tuple[float, float]]) -> Tuple[Dict[str, KindStats], float, int]:
+    import httpx
+
+    mix = parse_mix(args.mix)
+    kinds, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        insight_payloads = await _prepare(client, points, 8)
+        traffic = Traffic(client, points, insight_payloads, repeat_insights=args.repeat_insights, seed=args.seed)
+        started = time.perf_counter()
+        if args.rps:
+            skipped = await _open_loop(traffic, kinds, weights, args.rps, args.duration, args.max_in_flight)
+        else:
+            skipped = await _closed_loop(traffic, kinds, weights, args.concurrency, args.duration)
+        elapsed = time.perf_counter() - started
+    return {kind: stats for kind, stats in traffic.stats.items() if kind in mix}, elapsed, skipped
+
+
+def _grid_points(dataset_uri: str, count: int, seed: int) -> List[Tuple[float, float]]:
+    import xarray as xr
+
+    from backend.shards import is_sharded_source, open_sharded
+
+    dataset = open_sharded(dataset_uri) if is_sharded_source(dataset_uri) else xr.open_dataset(dataset_uri)
+    with dataset:
+        lats = dataset["lat"].values
+        lons = dataset["lon"].values
+    chooser = random.Random(seed)
+    return [(float(chooser.choice(lats)), float(chooser.choice(lons))) for _ in range(max(1, count))]
+
+
+def _start_server(env: Dict[str, str], port: int, workers: int, log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w", encoding="utf-8")
+    return subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+
+
+def _wait_ready(base_url: str, server: subprocess.Popen, log_path: str, timeout: float) -> float:
+    import httpx
+
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            break
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    with open(log_path, encoding="utf-8") as handle:
+        tail = handle.read()[-2000:]
+    raise RuntimeError(f"The API did not become ready within {timeout:.0f}s:\n{tail}")
+
+
+def run(args: argparse.Namespace, dataset_uri: str, workdir: str) -> Dict[str, Any]:
+    from backend.tools.fake_groq import FakeGroqServer, FakeGroqSettings
+
+    points = _grid_points(dataset_uri, args.points, args.seed)
+    settings = FakeGroqSettings(latency=args.groq_latency, token_delay=args.groq_token_delay)
+    with FakeGroqServer(settings) as groq:
+        env = dict(os.environ)
+        env.update(
+            WEATHERWISE_DATASET=dataset_uri,
+            WEATHERWISE_FORCE_MOCK="0",
+            WEATHERWISE_ALLOW_MOCK_FALLBACK="0",
+            WEATHERWISE_CLIMATOLOGY=os.path.join(workdir, "loadtest.climatology"),
+            GROQ_API_KEY="loadtest",
+            GROQ_BASE_URL=groq.base_url,
+            GROQ_CACHE_PATH="",
+            # Client-side pacing would hide the server's own limits; --groq-rpm turns it back on.
+            GROQ_RATE_LIMIT_RPM=str(args.groq_rpm),
+            GROQ_RATE_LIMIT_TPM="0"
+        )
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        log_path = os.path.join(workdir, "server.log")
+        server = _start_server(env, port, args.workers, log_path)
+        try:
+            ready_seconds = _wait_ready(base_url, server, log_path, args.startup_timeout)
+            with RssSampler(server.pid) as sampler:
+                stats, elapsed, skipped = asyncio.run(drive(base_url, args, points))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        groq_stats = groq.stats.as_dict()
+
+    overall = KindStats()
+    for kind_stats in stats.values():
+        overall.merge(kind_stats)
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "mode": "open" if args.rps else "closed",
+            "rps": args.rps,
+            "concurrency": None if args.rps else args.concurrency,
+            "duration_s": args.duration,
+            "mix": parse_mix(args.mix),
+            "workers": args.workers,
+            "points": args.points,
+            "groq_latency_s": args.groq_latency,
+            "repeat_insights": args.repeat_insights,
+            "dataset": args.dataset or {"lat": args.lat, "lon": args.lon, "years": args.years}
+        },
+        "ready_seconds": round(ready_seconds, 2),
+        "elapsed_s": round(elapsed, 2),
+        "skipped_at_max_in_flight": skipped,
+        "overall": summarize(overall, elapsed),
+        "kinds": {kind: summarize(kind_stats, elapsed) for kind, kind_stats in stats.items()},
+        "server_rss": sampler.summary(),
+        "groq": groq_stats
+    }
+
+
+def _print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'kind':<16} {'requests':>8} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'fallback':>8}"
+    if baseline is not None:
+        header += f" {'rps vs base':>11} {'p95 vs base':>11}"
+    print(header)
+    rows = list(report["kinds"].items()) + [("overall", report["overall"])]
+    for name, row in rows:
+        line = (
+            f"{name:<16} {row['requests']:>8} {row['throughput_rps']:>8} {row['p50_ms']!s:>9} {row['p95_ms']!s:>9} "
+            f"{row['p99_ms']!s:>9} {sum(row['errors'].values()):>7} {row['fallbacks']:>8}"
+        )
+        if baseline is not None:
+            previous = baseline["overall"] if name == "overall" else baseline.get("kinds", {}).get(name)
+            for metric in ("throughput_rps", "p95_ms"):
+                if previous and previous.get(metric) and row.get(metric):
+                    line += f" {row[metric] / previous[metric]:>10.2f}x"
+                else:
+                    line += f" {'-':>11}"
+        print(line)
+    rss = report["server_rss"]
+    print(
+        f"server RSS {rss['start_mib']} -> peak {rss['peak_mib']} MiB  |  ready after {report['ready_seconds']} s  |  "
+        f"fake Groq: {report['groq']['requests']} requests  |  revision {report['revision']}"
+    )
+    if report["skipped_at_max_in_flight"]:
+        print(f"{report['skipped_at_max_in_flight']} requests were not sent because --max-in-flight was reached")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the WeatherWise API with a local Groq stand-in.")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--rps", type=float, help="Open loop: target requests per second")
+    load.add_argument("--concurrency", type=int, default=8, help="Closed loop: concurrent virtual users (default 8)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of timed traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weights per request kind (default {DEFAULT_MIX})")
+    parser.add_argument("--workers", type=int, default=1, help="API worker processes")
+    parser.add_argument("--points", type=int, default=200, help="Distinct grid points queried (fewer = more cache hits)")
+    parser.add_argument("--repeat-insights", action="store_true", help="Reuse insight questions so the insight cache can hit")
+    parser.add_argument("--groq-latency", type=float, default=0.4, help="Seconds the fake Groq server waits before answering")
+    parser.add_argument("--groq-token-delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--groq-rpm", type=float, default=0, help="Client-side Groq rate limit to apply (default 0 = off)")
+    parser.add_argument("--dataset", help="Dataset to serve (default: a generated synthetic one)")
+    parser.add_argument("--lat", type=int, default=20, help="Synthetic latitude points")
+    parser.add_argument("--lon", type=int, default=30, help="Synthetic longitude points")
+    parser.add_argument("--years", type=int, nargs=2, default=[2000, 2023], metavar=("FIRST", "LAST"))
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="Open-loop cap on outstanding requests")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Previous --output file to compare against")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail when the overall p95 exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="Fail when the overall error rate exceeds this (0-1)")
+    args = parser.parse_args(argv)
+    if args.rps is not None and args.rps <= 0:
+        parser.error("--rps must be positive")
+
+    with tempfile.TemporaryDirectory(prefix="weatherwise-loadtest-") as workdir:
+        dataset_uri = args.dataset
+        if not dataset_uri:
+            from backend.tools.synthetic_dataset import generate_dataset
+
+            started = time.perf_counter()
+            dataset_uri = str(generate_dataset(
+                os.path.join(workdir, "synthetic.nc"),
+                lat_points=args.lat,
+                lon_points=args.lon,
+                start_year=args.years[0],
+                end_year=args.years[1]
+            ))
+            print(f"Generated {dataset_uri} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        report = run(args, dataset_uri, workdir)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    failures = []
+    overall = report["overall"]
+    if args.max_p95_ms is not None and (overall["p95_ms"] is None or overall["p95_ms"] > args.max_p95_ms):
+        failures.append(f"overall p95 {overall['p95_ms']} ms (budget {args.max_p95_ms} ms)")
+    if args.max_error_rate is not None and overall["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {overall['error_rate']} (budget {args.max_error_rate})")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+"""
+Synthetic MERRA-2-like daily datasets for benchmarks and local testing.
+
+Writes every variable named in ``CONDITION_SETTINGS`` on a regular lat/lon grid with a
+seasonal cycle, a latitude gradient, a slow warming trend and occasional missing values,
+in the units the backend expects (temperatures in Kelvin, precipitation in mm/day, wind
+in m/s). Values are generated and written one year at a time, so memory stays flat for
+long spans:
+
+    python -m backend.tools.synthetic_dataset D:/data/synthetic.nc --lat 40 --lon 60 --years 2000 2023
+    python -m backend.tools.synthetic_dataset D:/data/synthetic/ --per-year   # shards + manifest
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.data_fetcher import CONDITION_SETTINGS
+
+DEFAULT_LAT_RANGE = (25.0, 50.0)
+DEFAULT_LON_RANGE = (-125.0, -65.0)
+MISSING_FRACTION = 0.005
+
+
+def _year_values(
+    times: pd.DatetimeIndex,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    rng: np.random.Generator,
+    base_year: int
+) -> Dict[str, np.ndarray]:
+    shape = (times.size, lat.size, lon.size)
+    day = np.asarray(times.dayofyear, dtype=float)[:, None, None]
+    season = np.cos(2 * np.pi * (day - 200) / 365.25)
+    # Warmer towards the equator, larger seasonal swing towards the poles, +0.03 K per year.
+    latitude = np.abs(lat)[None, :, None]
+    warming = 0.03 * (times.year[0] - base_year)
+    t_mean = 300.0 - 0.45 * (latitude - 25) + (6 + 0.25 * latitude) * season + warming
+    t_mean = np.broadcast_to(t_mean, shape) + rng.normal(0, 3, shape)
+    values = {
+        "T2M": t_mean,
+        "T2M_MAX": t_mean + 6 + rng.normal(0, 1.5, shape),
+        "T2M_MIN": t_mean - 7 + rng.normal(0, 1.5, shape),
+        "PRECTOT": np.maximum(0.0, rng.gamma(0.5, 6, shape) - 1.5),
+        "WS10M": np.abs(rng.normal(4.5, 2.5, shape) + 0.02 * np.abs(lon)[None, None, :] / 10)
+    }
+    for name, array in values.items():
+        array = array.astype("float32")
+        array[rng.random(shape) < MISSING_FRACTION] = np.nan
+        values[name] = array
+    return values
+
+
+def _variables() -> List[str]:
+    return sorted({settings["variable"] for settings in CONDITION_SETTINGS.values()})
+
+
+def _grid(lat_points: int, lon_points: int, lat_range: Tuple[float, float], lon_range: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        np.linspace(lat_range[0], lat_range[1], max(1, lat_points)),
+        np.linspace(lon_range[0], lon_range[1], max(1, lon_points))
+    )
+
+
+def _create_file(path: Path, times: int, lat: np.ndarray, lon: np.ndarray) -> Any:
+    import netCDF4  # type: ignore
+
+    out = netCDF4.Dataset(path, "w", format="NETCDF4")
+    out.title = "Synthetic MERRA-2-like daily fields (WeatherWise benchmark)"
+    out.createDimension("time", times)
+    out.createDimension("lat", lat.size)
+    out.createDimension("lon", lon.size)
+    time_var = out.createVariable("time", "f8", ("time",))
+    time_var.units = "days since 1970-01-01"
+    time_var.calendar = "proleptic_gregorian"
+    for name, values, units in (("lat", lat, "degrees_north"), ("lon", lon, "degrees_east")):
+        coord = out.createVariable(name, "f8", (name,))
+        coord[:] = values
+        coord.units = units
+    units = {"T2M": "K", "T2M_MAX": "K", "T2M_MIN": "K", "PRECTOT": "mm/day", "WS10M": "m s-1"}
+    for name in _variables():
+        variable = out.createVariable(
+            name, "f4", ("time", "lat", "lon"), chunksizes=(min(times, 366), min(lat.size, 8), min(lon.size, 8)),
+            fill_value=np.float32(np.nan)
+        )
+        variable.units = units.get(name, "1")
+    return out
+
+
+def _write_year(out: Any, offset: int, times: pd.DatetimeIndex, values: Dict[str, np.ndarray]) -> None:
+    epoch = np.datetime64("1970-01-01", "D")
+    out["time"][offset:offset + times.size] = (times.values.astype("datetime64[D]") - epoch).astype(float)
+    for name, array in values.items():
+        out[name][offset:offset + times.size, :, :] = array
+
+
+def generate_dataset(
+    output: str,
+    *,
+    lat_points: int = 20,
+    lon_points: int = 30,
+    start_year: int = 2000,
+    end_year: int = 2023,
+    per_year: bool = False,
+    lat_range: Tuple[float, float] = DEFAULT_LAT_RANGE,
+    lon_range: Tuple[float, float] = DEFAULT_LON_RANGE,
+    seed: int = 0
+) -> Path:
+    """Write a synthetic daily dataset and return the path to point ``WEATHERWISE_DATASET`` at.
+
+    With ``per_year`` the output is a directory with one file per year plus a
+    ``manifest.json``, and the manifest path is returned.
+    """
+    lat, lon = _grid(lat_points, lon_points, lat_range, lon_range)
+    rng = np.random.default_rng(seed)
+    years = range(start_year, end_year + 1)
+    target = Path(output)
+
+    if per_year:
+        target.mkdir(parents=True, exist_ok=True)
+        shards: List[str] = []
+        for year in years:
+            times = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+            name = f"synthetic_{year}.nc"
+            with _create_file(target / name, times.size, lat, lon) as out:
+                _write_year(out, 0, times, _year_values(times, lat, lon, rng, start_year))
+            shards.append(name)
+        manifest = target / "manifest.json"
+        with manifest.open("w", encoding="utf-8") as handle:
+            json.dump({"shards": shards}, handle, indent=2)
+        return manifest
+
+    total = pd.date_range(f"{start_year}-01-01", f"{end_year}-12-31", freq="D").size
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    with _create_file(staging, total, lat, lon) as out:
+        offset = 0
+        for year in years:
+            times = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+            _write_year(out, offset, times, _year_values(times, lat, lon, rng, start_year))
+            offset += times.size
+    os.replace(staging, target)
+    return target
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic MERRA-2-like daily dataset.")
+    parser.add_argument("output", help="NetCDF file, or a directory with --per-year")
+    parser.add_argument("--lat", type=int, default=20, help="Latitude points")
+    parser.add_argument("--lon", type=int, default=30, help="Longitude points")
+    parser.add_argument("--years", type=int, nargs=2, default=[2000, 2023], metavar=("FIRST", "LAST"))
+    parser.add_argument("--per-year", action="store_true", help="One file per year plus a manifest.json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    path = generate_dataset(
+        args.output,
+        lat_points=args.lat,
+        lon_points=args.lon,
+        start_year=args.years[0],
+        end_year=args.years[1],
+        per_year=args.per_year,
+        seed=args.seed
+    )
+    print(f"Synthetic dataset written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
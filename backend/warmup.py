@@ -0,0 +1,158 @@
+"""
+Background warm-up after a cold start.
+
+The API module avoids importing numpy, pandas, xarray and groq so the server can accept
+connections quickly. :class:`Warmup` then runs in the background: it imports those modules,
+opens the configured dataset, builds its window index and climatology handle, answers one
+sample query (priming the result, page and chunk caches) and starts the Groq client.
+Requests that arrive earlier still work; they just pay for whatever is not warm yet.
+
+``GET /ready`` reports the progress of each step. It stays not ready if a step other than
+:data:`OPTIONAL_STEPS` fails, e.g. when the dataset cannot be opened. ``WEATHERWISE_WARMUP=0``
+skips the warm-up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+STEPS = ("imports", "dataset", "indexes", "sample_query", "insights")
+# Steps the instance can serve without; any other failed step keeps /ready at 503.
+OPTIONAL_STEPS = frozenset({"insights"})
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WEATHERWISE_WARMUP", "1").lower() not in {"0", "false", "no"}
+
+
+def _import_modules() -> None:
+    from . import data_fetcher, groq_insights, tiles  # noqa: F401
+
+
+def _open_dataset() -> Optional[str]:
+    from .data_fetcher import get_fetcher
+
+    return "mock mode" if get_fetcher().warm(indexes=False) is None else None
+
+
+def _build_indexes() -> Optional[str]:
+    from .data_fetcher import get_fetcher
+
+    return "mock mode" if get_fetcher().warm() is None else None
+
+
+def _sample_query() -> Optional[str]:
+    from .conditions import CONDITION_SETTINGS
+    from .data_fetcher import get_fetcher
+
+    fetcher = get_fetcher()
+    dataset = fetcher.warm(indexes=False)
+    if dataset is None:
+        return "mock mode"
+    lat = dataset.indexes["lat"]
+    lon = dataset.indexes["lon"]
+    fetcher.query(
+        float(lat[len(lat) // 2]),
+        float(lon[len(lon) // 2]),
+        date.today().strftime("%m-%d").replace("02-29", "02-28"),
+        list(CONDITION_SETTINGS)
+    )
+    return None
+
+
+def _open_insights_client() -> Optional[str]:
+    from .groq_insights import GroqClientError, open_async_client
+
+    try:
+        open_async_client()
+    except GroqClientError as exc:
+        # /insights reports the problem per request; the rest of the API still works.
+        return str(exc).splitlines()[0]
+    return None
+
+
+class Warmup:
+    """Runs the warm-up steps in order and records each one's outcome for ``/ready``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in STEPS}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def _update(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self._steps[name].update(fields)
+
+    async def _step(self, name: str, call: Callable[[], Optional[str]], *, in_thread: bool = True) -> None:
+        self._update(name, status="running")
+        started = time.perf_counter()
+        try:
+            note = await asyncio.to_thread(call) if in_thread else call()
+        except Exception as exc:
+            LOGGER.warning("Warm-up step %s failed: %s", name, exc)
+            self._update(name, status="failed", error=str(exc), seconds=round(time.perf_counter() - started, 3))
+            return
+        fields: Dict[str, Any] = {"status": "skipped" if note else "done", "seconds": round(time.perf_counter() - started, 3)}
+        if note:
+            fields["note"] = note
+        self._update(name, **fields)
+
+    async def run(self) -> None:
+        self._started_at = time.perf_counter()
+        # Blocking steps run on a plain thread (not the compute executor) so they never take
+        # capacity from requests; the Groq client is created on the event loop that uses it.
+        plan: List[Tuple[str, Callable[[], Optional[str]], bool]] = [
+            ("imports", _import_modules, True),
+            ("dataset", _open_dataset, True),
+            ("indexes", _build_indexes, True),
+            ("sample_query", _sample_query, True),
+            ("insights", _open_insights_client, False)
+        ]
+        for name, call, in_thread in plan:
+            await self._step(name, call, in_thread=in_thread)
+        self._finished_at = time.perf_counter()
+        LOGGER.info("Warm-up finished in %.2fs", self._finished_at - self._started_at)
+
+    def start(self) -> None:
+        if not warmup_enabled():
+            with self._lock:
+                for step in self._steps.values():
+                    step.update(status="skipped", note="WEATHERWISE_WARMUP=0")
+            return
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(
+                step["status"] in {"done", "skipped"} or (step["status"] == "failed" and name in OPTIONAL_STEPS)
+                for name, step in self._steps.items()
+            )
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self._steps.items()}
+        end = self._finished_at or time.perf_counter()
+        return {
+            "ready": self.ready,
+            "elapsed_seconds": round(end - self._started_at, 3) if self._started_at is not None else None,
+            "steps": steps
+        }
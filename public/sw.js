@@ -41,16 +41,19 @@ self.addEventListener('fetch', (event) => {
     return;
   }
 
-  // Network first strategy for API calls
+  // Network first strategy for API calls. The network fetch goes through the HTTP cache,
+  // so GET /api/query answers are revalidated with their ETag instead of recomputed.
   if (event.request.url.includes('/api/')) {
     event.respondWith(
       fetch(event.request)
         .then((response) => {
-          // Clone the response before caching
-          const responseToCache = response.clone();
-          caches.open(RUNTIME_CACHE).then((cache) => {
-            cache.put(event.request, responseToCache);
-          });
+          // The Cache API only stores GET requests; keep successful ones for offline use
+          if (event.request.method === 'GET' && response.ok) {
+            const responseToCache = response.clone();
+            caches.open(RUNTIME_CACHE).then((cache) => {
+              cache.put(event.request, responseToCache);
+            });
+          }
           return response;
         })
         .catch(() => {
@@ -86,6 +86,8 @@ function App() {
     }
   }, [activeCondition, data]);
 
+  const heatmapCondition: WeatherConditionKey | undefined = activeCondition ?? conditions[0];
+
   return (
     <div className="relative min-h-screen bg-gradient-to-br from-slate-900 via-blue-900 to-slate-900">
       {/* Animated background */}
@@ -155,7 +157,12 @@ function App() {
                 <p className="text-xs text-blue-200">Click map or drag marker</p>
               </div>
             </div>
-            <MapSelector lat={lat} lon={lon} onChange={handleMapChange} />
+            <MapSelector
+              lat={lat}
+              lon={lon}
+              onChange={handleMapChange}
+              heatmap={heatmapCondition ? { condition: heatmapCondition, dateOfYear } : null}
+            />
             {locationName && (
               <div className="mt-3 rounded-lg bg-white/10 px-3 py-2">
                 <p className="text-xs font-semibold text-nasa-red">Current Location</p>
@@ -3,6 +3,7 @@ import { useAiInsights } from "../hooks/useAiInsights";
 import { WeatherQueryResponse, WeatherSummary, WeatherConditionKey } from "../types/weather";
 import { parseUserIntent } from "../services/intentParser";
 import { getCoordinates } from "../services/geocoder";
+import { InsightFallbackReason } from "../services/aiInsightsService";
 
 interface AiChatPanelProps {
   data?: WeatherQueryResponse;
@@ -23,8 +24,15 @@ interface Message {
   role: "user" | "assistant" | "system";
   content: string;
   timestamp: Date;
+  fallbackReason?: InsightFallbackReason;
 }
 
+const FALLBACK_NOTES: Record<InsightFallbackReason, string> = {
+  latency_budget: "The AI took too long to answer, so this is a quick summary of the NASA data. Ask again for a detailed answer.",
+  circuit_open: "The AI service is temporarily unavailable, so this is a quick summary of the NASA data.",
+  upstream_error: "The AI service returned an error, so this is a quick summary of the NASA data."
+};
+
 export const AiChatPanel = ({ 
   data, 
   summaries, 
@@ -38,7 +46,7 @@ export const AiChatPanel = ({
   onConditionsChange,
   onAiInsightChange
 }: AiChatPanelProps) => {
-  const { insight, isLoading, error, generateInsight, reset } = useAiInsights();
+  const { insight, fallbackReason, partialInsight, isLoading, error, generateInsight, reset } = useAiInsights();
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState("");
   const [isParsingIntent, setIsParsingIntent] = useState(false);
@@ -88,7 +96,8 @@ export const AiChatPanel = ({
       setMessages(prev => [...prev, {
         role: "assistant",
         content: insight,
-        timestamp: new Date()
+        timestamp: new Date(),
+        fallbackReason
       }]);
       
       // Notify parent component of new AI insight for export
@@ -98,7 +107,7 @@ export const AiChatPanel = ({
       
       reset();
     }
-  }, [insight, messages, reset, onAiInsightChange]);
+  }, [insight, fallbackReason, messages, reset, onAiInsightChange]);
 
   const handleSend = async () => {
     const trimmed = input.trim();
@@ -385,6 +394,11 @@ export const AiChatPanel = ({
                       <span className="text-base">🤖</span> AI Assistant
                     </div>
                   )}  
+                  {msg.fallbackReason && (
+                    <div className="mb-2 rounded-lg border border-amber-300 bg-amber-50 px-2 py-1 text-xs text-amber-800">
+                      ⚡ {FALLBACK_NOTES[msg.fallbackReason]}
+                    </div>
+                  )}
                   <div className="whitespace-pre-wrap text-sm leading-relaxed">
                     {msg.content.split("**").map((part, i) =>
                       i % 2 === 1 ? <strong key={i}>{part}</strong> : part
@@ -408,7 +422,21 @@ export const AiChatPanel = ({
                 </div>
               </div>
             )}
-            {isLoading && (
+            {isLoading && partialInsight && (
+              <div className="flex justify-start">
+                <div className="max-w-[80%] rounded-2xl border-2 border-white/20 bg-white/95 px-4 py-3 text-slate-800 shadow-lg backdrop-blur">
+                  <div className="mb-2 flex items-center gap-2 text-xs font-semibold text-nasa-blue">
+                    <span className="text-base">🤖</span> AI Assistant
+                  </div>
+                  <div className="whitespace-pre-wrap text-sm leading-relaxed">
+                    {partialInsight.split("**").map((part, i) =>
+                      i % 2 === 1 ? <strong key={i}>{part}</strong> : part
+                    )}
+                  </div>
+                </div>
+              </div>
+            )}
+            {isLoading && !partialInsight && (
               <div className="flex justify-start">
                 <div className="max-w-[80%] rounded-2xl border-2 border-white/20 bg-white/95 px-4 py-3 shadow-lg backdrop-blur">
                   <div className="flex items-center gap-2 text-sm text-nasa-blue font-semibold">
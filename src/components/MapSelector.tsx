@@ -1,6 +1,9 @@
+import { useState } from "react";
 import { MapContainer, Marker, TileLayer, useMapEvents } from "react-leaflet";
 import L, { LatLngExpression, LeafletEvent, LeafletMouseEvent } from "leaflet";
 import "leaflet/dist/leaflet.css";
+import { buildHeatmapTileUrl } from "../services/nasaDataService";
+import { WeatherConditionKey } from "../types/weather";
 
 const defaultIcon = new L.Icon({
   iconUrl: "https://unpkg.com/leaflet@1.9.4/dist/images/marker-icon.png",
@@ -13,6 +16,10 @@ interface MapSelectorProps {
   lat: number | null;
   lon: number | null;
   onChange: (lat: number, lon: number) => void;
+  heatmap?: {
+    condition: WeatherConditionKey;
+    dateOfYear: string;
+  } | null;
 }
 
 const DEFAULT_CENTER: LatLngExpression = [39.7392, -104.9903];
@@ -52,8 +59,10 @@ const LocationMarker = ({
   );
 };
 
-export const MapSelector = ({ lat, lon, onChange }: MapSelectorProps) => {
+export const MapSelector = ({ lat, lon, onChange, heatmap }: MapSelectorProps) => {
   const center: LatLngExpression = lat != null && lon != null ? [lat, lon] : DEFAULT_CENTER;
+  const [showHeatmap, setShowHeatmap] = useState(false);
+  const heatmapUrl = heatmap ? buildHeatmapTileUrl(heatmap.condition, heatmap.dateOfYear) : null;
 
   return (
     <section className="space-y-4">
@@ -61,6 +70,16 @@ export const MapSelector = ({ lat, lon, onChange }: MapSelectorProps) => {
         <p className="text-sm text-slate-600">
           🗺️ Click anywhere on the map or drag the marker to select your location
         </p>
+        {heatmapUrl && (
+          <label className="flex items-center gap-2 text-xs text-slate-500">
+            <input
+              type="checkbox"
+              checked={showHeatmap}
+              onChange={(event) => setShowHeatmap(event.target.checked)}
+            />
+            Show risk heatmap for the selected date
+          </label>
+        )}
       </header>
       <div className="h-96 overflow-hidden rounded-2xl border-2 border-slate-200 shadow-lg ring-2 ring-slate-100">
         <MapContainer center={center} zoom={6} scrollWheelZoom className="h-full w-full">
@@ -68,6 +87,9 @@ export const MapSelector = ({ lat, lon, onChange }: MapSelectorProps) => {
             attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
             url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
           />
+          {showHeatmap && heatmapUrl && (
+            <TileLayer key={heatmapUrl} url={heatmapUrl} opacity={0.7} zIndex={10} />
+          )}
           <LocationMarker lat={lat} lon={lon} onChange={onChange} />
         </MapContainer>
       </div>
@@ -1,11 +1,17 @@
-import { useCallback, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import {
+  InsightFallbackReason,
   PlannerInsightPayload,
-  generatePlannerInsight
+  PlannerInsightResponse,
+  generatePlannerInsight,
+  streamPlannerInsight
 } from "../services/aiInsightsService";
 
 interface UseAiInsightsResult {
   insight?: string;
+  /** Set when `insight` is the backend's template answer rather than Groq's. */
+  fallbackReason?: InsightFallbackReason;
+  partialInsight?: string;
   isLoading: boolean;
   error?: string;
   generateInsight: (payload: PlannerInsightPayload) => Promise<void>;
@@ -14,32 +20,73 @@ interface UseAiInsightsResult {
 
 export const useAiInsights = (): UseAiInsightsResult => {
   const [insight, setInsight] = useState<string>();
+  const [fallbackReason, setFallbackReason] = useState<InsightFallbackReason>();
+  const [partialInsight, setPartialInsight] = useState<string>();
   const [error, setError] = useState<string>();
   const [isLoading, setIsLoading] = useState(false);
+  const controllerRef = useRef<AbortController | null>(null);
+
+  // Stop any in-flight stream when the panel unmounts so the backend stops generating.
+  useEffect(() => () => controllerRef.current?.abort(), []);
 
   const generateInsight = useCallback(async (payload: PlannerInsightPayload) => {
+    controllerRef.current?.abort();
+    const controller = new AbortController();
+    controllerRef.current = controller;
+
     setIsLoading(true);
     setError(undefined);
+    setPartialInsight(undefined);
 
+    let receivedText = false;
     try {
-      const response = await generatePlannerInsight(payload);
+      let response: PlannerInsightResponse;
+      try {
+        response = await streamPlannerInsight(
+          payload,
+          (textSoFar) => {
+            receivedText = true;
+            setPartialInsight(textSoFar);
+          },
+          controller.signal
+        );
+      } catch (streamError) {
+        // Older backends have no streaming endpoint; retry once without streaming.
+        if (controller.signal.aborted || receivedText) {
+          throw streamError;
+        }
+        response = await generatePlannerInsight(payload);
+      }
+      setFallbackReason(response.fallback ? response.fallback_reason ?? "upstream_error" : undefined);
       setInsight(response.insight.trim());
     } catch (err) {
+      if (controller.signal.aborted) {
+        return;
+      }
       setError(err instanceof Error ? err.message : "Unknown error calling insights API.");
       setInsight(undefined);
+      setFallbackReason(undefined);
     } finally {
-      setIsLoading(false);
+      if (controllerRef.current === controller) {
+        controllerRef.current = null;
+        setPartialInsight(undefined);
+        setIsLoading(false);
+      }
     }
   }, []);
 
   const reset = useCallback(() => {
     setInsight(undefined);
+    setFallbackReason(undefined);
+    setPartialInsight(undefined);
     setError(undefined);
     setIsLoading(false);
   }, []);
 
   return {
     insight,
+    fallbackReason,
+    partialInsight,
     isLoading,
     error,
     generateInsight,
@@ -7,10 +7,16 @@ export interface PlannerInsightPayload {
   metadata: WeatherQueryResponse["metadata"];
   summaries?: WeatherSummary[];
   userPrompt?: string;
+  latencyBudgetMs?: number;
 }
 
+export type InsightFallbackReason = "latency_budget" | "circuit_open" | "upstream_error";
+
 export interface PlannerInsightResponse {
   insight: string;
+  /** True when the backend answered with a template insight instead of Groq's. */
+  fallback?: boolean;
+  fallback_reason?: InsightFallbackReason;
 }
 
 export const generatePlannerInsight = async (
@@ -35,3 +41,76 @@ export const generatePlannerInsight = async (
 
   return data;
 };
+
+const parseSseEvent = (rawEvent: string): { name: string; data: string } => {
+  let name = "message";
+  const dataLines: string[] = [];
+  for (const line of rawEvent.split("\n")) {
+    if (line.startsWith("event:")) {
+      name = line.slice(6).trim();
+    } else if (line.startsWith("data:")) {
+      dataLines.push(line.slice(5).trimStart());
+    }
+  }
+  return { name, data: dataLines.join("\n") };
+};
+
+/**
+ * Streams the insight from `/insights/stream`, calling `onDelta` with the text received so far.
+ * Aborting `signal` closes the connection, which also stops the upstream generation. The `done`
+ * event's fallback flags are returned with the text.
+ */
+export const streamPlannerInsight = async (
+  payload: PlannerInsightPayload,
+  onDelta: (textSoFar: string) => void,
+  signal?: AbortSignal
+): Promise<PlannerInsightResponse> => {
+  const response = await fetch(`${API_BASE_URL}/insights/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(payload),
+    signal
+  });
+
+  if (!response.ok || !response.body) {
+    const message = await response.text();
+    throw new Error(`Insight generation failed (${response.status}): ${message}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let insight = "";
+  let fallback: Pick<PlannerInsightResponse, "fallback" | "fallback_reason"> = {};
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const event = parseSseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      if (event.name === "delta") {
+        insight += (JSON.parse(event.data) as { text: string }).text;
+        onDelta(insight);
+      } else if (event.name === "done") {
+        fallback = JSON.parse(event.data) as typeof fallback;
+      } else if (event.name === "error") {
+        const detail = (JSON.parse(event.data) as { detail?: string }).detail;
+        throw new Error(`Insight generation failed: ${detail ?? "unknown error"}`);
+      }
+    }
+  }
+
+  if (!insight) {
+    throw new Error("Insight generation returned no content.");
+  }
+
+  return { insight, ...fallback };
+};
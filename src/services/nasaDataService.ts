@@ -19,6 +19,12 @@ const buildQueryPayload = (
   };
 };
 
+export const buildHeatmapTileUrl = (condition: WeatherConditionKey, dateOfYear: string): string => {
+  const parts = dateOfYear.split("-");
+  const formattedDate = parts.length === 3 ? `${parts[1]}-${parts[2]}` : dateOfYear;
+  return `${API_BASE_URL}/tiles/${condition}/{z}/{x}/{y}.png?date_of_year=${encodeURIComponent(formattedDate)}`;
+};
+
 export const queryWeatherRisk = async (
   lat: number,
   lon: number,
@@ -27,11 +33,14 @@ export const queryWeatherRisk = async (
   locationName?: string
 ): Promise<WeatherQueryResponse> => {
   const payload = buildQueryPayload(lat, lon, dateOfYear, conditions, locationName);
-  const response = await fetch(`${API_BASE_URL}/query`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify(payload)
+  // GET (rather than POST) lets the browser, the service worker and any CDN reuse answers via ETags.
+  const params = new URLSearchParams({
+    lat: String(payload.location.lat),
+    lon: String(payload.location.lon),
+    date_of_year: payload.date_of_year,
+    conditions: payload.conditions.join(",")
   });
+  const response = await fetch(`${API_BASE_URL}/query?${params.toString()}`);
 
   if (!response.ok) {
     const errorBody = await response.text();
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def synthetic_dataset(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """A small MERRA-2-like NetCDF file (see backend.tools.synthetic_dataset)."""
+    from backend.tools.synthetic_dataset import generate_dataset
+
+    output = tmp_path_factory.mktemp("dataset") / "synthetic.nc"
+    return str(generate_dataset(str(output), lat_points=4, lon_points=5, start_year=2000, end_year=2004))
+
+
+@pytest.fixture
+def dataset_env(monkeypatch: pytest.MonkeyPatch, synthetic_dataset: str, tmp_path: Path) -> str:
+    """Point the API at the synthetic dataset, with no climatology cube and no Groq key."""
+    monkeypatch.setenv("WEATHERWISE_DATASET", synthetic_dataset)
+    monkeypatch.setenv("WEATHERWISE_FORCE_MOCK", "0")
+    monkeypatch.setenv("WEATHERWISE_CLIMATOLOGY", str(tmp_path / "none.climatology"))
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    return synthetic_dataset
+
+
+@pytest.fixture
+def api_client(dataset_env: str, monkeypatch: pytest.MonkeyPatch):
+    """A TestClient for the API over the synthetic dataset, with a fresh executor and result cache.
+
+    The app's lifespan (and so the warm-up) does not run; requests open the dataset on demand.
+    """
+    from fastapi.testclient import TestClient
+
+    from backend import executor, main, result_cache
+
+    monkeypatch.setattr(result_cache, "_CACHE", None)
+    executor.shutdown_executor()
+    yield TestClient(main.app)
+    executor.shutdown_executor()
+
+
+@pytest.fixture
+def fake_groq(monkeypatch: pytest.MonkeyPatch):
+    """
+    Start ``backend.tools.fake_groq`` with the given settings and point a fresh Groq client at it.
+
+    The process-wide client, breaker, insight cache and rate limiter are reset so every
+    test starts cold; client-side rate limiting is off unless the test sets it.
+    """
+    from backend import groq_insights, rate_limit
+    from backend.tools.fake_groq import FakeGroqServer, FakeGroqSettings
+
+    servers = []
+    for name in ("_ASYNC_CLIENT", "_CIRCUIT_BREAKER", "_INSIGHT_CACHE"):
+        monkeypatch.setattr(groq_insights, name, None)
+    monkeypatch.setattr(rate_limit, "_RATE_LIMITER", None)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("GROQ_RATE_LIMIT_RPM", "0")
+    monkeypatch.setenv("GROQ_RATE_LIMIT_TPM", "0")
+    monkeypatch.delenv("GROQ_CACHE_PATH", raising=False)
+
+    def start(**settings):
+        server = FakeGroqServer(FakeGroqSettings(**settings)).start()
+        servers.append(server)
+        monkeypatch.setenv("GROQ_BASE_URL", server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def insight_payload(name: str = "Test farm") -> dict:
+    """The smallest /insights payload build_farmer_prompt accepts."""
+    return {
+        "query": {"location": {"lat": 40.0, "lon": -100.0, "name": name}, "date_of_year": "07-15", "conditions": ["very_hot"]},
+        "results": {},
+        "metadata": {}
+    }
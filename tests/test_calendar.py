@@ -0,0 +1,46 @@
+"""POST /query/calendar status codes: bad requests are 400, an unavailable dataset or busy server 503."""
+
+from __future__ import annotations
+
+import threading
+
+CALENDAR = {"location": {"lat": 40.0, "lon": -100.0}, "conditions": ["very_hot", "very_wet"], "top_n": 2}
+
+
+def test_calendar_answers_every_day(api_client):
+    response = api_client.post("/query/calendar", json=CALENDAR)
+    assert response.status_code == 200
+    assert len(response.json()["days"]) == 365
+
+
+def test_value_error_is_a_bad_request(api_client, monkeypatch):
+    from backend import main
+
+    def reject(*_):
+        raise ValueError("Dataset must include 'lat' and 'lon' coordinates to select a grid point.")
+
+    monkeypatch.setattr(main, "_run_risk_calendar", reject)
+    response = api_client.post("/query/calendar", json=CALENDAR)
+    assert response.status_code == 400
+    assert "grid point" in response.json()["detail"]
+
+
+def test_missing_dataset_is_unavailable(api_client, monkeypatch, tmp_path):
+    monkeypatch.setenv("WEATHERWISE_DATASET", str(tmp_path / "missing.nc"))
+    assert api_client.post("/query/calendar", json=CALENDAR).status_code == 503
+
+
+def test_saturated_executor_keeps_503_with_retry_after(api_client, monkeypatch):
+    from backend.executor import get_executor
+
+    monkeypatch.setenv("WEATHERWISE_EXECUTOR_WORKERS", "1")
+    monkeypatch.setenv("WEATHERWISE_EXECUTOR_QUEUE", "0")
+    release = threading.Event()
+    blocker = get_executor().submit(release.wait, 10)
+    try:
+        response = api_client.post("/query/calendar", json=CALENDAR)
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
@@ -0,0 +1,36 @@
+"""convert-store output opens through open_store and matches the source values."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+def _assert_same_series(store, source) -> None:
+    for name in ("T2M_MAX", "PRECTOT"):
+        expected = source[name].isel(lat=1, lon=2).values
+        np.testing.assert_allclose(store[name].isel(lat=1, lon=2).values, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("suffix", [".nc", ".zarr"])
+def test_converted_store_round_trips(synthetic_dataset, tmp_path, suffix):
+    import xarray as xr
+
+    from backend.chunked_store import convert_to_chunked_store, is_zarr_store, open_store
+    from backend.dataset_pool import _file_signature
+
+    if suffix == ".zarr":
+        pytest.importorskip("zarr")
+    output = convert_to_chunked_store(synthetic_dataset, str(tmp_path / f"points{suffix}"))
+    if suffix == ".zarr":
+        # Detected by its metadata (zarr 2 or 3 layout) even without the suffix.
+        output = output.rename(tmp_path / "points-store")
+        assert is_zarr_store(str(output))
+    assert _file_signature(str(output)) is not None
+
+    with xr.open_dataset(synthetic_dataset) as source:
+        store = open_store(str(output))
+        try:
+            _assert_same_series(store, source)
+        finally:
+            store.close()
@@ -0,0 +1,64 @@
+"""The climatology cube is only a shortcut: cube-backed answers equal those read from the raw data."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+CONDITIONS = ["very_hot", "very_cold", "very_windy", "very_wet", "very_uncomfortable"]
+# Windows wrapping the year boundary and those either side of the leap day.
+DAYS = [f"01-{day:02d}" for day in range(1, 8)] + [f"12-{day:02d}" for day in range(25, 32)] + ["02-28", "03-01", "07-15"]
+
+
+@pytest.fixture
+def climatology(dataset_env, monkeypatch, tmp_path):
+    from backend.data_fetcher import build_climatology_cube
+
+    path = tmp_path / "synthetic.climatology"
+    monkeypatch.setenv("WEATHERWISE_CLIMATOLOGY", str(path))
+    build_climatology_cube(dataset_env, str(path), window_days=3)
+    return path
+
+
+def _cells(dataset_uri):
+    import xarray as xr
+
+    with xr.open_dataset(dataset_uri) as dataset:
+        lats = dataset["lat"].values
+        lons = dataset["lon"].values
+    return [(float(lats[0]), float(lons[0])), (float(lats[1]), float(lons[3])), (float(lats[-1]), float(lons[-1]))]
+
+
+def _answer(monkeypatch, use_cube: bool, lat: float, lon: float, date_of_year: str):
+    from backend.data_fetcher import get_fetcher
+
+    monkeypatch.setenv("WEATHERWISE_USE_CLIMATOLOGY", "1" if use_cube else "0")
+    fetcher = get_fetcher()
+    answer = fetcher.query(lat, lon, date_of_year, CONDITIONS)
+    assert (fetcher._climatology() is not None) == use_cube
+    return answer
+
+
+def test_cube_answers_equal_raw_answers(climatology, dataset_env, monkeypatch):
+    probabilities = set()
+    for (lat, lon), date_of_year in itertools.product(_cells(dataset_env), DAYS):
+        raw = _answer(monkeypatch, False, lat, lon, date_of_year)
+        cubed = _answer(monkeypatch, True, lat, lon, date_of_year)
+        where = (lat, lon, date_of_year)
+        assert cubed["results"] == raw["results"], where
+        assert cubed["metadata"]["samples"] == raw["metadata"]["samples"], where
+        assert cubed["metadata"]["grid_point"] == raw["metadata"]["grid_point"], where
+        probabilities.update(result["probability_percent"] for result in raw["results"].values())
+    # The comparison means something only if some answers are neither 0% nor 100%.
+    assert any(0 < probability < 100 for probability in probabilities)
+
+
+def test_leap_day_is_rejected_either_way(climatology, dataset_env, monkeypatch):
+    from backend.data_fetcher import get_fetcher
+
+    lat, lon = _cells(dataset_env)[0]
+    for use_cube in ("0", "1"):
+        monkeypatch.setenv("WEATHERWISE_USE_CLIMATOLOGY", use_cube)
+        with pytest.raises(ValueError):
+            get_fetcher().query(lat, lon, "02-29", CONDITIONS)
@@ -0,0 +1,105 @@
+"""Cold start: ``backend.main`` imports light, and ``/ready`` only turns 200 once warm-up succeeds."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("numpy", "pandas", "xarray", "groq", "netCDF4")
+# Generous ceilings: they catch a heavy import or a cold dataset open slipping back in, not jitter.
+IMPORT_BUDGET_MS = 3000
+WARM_QUERY_BUDGET_SECONDS = 2.0
+
+_IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"import_ms": elapsed * 1000, "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def _wait_ready(client, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        steps = response.json()["steps"]
+        if all(step["status"] not in {"pending", "running"} for step in steps.values()) or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+
+def test_import_does_not_load_heavy_modules():
+    # A fresh interpreter: this test process has long imported numpy and friends.
+    completed = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert probe["loaded"] == []
+    assert probe["import_ms"] < IMPORT_BUDGET_MS
+
+
+@pytest.fixture
+def client_factory(monkeypatch: pytest.MonkeyPatch):
+    from fastapi.testclient import TestClient
+
+    from backend import main
+    from backend.warmup import Warmup
+
+    def make():
+        # Each app start gets a fresh warm-up rather than the module-wide one.
+        monkeypatch.setattr(main, "WARMUP", Warmup())
+        return TestClient(main.app)
+
+    return make
+
+
+def test_ready_moves_from_503_to_200(dataset_env, client_factory, monkeypatch):
+    from backend import warmup
+
+    release = threading.Event()
+    original = warmup._import_modules
+
+    def held_imports() -> None:
+        release.wait(10)
+        original()
+
+    monkeypatch.setattr(warmup, "_import_modules", held_imports)
+    with client_factory() as client:
+        pending = client.get("/ready")
+        assert pending.status_code == 503
+        assert pending.json()["ready"] is False
+
+        release.set()
+        ready = _wait_ready(client)
+        assert ready.status_code == 200, ready.json()
+        steps = ready.json()["steps"]
+        assert steps["dataset"]["status"] == "done"
+        assert steps["sample_query"]["status"] == "done"
+        # Without GROQ_API_KEY the optional insights step is skipped, not fatal.
+        assert steps["insights"]["status"] == "skipped"
+
+        sent = time.perf_counter()
+        response = client.post(
+            "/query", json={"location": {"lat": 40.0, "lon": -100.0}, "date_of_year": "07-15", "conditions": ["very_hot"]}
+        )
+        assert response.status_code == 200
+        # The warm-up already opened the dataset and built its indexes.
+        assert time.perf_counter() - sent < WARM_QUERY_BUDGET_SECONDS
+
+
+def test_ready_stays_503_when_dataset_fails(dataset_env, client_factory, monkeypatch, tmp_path):
+    monkeypatch.setenv("WEATHERWISE_DATASET", str(tmp_path / "missing.nc"))
+    with client_factory() as client:
+        response = _wait_ready(client)
+        assert response.status_code == 503
+        steps = response.json()["steps"]
+        assert steps["dataset"]["status"] == "failed"
+        assert "missing.nc" in steps["dataset"]["error"]
@@ -0,0 +1,66 @@
+"""Dataset pool handles are retired, not closed, while readers may still hold them."""
+
+from __future__ import annotations
+
+import time
+
+from backend.dataset_pool import DatasetPool
+
+
+class _Handle:
+    def __init__(self, uri: str) -> None:
+        self.uri = uri
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _pool(grace: float) -> DatasetPool:
+    return DatasetPool(max_size=2, opener=_Handle, retire_grace=grace)
+
+
+def test_invalidate_retires_instead_of_closing():
+    pool = _pool(grace=60)
+    handle = pool.acquire("https://example.com/a.nc").dataset
+    pool.invalidate("https://example.com/a.nc")
+
+    assert not handle.closed
+    assert pool.stats()["retired"] == 1
+    # The next acquire opens a fresh handle; the old one is still readable.
+    assert pool.acquire("https://example.com/a.nc").dataset is not handle
+    assert not handle.closed
+
+
+def test_invalidate_all_retires_every_handle():
+    pool = _pool(grace=60)
+    handles = [pool.acquire(f"https://example.com/{name}.nc").dataset for name in "ab"]
+    pool.invalidate()
+
+    stats = pool.stats()
+    assert (stats["size"], stats["retired"]) == (0, 2)
+    assert not any(handle.closed for handle in handles)
+
+
+def test_stats_sweeps_expired_handles():
+    pool = _pool(grace=0.05)
+    handle = pool.acquire("https://example.com/a.nc").dataset
+    pool.invalidate("https://example.com/a.nc")
+    time.sleep(0.1)
+
+    # No acquire in between: /stats alone closes the handle once its grace period is over.
+    assert pool.stats()["retired"] == 0
+    assert handle.closed
+
+
+def test_evicted_handles_are_closed_after_the_grace_period():
+    pool = _pool(grace=0.05)
+    first = pool.acquire("https://example.com/a.nc").dataset
+    for name in "bc":
+        pool.acquire(f"https://example.com/{name}.nc")
+    assert pool.stats()["evictions"] == 1
+    assert not first.closed
+
+    time.sleep(0.1)
+    assert pool.sweep() == 1
+    assert first.closed
@@ -0,0 +1,33 @@
+"""Response encodings give the same answer whichever optional modules are installed."""
+
+from __future__ import annotations
+
+import json
+import math
+
+import pytest
+
+from backend import encoding
+
+PAYLOAD = {
+    "results": {"very_hot": {"probability": math.nan, "history": [1.5, math.inf, -math.inf, 2.0]}},
+    "metadata": {"grid": (40.0, -100.0), "name": "Test farm"}
+}
+EXPECTED = {
+    "results": {"very_hot": {"probability": None, "history": [1.5, None, None, 2.0]}},
+    "metadata": {"grid": [40.0, -100.0], "name": "Test farm"}
+}
+
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+def test_non_finite_floats_become_null(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(encoding, "orjson", None)
+    assert json.loads(encoding.encode_json(PAYLOAD)) == EXPECTED
+
+
+def test_finite_payloads_are_not_rewritten(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert encoding.encode_json({"a": [1, 2.5], "b": "é"}) == '{"a":[1,2.5],"b":"é"}'.encode("utf-8")
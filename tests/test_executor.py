@@ -0,0 +1,49 @@
+"""Compute backpressure: a full executor answers 503 with Retry-After, a slow computation 504."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+QUERY = {"location": {"lat": 40.0, "lon": -100.0}, "date_of_year": "07-15", "conditions": ["very_hot"]}
+
+
+@pytest.fixture
+def single_worker(api_client, monkeypatch):
+    """One worker, no queue; yields an Event that releases anything blocked on it."""
+    monkeypatch.setenv("WEATHERWISE_EXECUTOR_WORKERS", "1")
+    monkeypatch.setenv("WEATHERWISE_EXECUTOR_QUEUE", "0")
+    monkeypatch.setenv("WEATHERWISE_RETRY_AFTER", "7")
+    release = threading.Event()
+    yield release
+    release.set()
+
+
+def test_saturated_executor_answers_503_with_retry_after(api_client, single_worker):
+    from backend.executor import get_executor
+
+    executor = get_executor()
+    blocker = executor.submit(single_worker.wait, 10)
+
+    response = api_client.post("/query", json=QUERY)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert executor.stats()["rejected"] == 1
+
+    single_worker.set()
+    blocker.result(timeout=5)
+    assert api_client.post("/query", json=QUERY).status_code == 200
+
+
+def test_deadline_answers_504(api_client, single_worker, monkeypatch):
+    from backend import main
+    from backend.executor import get_executor
+
+    monkeypatch.setenv("WEATHERWISE_QUERY_DEADLINE", "0.2")
+    monkeypatch.setattr(main, "_run_query", lambda *args: single_worker.wait(10))
+
+    response = api_client.post("/query", json=QUERY)
+    assert response.status_code == 504
+    assert "0.2 seconds" in response.json()["detail"]
+    assert get_executor().stats()["timed_out"] == 1
@@ -0,0 +1,60 @@
+"""The async Groq client: one pooled, keep-alive connection set shared by every insight call."""
+
+from __future__ import annotations
+
+import asyncio
+
+from conftest import insight_payload
+
+
+def test_sequential_calls_reuse_one_connection(fake_groq):
+    from backend.groq_insights import acall_groq_api, close_async_client, open_async_client
+
+    fake = fake_groq()
+
+    async def run():
+        client = open_async_client()
+        try:
+            for number in range(5):
+                await acall_groq_api(insight_payload(), user_prompt=f"question {number}")
+            assert open_async_client() is client
+        finally:
+            await close_async_client()
+
+    asyncio.run(run())
+    assert fake.stats.requests == 5
+    assert len(fake.stats.connections) == 1
+
+
+def test_concurrent_calls_stay_within_the_pool(fake_groq, monkeypatch):
+    from backend.groq_insights import acall_groq_api, close_async_client
+
+    monkeypatch.setenv("GROQ_MAX_CONNECTIONS", "2")
+    fake = fake_groq(latency=0.05)
+
+    async def run():
+        try:
+            await asyncio.gather(*(acall_groq_api(insight_payload(), user_prompt=f"question {number}") for number in range(8)))
+        finally:
+            await close_async_client()
+
+    asyncio.run(run())
+    assert fake.stats.requests == 8
+    assert len(fake.stats.connections) <= 2
+
+
+def test_identical_concurrent_prompts_share_one_call(fake_groq):
+    from backend.groq_insights import acall_groq_api, close_async_client, get_insight_cache
+
+    fake = fake_groq(latency=0.1)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(acall_groq_api(insight_payload(), user_prompt="same") for _ in range(4)))
+        finally:
+            await close_async_client()
+
+    answers = asyncio.run(run())
+    assert len(set(answers)) == 1
+    assert fake.stats.requests == 1
+    assert get_insight_cache().stats()["coalesced"] == 3
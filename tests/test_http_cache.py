@@ -0,0 +1,67 @@
+"""GET /query validators: a matching If-None-Match is answered 304, and tags follow the data."""
+
+from __future__ import annotations
+
+import os
+import shutil
+
+import pytest
+
+PARAMS = {"lat": 40.0, "lon": -100.0, "date_of_year": "07-15", "conditions": "very_hot,very_wet"}
+
+
+@pytest.fixture
+def dataset_copy(api_client, dataset_env, monkeypatch, tmp_path):
+    """The synthetic dataset copied somewhere the test may touch it."""
+    path = tmp_path / "copy.nc"
+    shutil.copyfile(dataset_env, path)
+    monkeypatch.setenv("WEATHERWISE_DATASET", str(path))
+    return path
+
+
+def test_matching_if_none_match_gets_304(api_client):
+    first = api_client.get("/query", params=PARAMS)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    again = api_client.get("/query", params=PARAMS, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert again.headers["cache-control"] == first.headers["cache-control"]
+
+    stale = api_client.get("/query", params=PARAMS, headers={"If-None-Match": 'W/"something-else"'})
+    assert stale.status_code == 200
+    assert stale.json()["results"] == first.json()["results"]
+
+
+def test_dataset_change_changes_the_etag(api_client, dataset_copy):
+    first = api_client.get("/query", params=PARAMS).headers["etag"]
+    stat = os.stat(dataset_copy)
+    os.utime(dataset_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    second = api_client.get("/query", params=PARAMS, headers={"If-None-Match": first})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first
+
+
+@pytest.mark.parametrize("change", [
+    {"date_of_year": "07-16"},
+    {"conditions": "very_hot"},
+    {"thresholds": "very_hot:30"},
+    {"exceedance_curve": "true"}
+])
+def test_different_parameters_get_different_etags(api_client, change):
+    first = api_client.get("/query", params=PARAMS).headers["etag"]
+    other = api_client.get("/query", params={**PARAMS, **change}, headers={"If-None-Match": first})
+    assert other.status_code == 200
+    assert other.headers["etag"] != first
+
+
+def test_media_type_is_part_of_the_etag(api_client):
+    pytest.importorskip("msgpack")
+    json_tag = api_client.get("/query", params=PARAMS).headers["etag"]
+    packed = api_client.get("/query", params=PARAMS, headers={"Accept": "application/msgpack", "If-None-Match": json_tag})
+    assert packed.status_code == 200
+    assert packed.headers["etag"] != json_tag
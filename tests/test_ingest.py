@@ -0,0 +1,79 @@
+"""Incremental ingest: appending days must leave the same cube a full rebuild would."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+WINDOW_DAYS = 3
+
+
+@pytest.fixture
+def truncated_manifest(dataset_env, monkeypatch, tmp_path):
+    """A manifest over the synthetic dataset minus its last days, with a cube built for it."""
+    import xarray as xr
+
+    from backend.data_fetcher import build_climatology_cube
+
+    def make(days_removed: int):
+        base = tmp_path / "base.nc"
+        with xr.open_dataset(dataset_env) as full:
+            full.isel(time=slice(0, full.sizes["time"] - days_removed)).to_netcdf(base)
+        manifest = tmp_path / "dataset.json"
+        manifest.write_text(json.dumps({"shards": [base.name]}), encoding="utf-8")
+
+        cube = tmp_path / "dataset.climatology"
+        monkeypatch.setenv("WEATHERWISE_DATASET", str(manifest))
+        monkeypatch.setenv("WEATHERWISE_CLIMATOLOGY", str(cube))
+        monkeypatch.setenv("WEATHERWISE_WINDOW_DAYS", str(WINDOW_DAYS))
+        # The manifest is stat'ed on every request anyway; skip the shard re-listing delay too.
+        monkeypatch.setenv("WEATHERWISE_SHARD_RECHECK", "0")
+        build_climatology_cube(str(manifest), str(cube), window_days=WINDOW_DAYS)
+        return str(manifest)
+
+    return make
+
+
+# 40 days stay within the last year; 400 cross a year boundary and move the early/late split.
+@pytest.mark.parametrize("days", [40, 400])
+def test_ingest_matches_full_rebuild(truncated_manifest, dataset_env, tmp_path, days):
+    from pathlib import Path
+
+    from backend.data_fetcher import ClimatologyCube, build_climatology_cube
+    from backend.ingest import ingest_records
+
+    manifest = truncated_manifest(days)
+    report = ingest_records(manifest, [dataset_env], window_days=WINDOW_DAYS)
+    assert report.days_added == days
+    assert report.climatology_mode == "incremental"
+
+    ingested = ClimatologyCube.load(Path(report.climatology))
+    rebuilt = ClimatologyCube.load(
+        build_climatology_cube(dataset_env, str(tmp_path / "rebuilt.climatology"), window_days=WINDOW_DAYS)
+    )
+    assert ingested.split is not None and rebuilt.split is not None
+    assert ingested.meta["conditions"] == rebuilt.meta["conditions"]
+    for name in ("hits", "valid", "samples", "split"):
+        np.testing.assert_array_equal(getattr(ingested, name), getattr(rebuilt, name), err_msg=name)
+    for name in ("early_sum", "late_sum"):
+        # Sums accumulate in a different order, so allow float rounding.
+        np.testing.assert_allclose(getattr(ingested, name), getattr(rebuilt, name), rtol=1e-9, err_msg=name)
+
+
+def test_pool_serves_the_new_generation(truncated_manifest, dataset_env):
+    from backend.data_fetcher import get_fetcher
+    from backend.ingest import ingest_records
+
+    manifest = truncated_manifest(40)
+    before = get_fetcher()
+    before.query(40.0, -100.0, "12-20", ["very_hot"])
+    old_version = before._pooled.version
+
+    report = ingest_records(manifest, [dataset_env], window_days=WINDOW_DAYS)
+    after = get_fetcher()
+    answer = after.query(40.0, -100.0, "12-20", ["very_hot"])
+    assert after._pooled.version == report.version != old_version
+    assert str(after._climatology().path) == report.climatology
+    assert answer["metadata"]["time_range"].endswith("2004-12-31")
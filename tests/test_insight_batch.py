@@ -0,0 +1,110 @@
+"""/insights/batch scheduling against a rate-limited local Groq stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+
+from conftest import insight_payload
+
+
+def _items(unique: int, duplicates: int):
+    items = [(insight_payload(), f"question {number}") for number in range(unique)]
+    return items + items[:duplicates]
+
+
+def _run_batch(items, **options):
+    from backend.groq_insights import agenerate_insight_batch, close_async_client
+
+    async def run():
+        try:
+            return await agenerate_insight_batch(items, **options)
+        finally:
+            await close_async_client()
+
+    return asyncio.run(run())
+
+
+def test_429s_pause_and_retry_until_every_item_succeeds(fake_groq):
+    from backend.rate_limit import get_rate_limiter
+
+    # Two requests per second upstream, no client-side pacing: the first wave overshoots.
+    fake = fake_groq(rate_limit=2, rate_window=1.0)
+    result = _run_batch(_items(5, 2))
+    summary = result["summary"]
+
+    assert [item["index"] for item in result["items"]] == list(range(7))
+    assert all("insight" in item and "error" not in item for item in result["items"])
+    assert summary["unique_prompts"] == 5
+    assert summary["deduplicated"] == 2
+    assert summary["failed"] == 0
+    assert summary["rate_limited"] == fake.stats.rate_limited >= 1
+    assert summary["retries"] == summary["rate_limited"]
+    assert summary["upstream_calls"] == fake.stats.requests == 5 + summary["retries"]
+    # A 429 pauses the shared limiter for Retry-After (whole seconds) instead of hammering the API.
+    assert get_rate_limiter().stats()["pauses"] >= 1
+    assert summary["seconds"] >= 1.0
+
+
+def test_client_side_buckets_keep_the_batch_under_the_limit(fake_groq, monkeypatch):
+    from backend.rate_limit import get_rate_limiter
+
+    # 120 RPM with a one-second burst: two calls at once, then one every half second.
+    monkeypatch.setenv("GROQ_RATE_LIMIT_RPM", "120")
+    monkeypatch.setenv("GROQ_RATE_LIMIT_BURST", "1")
+    fake = fake_groq(rate_limit=4, rate_window=1.0)
+    summary = _run_batch(_items(5, 0))["summary"]
+
+    assert summary["failed"] == 0
+    assert summary["rate_limited"] == fake.stats.rate_limited == 0
+    assert summary["upstream_calls"] == 5
+    stats = get_rate_limiter().stats()
+    assert stats["acquired"] == 5
+    assert stats["waited_seconds"] > 0.5
+
+
+def test_exhausted_retries_fail_or_fall_back(fake_groq, monkeypatch):
+    monkeypatch.setenv("GROQ_BATCH_RETRIES", "0")
+    fake_groq(rate_limit=1, rate_window=60.0)
+    result = _run_batch(_items(3, 0), fallback=True)
+
+    assert result["summary"]["failed"] == 2
+    fallbacks = [item for item in result["items"] if "error" in item]
+    assert len(fallbacks) == 2
+    assert all(item["fallback"] and item["fallback_reason"] == "upstream_error" for item in fallbacks)
+
+
+def test_cached_insights_are_not_generated_again(fake_groq):
+    fake = fake_groq()
+    items = _items(3, 0)
+    _run_batch(items)
+    summary = _run_batch(items)["summary"]
+
+    assert summary["cached"] == 3
+    assert summary["upstream_calls"] == 0
+    assert fake.stats.requests == 3
+
+
+def test_items_joining_an_inflight_call_are_coalesced_not_cached(fake_groq):
+    from backend.groq_insights import acall_groq_api, agenerate_insight_batch, close_async_client, get_insight_cache
+
+    fake = fake_groq(latency=0.3)
+    payload, question = insight_payload(), "question 0"
+
+    async def run():
+        try:
+            interactive = asyncio.ensure_future(acall_groq_api(payload, user_prompt=question))
+            await asyncio.sleep(0.1)
+            batch = await agenerate_insight_batch([(payload, question)])
+            await interactive
+            return batch
+        finally:
+            await close_async_client()
+
+    result = asyncio.run(run())
+    assert result["summary"]["coalesced"] == 1
+    assert result["summary"]["cached"] == 0
+    assert result["summary"]["upstream_calls"] == 0
+    assert result["items"][0]["coalesced"] is True and result["items"][0]["cached"] is False
+    assert fake.stats.requests == 1
+    # Saved time is the upstream call's duration, not the ~0.2 s the batch spent waiting.
+    assert get_insight_cache().stats()["saved_upstream_seconds"] >= 0.3
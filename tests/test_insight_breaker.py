@@ -0,0 +1,91 @@
+"""The circuit breaker only hears about upstream calls: cached insights never move it."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from conftest import insight_payload
+
+
+@pytest.fixture
+def breaker(fake_groq, monkeypatch):
+    from backend import groq_insights
+
+    now = [0.0]
+    breaker = groq_insights.CircuitBreaker(failure_threshold=3, reset_after=10.0, clock=lambda: now[0])
+    breaker.now = now
+    monkeypatch.setattr(groq_insights, "_CIRCUIT_BREAKER", breaker)
+    monkeypatch.setenv("GROQ_LATENCY_BUDGET", "0")
+    fake_groq()
+    return breaker
+
+
+async def _cached_then(action):
+    from backend.groq_insights import agenerate_insight, close_async_client
+
+    try:
+        await agenerate_insight(insight_payload(), user_prompt="cached")
+        action()
+        return await agenerate_insight(insight_payload(), user_prompt="cached")
+    finally:
+        await close_async_client()
+
+
+async def _stream_cached_then(action):
+    from backend.groq_insights import agenerate_insight, astream_insight, close_async_client
+
+    try:
+        await agenerate_insight(insight_payload(), user_prompt="cached")
+        action()
+        return [part async for part in astream_insight(insight_payload(), user_prompt="cached")]
+    finally:
+        await close_async_client()
+
+
+def _half_open(breaker):
+    def action():
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        breaker.now[0] += breaker.reset_after
+        assert breaker.allow()
+    return action
+
+
+@pytest.mark.parametrize("run", [_cached_then, _stream_cached_then])
+def test_cache_hit_leaves_half_open_breaker_alone(breaker, run):
+    result = asyncio.run(run(_half_open(breaker)))
+    assert result
+    assert breaker.state == "half_open"
+
+
+@pytest.mark.parametrize("run", [_cached_then, _stream_cached_then])
+def test_cache_hit_does_not_reset_failure_count(breaker, run):
+    asyncio.run(run(breaker.record_failure))
+    assert breaker.stats()["consecutive_failures"] == 1
+
+
+def test_cache_hit_is_served_while_open(breaker):
+    def open_breaker():
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    result = asyncio.run(_cached_then(open_breaker))
+    assert result.fallback_reason is None
+    assert breaker.state == "open"
+    assert breaker.stats()["rejected"] == 0
+
+
+def test_computed_answer_closes_the_breaker(breaker):
+    from backend.groq_insights import agenerate_insight, close_async_client
+
+    async def run():
+        try:
+            return await agenerate_insight(insight_payload(), user_prompt="fresh")
+        finally:
+            await close_async_client()
+
+    breaker.record_failure()
+    asyncio.run(run())
+    assert breaker.stats()["consecutive_failures"] == 0
@@ -0,0 +1,31 @@
+"""Streamed insights: upstream failures mid-stream surface as GroqClientError."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from conftest import insight_payload
+
+
+def test_dropped_connection_mid_stream_raises_client_error(fake_groq):
+    from backend.groq_insights import GroqClientError, astream_groq_api, close_async_client, get_insight_cache
+
+    fake = fake_groq(drop_after=3)
+    received = []
+
+    async def run():
+        try:
+            async for delta in astream_groq_api(insight_payload(), user_prompt="dropped"):
+                received.append(delta)
+        finally:
+            await close_async_client()
+
+    with pytest.raises(GroqClientError):
+        asyncio.run(run())
+    assert len(received) == 3
+    assert fake.stats.streams_aborted == 1
+    # A cut-off generation is never cached.
+    assert get_insight_cache().stats()["size"] == 0
+
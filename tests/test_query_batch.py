@@ -0,0 +1,44 @@
+"""POST /query/batch: every item is answered or fails on its own."""
+
+from __future__ import annotations
+
+
+def _item(lat: float = 40.0, date_of_year: str = "07-15", **overrides) -> dict:
+    item = {"location": {"lat": lat, "lon": -100.0}, "date_of_year": date_of_year, "conditions": ["very_hot"]}
+    item.update(overrides)
+    return item
+
+
+def test_invalid_item_fails_alone(api_client):
+    response = api_client.post("/query/batch", json={"items": [
+        _item(),
+        _item(lat=95.0),
+        _item(date_of_year="July 15"),
+        {"location": {"lat": 40.0}},
+        _item(conditions=[]),
+        _item(date_of_year="01-02")
+    ]})
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["index"] for item in items] == list(range(6))
+    assert "response" in items[0] and "response" in items[5]
+    assert items[1]["error"].startswith("location.lat:")
+    assert "date_of_year must be formatted as MM-DD" in items[2]["error"]
+    assert "date_of_year: Field required" in items[3]["error"]
+    assert "location.lon: Field required" in items[3]["error"]
+    assert items[4]["error"] == "Select at least one weather condition."
+    assert all("response" not in item for item in items[1:5])
+
+
+def test_batch_answers_match_single_queries(api_client):
+    queries = [_item(), _item(lat=41.0, date_of_year="01-01")]
+    batch = api_client.post("/query/batch", json={"items": queries}).json()["items"]
+    for query, item in zip(queries, batch):
+        single = api_client.post("/query", json=query).json()
+        assert item["response"]["results"] == single["results"]
+
+
+def test_batch_envelope_is_still_validated(api_client):
+    assert api_client.post("/query/batch", json={"items": []}).status_code == 422
+    assert api_client.post("/query/batch", json={"items": ["not an object"]}).status_code == 422
@@ -0,0 +1,62 @@
+"""Token buckets and the shared limiter, driven by a fake clock."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from backend.rate_limit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_refills_up_to_its_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=5, clock=clock)
+    assert bucket.capacity == 5
+    bucket.take(5)
+    assert bucket.wait_time(2) == pytest.approx(2.0)
+    clock.now = 100.0
+    assert bucket.level() == 5
+
+
+def test_settle_charges_the_difference_from_the_estimate():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600, burst=10, clock=clock)
+    assert limiter.tokens.capacity == 100
+    limiter.tokens.take(50)
+    # The call used 130 tokens, not the 50 estimated: the bucket goes into debt.
+    limiter.settle(50, 130)
+    assert limiter.tokens.level() == pytest.approx(-30)
+    assert limiter.tokens.wait_time(10) == pytest.approx(4.0)
+    # Over-estimates are given back.
+    limiter.settle(40, 10)
+    assert limiter.tokens.level() == pytest.approx(0)
+
+
+def test_pause_holds_every_caller_back():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, clock=clock)
+    limiter.pause(3)
+    limiter.pause(1)  # a shorter pause does not cut the longer one short
+    assert limiter._wait_time(1) == pytest.approx(3)
+    assert limiter.stats()["pauses"] == 1
+    clock.now = 3.0
+    assert limiter._wait_time(1) <= 0
+
+
+def test_unlimited_limiter_never_waits():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    async def run():
+        return [await limiter.acquire(10_000) for _ in range(100)]
+
+    assert max(asyncio.run(run())) < 0.1
+    assert limiter.stats()["acquired"] == 100
@@ -0,0 +1,96 @@
+"""The per-cell result cache: hits for resolved cells, version invalidation and its byte budget."""
+
+from __future__ import annotations
+
+import os
+import shutil
+
+import pytest
+
+from backend.result_cache import CachedCell, ResultCache, ResultKey
+
+
+def _key(version: str = "v1", day_of_year: int = 196, uri: str = "data.nc") -> ResultKey:
+    return ResultKey(uri, version, 3, 1, 2, day_of_year)
+
+
+def _cell() -> CachedCell:
+    return CachedCell(time_range="2000-01-01 to 2004-12-31", samples=35, lat=40.0, lon=-100.0)
+
+
+def _result(values: int = 35) -> dict:
+    return {"probability_percent": 10.0, "threshold": {"value": 32.2, "unit": "°C"}, "historical_values": [1.0] * values}
+
+
+def test_new_version_flushes_the_old_one():
+    cache = ResultCache()
+    cache.store(_key("v1"), _cell(), {"very_hot": _result()})
+    assert cache.lookup(_key("v2"), ["very_hot"]) is None
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_older_version_neither_flushes_nor_fills():
+    cache = ResultCache()
+    cache.store(_key("v1"), _cell(), {"very_hot": _result()})
+    cache.store(_key("v2"), _cell(), {"very_hot": _result()})
+
+    # A request still running against v1 finishes after v2 is being served.
+    assert cache.lookup(_key("v1"), ["very_hot"]) is None
+    late = cache.store(_key("v1"), _cell(), {"very_wet": _result()})
+    assert "very_wet" in late.results
+
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["invalidations"] == 1
+    assert cache.lookup(_key("v2"), ["very_hot"]) is not None
+    assert cache.lookup(_key("v2"), ["very_wet"]).results.keys() == {"very_hot"}
+
+
+def test_evicts_least_recent_cells_at_the_byte_limit():
+    one_cell = _cell().nbytes + 640 + 32 * 35
+    cache = ResultCache(max_bytes=3 * one_cell)
+    for day in range(1, 6):
+        cache.store(_key(day_of_year=day), _cell(), {"very_hot": _result()})
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    stats = cache.stats()
+    assert stats["size"] == 3
+    assert stats["evictions"] == 2
+    assert cache.lookup(_key(day_of_year=1), ["very_hot"]) is None
+    assert cache.lookup(_key(day_of_year=5), ["very_hot"]) is not None
+
+
+@pytest.fixture
+def fresh_cache(dataset_env, monkeypatch):
+    from backend import result_cache
+
+    monkeypatch.setattr(result_cache, "_CACHE", None)
+    return result_cache.get_result_cache
+
+
+def test_resolved_cell_is_answered_from_the_cache(fresh_cache):
+    from backend.data_fetcher import get_fetcher
+
+    first = get_fetcher().query(40.0, -100.0, "07-15", ["very_hot"])
+    # A nearby point snaps to the same grid cell.
+    second = get_fetcher().query(40.01, -100.01, "07-15", ["very_hot"])
+    assert second["results"] == first["results"]
+    stats = fresh_cache().stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+
+def test_dataset_change_invalidates(fresh_cache, dataset_env, monkeypatch, tmp_path):
+    from backend.data_fetcher import get_fetcher
+
+    path = tmp_path / "copy.nc"
+    shutil.copyfile(dataset_env, path)
+    monkeypatch.setenv("WEATHERWISE_DATASET", str(path))
+    get_fetcher().query(40.0, -100.0, "07-15", ["very_hot"])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    get_fetcher().query(40.0, -100.0, "07-15", ["very_hot"])
+
+    stats = fresh_cache().stats()
+    assert (stats["misses"], stats["hits"]) == (2, 0)
+    assert stats["invalidations"] == 1
+    assert stats["size"] == 1
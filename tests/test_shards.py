@@ -0,0 +1,61 @@
+"""A per-year shard manifest answers exactly like the same data in one file."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+CONDITIONS = ["very_hot", "very_cold", "very_wet", "very_windy", "very_uncomfortable"]
+POINTS = [(40.0, -100.0), (30.0, -120.0), (50.0, -80.0)]
+DAYS = ["01-02", "02-28", "07-15", "12-30"]
+
+
+@pytest.fixture(scope="session")
+def sharded_dataset(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """The ``synthetic_dataset`` data split into one file per year."""
+    from backend.tools.synthetic_dataset import generate_dataset
+
+    output = tmp_path_factory.mktemp("sharded") / "per_year"
+    return str(generate_dataset(str(output), lat_points=4, lon_points=5, start_year=2000, end_year=2004, per_year=True))
+
+
+def _query_both(monkeypatch, single: str, sharded: str, call):
+    from backend.data_fetcher import get_fetcher
+
+    answers = []
+    for uri in (single, sharded):
+        monkeypatch.setenv("WEATHERWISE_DATASET", uri)
+        answers.append(call(get_fetcher()))
+    return answers
+
+
+def test_sharded_queries_match_single_file(dataset_env, sharded_dataset, monkeypatch):
+    # Fewer handles than shards, so reads also go through the handle LRU's evictions.
+    monkeypatch.setenv("WEATHERWISE_SHARD_HANDLES", "2")
+    for (lat, lon), date_of_year in itertools.product(POINTS, DAYS):
+        single, sharded = _query_both(
+            monkeypatch, dataset_env, sharded_dataset,
+            lambda fetcher: fetcher.query(lat, lon, date_of_year, CONDITIONS, curve_points=20)
+        )
+        where = (lat, lon, date_of_year)
+        assert sharded["results"] == single["results"], where
+        for field in ("time_range", "samples", "grid_point"):
+            assert sharded["metadata"][field] == single["metadata"][field], (field, where)
+
+
+def test_sharded_batch_and_calendar_match_single_file(dataset_env, sharded_dataset, monkeypatch):
+    items = [
+        {"lat": lat, "lon": lon, "date_of_year": day, "conditions": CONDITIONS, "thresholds": None, "curve_points": 0}
+        for (lat, lon), day in itertools.product(POINTS, DAYS)
+    ]
+    single, sharded = _query_both(monkeypatch, dataset_env, sharded_dataset, lambda fetcher: fetcher.query_batch(items))
+    assert [answer["results"] for answer in sharded] == [answer["results"] for answer in single]
+
+    single, sharded = _query_both(
+        monkeypatch, dataset_env, sharded_dataset,
+        lambda fetcher: fetcher.risk_calendar(40.0, -100.0, ["very_hot", "very_wet"], top_n=3)
+    )
+    single.pop("metadata", None)
+    sharded.pop("metadata", None)
+    assert sharded == single